@@ -0,0 +1,50 @@
+#!/usr/bin/python
+from timeit import default_timer
+import argparse
+
+from z80.io import IO
+from z80.processor import Processor
+
+INSTRUCTIONS = [
+    ('unprefixed', [0x41]),
+    ('cb', [0xcb, 0x00]),
+    ('ed', [0xed, 0x47]),
+    ('dd', [0xdd, 0x23]),
+    ('fd', [0xfd, 0x23]),
+    ('ddcb', [0xdd, 0xcb, 0x00, 0xc6]),
+    ('fdcb', [0xfd, 0xcb, 0x00, 0xc6])
+]
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Measure prefixed instruction dispatch throughput')
+    parser.add_argument('--instructions', type=int, default=200000, help='Instructions to execute per prefix')
+    args = parser.parse_args()
+
+    print('{0:<12}{1:>16}{2:>16}{3:>10}'.format('prefix', 'nested (i/s)', 'flat (i/s)', 'speedup'))
+    for name, instruction in INSTRUCTIONS:
+        nested = measure(instruction, args.instructions, False)
+        flat = measure(instruction, args.instructions, True)
+        print('{0:<12}{1:>16.0f}{2:>16.0f}{3:>9.2f}x'.format(name, nested, flat, flat / nested))
+
+
+def measure(instruction, count, flat_dispatch):
+    memory = [0x00] * 0x10000
+    for address in range(0, 0x10000 - len(instruction) + 1, len(instruction)):
+        memory[address:address + len(instruction)] = instruction
+
+    processor = Processor(memory, IO())
+    processor.index_registers['ix'] = 0x8000
+    processor.index_registers['iy'] = 0x8000
+    if not flat_dispatch:
+        processor.prefixed_operations = [None] * 0x100
+
+    execute = processor.execute
+    start = default_timer()
+    for _ in xrange(count):
+        execute()
+    return count / (default_timer() - start)
+
+
+if __name__ == '__main__':
+    run()
@@ -1,28 +1,187 @@
+from functools import partial
+
 from z80.funcs import to_signed, big_endian_value
 
 
-class Memory:
+class Memory(bytearray):
     RAMTOP = 0xffff
 
     def __init__(self):
-        self.memory = [0x0] * (self.RAMTOP + 1)
+        bytearray.__init__(self, self.RAMTOP + 1)
+        view = memoryview(self)
+        self.rom = view[0x0000:0x4000]
+        self.ram = view[0x4000:0x10000]
+        self.screen = view[0x4000:0x5b00]
+        self.write_ram = partial(bytearray.__setitem__, self)
+        self.write_ram_block = partial(write_bytearray_block, self)
+        self.write_handlers = [self.write_ram] * 4
+        self.block_write_handlers = [self.write_ram_block] * 4
+
+    def __setitem__(self, address, value):
+        try:
+            handler = self.write_handlers[address >> 14]
+        except TypeError:
+            write_slice(self, address, value)
+            return
+        handler(address, value)
+
+    def set_write_handler(self, page, handler, block_handler=None):
+        self.write_handlers[page] = handler
+        self.block_write_handlers[page] = block_handler if block_handler is not None else partial(write_bytes, handler)
+
+    def protect_rom(self):
+        self.set_write_handler(0, ignore_write, ignore_write)
+
+    def write_block(self, start, data):
+        write_pages(self, start, data)
 
     def poke(self, address, value):
         if value < 0x0 or value > 0xff:
             raise MemoryException("invalid value for poke")
 
-        self.memory[address & self.RAMTOP] = value
+        self[address & self.RAMTOP] = value
 
     def peek(self, address):
-        return self.memory[address & self.RAMTOP]
+        return self[address & self.RAMTOP]
 
     def block_peek(self, low, high):
-        return self.memory[low & self.RAMTOP:high & self.RAMTOP]
+        return self[low & self.RAMTOP:high & self.RAMTOP]
+
+
+class PagedMemory:
+    RAMTOP = 0xffff
+    BANK_SIZE = 0x4000
+
+    def __init__(self):
+        self.roms = [bytearray(self.BANK_SIZE) for _ in range(0, 2)]
+        self.banks = [bytearray(self.BANK_SIZE) for _ in range(0, 8)]
+        self.screens = {5: memoryview(self.banks[5])[0x0000:0x1b00], 7: memoryview(self.banks[7])[0x0000:0x1b00]}
+        self.slots = [self.roms[0], self.banks[5], self.banks[2], self.banks[0]]
+        self.screen_bank = 5
+        self.screen = self.screens[5]
+        self.paging_locked = False
+        self.paging_handlers = []
+        self.write_ram = self.write_slot
+        self.write_ram_block = self.write_slot_block
+        self.write_handlers = [ignore_write, self.write_ram, self.write_ram, self.write_ram]
+        self.block_write_handlers = [ignore_write, self.write_ram_block, self.write_ram_block, self.write_ram_block]
+
+    def __len__(self):
+        return self.RAMTOP + 1
+
+    def __getitem__(self, address):
+        try:
+            return self.slots[address >> 14][address & 0x3fff]
+        except TypeError:
+            return self.read_slice(address)
+
+    def __setitem__(self, address, value):
+        try:
+            handler = self.write_handlers[address >> 14]
+        except TypeError:
+            write_slice(self, address, value)
+            return
+        handler(address, value)
+
+    def read_slice(self, addresses):
+        start, stop, step = addresses.indices(len(self))
+        if step != 1:
+            return bytearray(self[address] for address in xrange(start, stop, step))
+
+        data = bytearray()
+        while start < stop:
+            end = min(stop, (start | 0x3fff) + 1)
+            data += self.slots[start >> 14][start & 0x3fff:((end - 1) & 0x3fff) + 1]
+            start = end
+        return data
+
+    def write_slot(self, address, value):
+        self.slots[address >> 14][address & 0x3fff] = value
+
+    def write_slot_block(self, start, data):
+        offset = start & 0x3fff
+        self.slots[start >> 14][offset:offset + len(data)] = data
+
+    def set_write_handler(self, page, handler, block_handler=None):
+        self.write_handlers[page] = handler
+        self.block_write_handlers[page] = block_handler if block_handler is not None else partial(write_bytes, handler)
+
+    def protect_rom(self):
+        self.set_write_handler(0, ignore_write, ignore_write)
+
+    def write_block(self, start, data):
+        write_pages(self, start, data)
+
+    def add_paging_handler(self, handler):
+        self.paging_handlers.append(handler)
+
+    def select_pages(self, value):
+        if self.paging_locked:
+            return
+
+        rom = self.roms[(value >> 4) & 0x01]
+        bank = self.banks[value & 0x07]
+        changed_pages = [page for page, selected in ((0, rom), (3, bank)) if self.slots[page] is not selected]
+        self.slots[0] = rom
+        self.slots[3] = bank
+        self.screen_bank = 7 if value & 0x08 else 5
+        self.screen = self.screens[self.screen_bank]
+        self.paging_locked = value & 0x20 != 0
+        for page in changed_pages:
+            for handler in self.paging_handlers:
+                handler(page)
+
+    def load_roms(self, binary_file_name):
+        with open(binary_file_name, 'rb') as binary_file:
+            for rom in self.roms:
+                data = binary_file.read(self.BANK_SIZE)
+                rom[0:len(data)] = data
+
 
 class MemoryException(Exception):
     pass
 
 
+def ignore_write(address, value):
+    pass
+
+
+def write_bytes(write, start, data):
+    for address, value in zip(xrange(start, start + len(data)), data):
+        write(address, value)
+
+
+def write_bytearray_block(memory, start, data):
+    bytearray.__setitem__(memory, slice(start, start + len(data)), data)
+
+
+def write_slice(memory, addresses, values):
+    start, stop, step = addresses.indices(len(memory))
+    values = bytearray(values)
+    if len(xrange(start, stop, step)) != len(values):
+        raise ValueError('cannot assign {} values to a slice of {} addresses'.format(
+            len(values), len(xrange(start, stop, step))))
+
+    if step != 1:
+        handlers = memory.write_handlers
+        for address, value in zip(xrange(start, stop, step), values):
+            handlers[address >> 14](address, value)
+        return
+    write_pages(memory, start, values)
+
+
+def write_pages(memory, start, data):
+    handlers = memory.block_write_handlers
+    stop = start + len(data)
+    offset = 0
+    while start < stop:
+        end = min(stop, (start | 0x3fff) + 1)
+        length = end - start
+        handlers[start >> 14](start, data if length == len(data) else data[offset:offset + length])
+        offset += length
+        start = end
+
+
 def load_memory(memory, binary_file_name, base):
     with open(binary_file_name, 'rb') as binary_file:
         load_memory_from_binary(memory, binary_file, base)
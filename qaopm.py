@@ -1,10 +1,28 @@
 import argparse
-from spectrum.computer import start
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('rom_file', help='Spectrum ROM file')
     parser.add_argument('snapshot_file', help='.SNA-format snapshot file')
+    parser.add_argument('--machine', choices=['48k', '128k'], default='48k', help='Spectrum model to emulate')
+    parser.add_argument('--contended', action='store_true', help='Emulate 48K ULA memory and I/O contention')
+    parser.add_argument('--jit', action='store_true', help='Run straight-line code through the block cache')
+    parser.add_argument('--no-idle-skip', action='store_true', help='Run idle polling loops instruction by instruction')
+    parser.add_argument('--max-frameskip', type=int, default=4, help='Renders to skip in a row when running late')
+    parser.add_argument('--turbo', action='store_true', help='Start unthrottled (F12 toggles at runtime)')
+    parser.add_argument('--turbo-render-every', type=int, default=10,
+                        help='Render every Nth frame in turbo mode, 0 to never render')
+    parser.add_argument('--headless', action='store_true', help='Run without a display and report throughput')
+    parser.add_argument('--frames', type=int, help='Frames to run in headless mode')
+    parser.add_argument('--t-states', type=int, help='T-states to run in headless mode')
+    parser.add_argument('--no-render', action='store_true', help='Skip rendering in headless mode')
     args = parser.parse_args()
 
-    start(args.rom_file, args.snapshot_file)
\ No newline at end of file
+    if args.headless:
+        from spectrum.benchmark import start_headless
+        start_headless(args.rom_file, args.snapshot_file, args.machine, args.contended, args.frames, args.t_states,
+                       not args.no_render, args.jit, not args.no_idle_skip)
+    else:
+        from spectrum.computer import start
+        start(args.rom_file, args.snapshot_file, args.machine, args.contended, args.max_frameskip, args.turbo,
+              args.turbo_render_every, args.jit, not args.no_idle_skip)
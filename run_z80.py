@@ -10,6 +10,7 @@ def run():
     parser.add_argument('sourcefile', metavar='sourcefile', type=str, help='Z80 binary file')
     parser.add_argument('--dumprange', type=str, help='Range of memory to dump', required=False)
     parser.add_argument('--verbose', '-v', help='Enable verbose output', required=False, action='store_true')
+    parser.add_argument('--trace', type=int, help='Keep a trace of the last N instructions', required=False)
     args = parser.parse_args()
 
     memory = Memory()
@@ -17,18 +18,25 @@ def run():
     processor = Processor(memory, io)
 
     load_memory(memory, args.sourcefile, 0x0000)
+    if args.trace:
+        processor.enable_tracing(args.trace)
 
-    t_states = 0
-    while True:
-        executed = processor.execute()
+    stop_operations = (processor.operations_by_opcode[0x00], processor.halted_op)
+
+    def report_and_stop_at_nop(processor):
+        executed = processor.last_operation
         if args.verbose:
             print(executed)
         else:
             print('.'),
-        t_states += executed.t_states()
+        return executed in stop_operations
 
-        if str(executed) == 'nop':
-            break
+    try:
+        t_states, _ = processor.run_until(predicate=report_and_stop_at_nop)
+    except Exception:
+        if processor.trace is not None:
+            processor.trace.dump()
+        raise
 
     print('\n')
     print('Completed program execution in {} t-states'.format(t_states))
@@ -46,6 +54,11 @@ def run():
     for reg, value in processor.special_registers.items():
         print('{0:}: {1:#06x}\t\t'.format(reg, value)),
 
+    if processor.trace is not None:
+        print('\n')
+        print('Last {} instructions:'.format(processor.trace.count))
+        processor.trace.dump()
+
     if args.dumprange is not None:
         start = int(args.dumprange.split(':')[0], 16) & 0xffff
         end = int(args.dumprange.split(':')[1], 16) & 0xffff
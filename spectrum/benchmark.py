@@ -0,0 +1,86 @@
+from timeit import default_timer
+
+import numpy as np
+
+from spectrum.border import BORDERED_WIDTH, BORDERED_HEIGHT
+from spectrum.machine import Machine
+
+
+class BenchmarkResult:
+    def __init__(self, frames, t_states, instructions, cpu_seconds, render_seconds, idle_t_states=0):
+        self.frames = frames
+        self.t_states = t_states
+        self.instructions = instructions
+        self.cpu_seconds = cpu_seconds
+        self.render_seconds = render_seconds
+        self.idle_t_states = idle_t_states
+
+    def total_seconds(self):
+        return self.cpu_seconds + self.render_seconds
+
+    def per_second(self, count):
+        total_seconds = self.total_seconds()
+        if total_seconds <= 0:
+            return 0.0
+        return count / total_seconds
+
+    def emulated_mhz(self):
+        return self.per_second(self.t_states) / 1000000.0
+
+    def frames_per_second(self):
+        return self.per_second(self.frames)
+
+    def instructions_per_second(self):
+        return self.per_second(self.instructions)
+
+    def __str__(self):
+        return '\n'.join([
+            'frames:            {0}'.format(self.frames),
+            't-states:          {0}'.format(self.t_states),
+            'instructions:      {0}'.format(self.instructions),
+            'idle t-states:     {0}'.format(self.idle_t_states),
+            'emulated MHz:      {0:.3f}'.format(self.emulated_mhz()),
+            'frames/second:     {0:.1f}'.format(self.frames_per_second()),
+            'instructions/sec:  {0:.0f}'.format(self.instructions_per_second()),
+            'cpu time:          {0:.3f}s ({1:.1f}%)'.format(self.cpu_seconds,
+                                                          100.0 * self.per_second(self.cpu_seconds)),
+            'render time:       {0:.3f}s ({1:.1f}%)'.format(self.render_seconds,
+                                                          100.0 * self.per_second(self.render_seconds))
+        ])
+
+
+def run_benchmark(spectrum, frames=None, t_states=None, render=True):
+    if frames is None and t_states is None:
+        frames = 50
+
+    pixels = np.zeros((BORDERED_WIDTH, BORDERED_HEIGHT, 3), dtype=np.uint8)
+    detector = spectrum.idle_loop_detector
+    idle_t_states = detector.skipped_t_states if detector is not None else 0
+    frame_count = 0
+    t_state_count = 0
+    instructions = 0
+    cpu_seconds = 0.0
+    render_seconds = 0.0
+    while (frames is None or frame_count < frames) and (t_states is None or t_state_count < t_states):
+        frame_t_states = spectrum.t_states
+        start = default_timer()
+        instructions += spectrum.run_frame()
+        cpu_seconds += default_timer() - start
+        t_state_count += spectrum.t_states - frame_t_states
+        frame_count += 1
+
+        if render:
+            start = default_timer()
+            spectrum.update_display(pixels)
+            render_seconds += default_timer() - start
+
+    if detector is not None:
+        idle_t_states = detector.skipped_t_states - idle_t_states
+    return BenchmarkResult(frame_count, t_state_count, instructions, cpu_seconds, render_seconds, idle_t_states)
+
+
+def start_headless(rom_file, snapshot_file, machine='48k', contended=False, frames=None, t_states=None,
+                   render=True, jit=False, idle_skip=True):
+    spectrum = Machine(rom_file, machine, contended, jit, idle_skip)
+    spectrum.load_snapshot(snapshot_file)
+    print(run_benchmark(spectrum, frames, t_states, render))
@@ -0,0 +1,76 @@
+from array import array
+
+import numpy as np
+
+from spectrum.display_adapter import Colour, SCREEN_WIDTH, SCREEN_HEIGHT
+
+BORDER_WIDTH = 32
+BORDER_HEIGHT = 32
+BORDERED_WIDTH = SCREEN_WIDTH + (2 * BORDER_WIDTH)
+BORDERED_HEIGHT = SCREEN_HEIGHT + (2 * BORDER_HEIGHT)
+FIRST_PAPER_T_STATE = 14336
+T_STATES_PER_LINE = 224
+
+
+def build_pixel_t_states():
+    x = np.arange(0, BORDERED_WIDTH) - BORDER_WIDTH
+    y = np.arange(0, BORDERED_HEIGHT) - BORDER_HEIGHT
+    return FIRST_PAPER_T_STATE + (x[:, np.newaxis] >> 1) + (y[np.newaxis, :] * T_STATES_PER_LINE)
+
+
+PIXEL_T_STATES = build_pixel_t_states()
+BORDER_PALETTE = np.array([Colour(colour, 0, False, False).ink_rgb for colour in range(0, 8)], dtype=np.uint8)
+
+
+class Border:
+    def __init__(self, clock, colour=7):
+        self.clock = clock
+        self.times = array('l')
+        self.colours = array('B')
+        self.reset(colour)
+
+    def reset(self, colour):
+        self.colour = colour
+        self.frame_colour = colour
+        self.rendered_colour = None
+        del self.times[:]
+        del self.colours[:]
+
+    def write(self, colour):
+        if colour != self.colour:
+            self.colour = colour
+            self.times.append(self.clock.t_states)
+            self.colours.append(colour)
+
+    def render(self):
+        if len(self.times) == 0:
+            if self.frame_colour == self.rendered_colour:
+                return None
+            self.rendered_colour = self.frame_colour
+            return np.broadcast_to(BORDER_PALETTE[self.frame_colour], (BORDERED_WIDTH, BORDERED_HEIGHT, 3))
+
+        times = np.frombuffer(self.times, dtype=np.int_)
+        colours = np.concatenate(([self.frame_colour], np.frombuffer(self.colours, dtype=np.uint8)))
+        pixels = BORDER_PALETTE[colours[np.searchsorted(times, PIXEL_T_STATES, side='right')]]
+        self.skip_frame()
+        return pixels
+
+    def skip_frame(self):
+        if len(self.times) > 0:
+            self.frame_colour = self.colour
+            self.rendered_colour = None
+            del self.times[:]
+            del self.colours[:]
+
+    def update_display(self, pixels):
+        border_pixels = self.render()
+        if border_pixels is None:
+            return []
+
+        right = BORDER_WIDTH + SCREEN_WIDTH
+        bottom = BORDER_HEIGHT + SCREEN_HEIGHT
+        pixels[:, :BORDER_HEIGHT] = border_pixels[:, :BORDER_HEIGHT]
+        pixels[:, bottom:] = border_pixels[:, bottom:]
+        pixels[:BORDER_WIDTH, BORDER_HEIGHT:bottom] = border_pixels[:BORDER_WIDTH, BORDER_HEIGHT:bottom]
+        pixels[right:, BORDER_HEIGHT:bottom] = border_pixels[right:, BORDER_HEIGHT:bottom]
+        return [(0, 0, BORDERED_WIDTH, BORDERED_HEIGHT)]
@@ -0,0 +1,3 @@
+class FrameClock:
+    def __init__(self):
+        self.t_states = 0
@@ -1,65 +1,51 @@
 import pygame
-import time
+from pygame import surfarray
 
-from pygame.pixelarray import PixelArray
+from spectrum.border import BORDERED_WIDTH, BORDERED_HEIGHT
+from spectrum.machine import Machine
+from spectrum.scheduler import FrameScheduler
 
-from memory.memory import Memory, load_memory
-from spectrum.display_adapter import DisplayAdapter
-from spectrum.snapshot import load_sna_snapshot, load_z80_v1_snapshot
-from z80.interrupt_operations import OpRetn
-from z80.io import IO
-from z80.processor import Processor, InterruptRequest
 
+TURBO_KEY = pygame.K_F12
 
-class DummyIO(IO):
-    def read(self, port, high_byte):
-        # print 'read {}'.format(hex(port))
-        return 191
 
-    def write(self, port, high_byte, value):
-        pass
-        # print 'write {}, {}'.format(hex(port), hex(value))
-
-
-def start(rom_file, snapshot_file):
-    memory = [0x00] * 0x10000
-    processor = Processor(memory, DummyIO())
-    display_adapter = DisplayAdapter(memory)
-
-    load_memory(memory, rom_file, 0x0000)
-    load_z80_v1_snapshot(snapshot_file, processor, memory)
+def start(rom_file, snapshot_file, machine='48k', contended=False, max_frameskip=4, turbo=False,
+          turbo_render_interval=10, jit=False, idle_skip=True):
+    spectrum = Machine(rom_file, machine, contended, jit, idle_skip)
+    spectrum.load_snapshot(snapshot_file)
 
     pygame.init()
-    size = 256, 192
-    screen = pygame.display.set_mode(size)
-
-    run_loop(processor, PixelArray(screen), display_adapter)
-
-def run_loop(processor, screen, display_adapter):
-    processor_clock_hz = 4000000
-    seconds_per_refresh = 0.02
-    time_per_t_state = 1.0 / processor_clock_hz
-    t_states_per_refresh = seconds_per_refresh / time_per_t_state
-
-    i = 0
-    while i < 50:
-        i += 1
-        update_display(screen, display_adapter) + seconds_per_refresh
-        t_states = 0
-        processor.interrupt(InterruptRequest(irq_ack))
-        while t_states < t_states_per_refresh:
-            t_states += processor.execute()
-
-
-def irq_ack():
-    pass
-
-
-def current_time_ms():
-    return time.time()
-
-
-def update_display(screen, display_adapter):
-    display_adapter.update_display(screen)
-    pygame.display.flip()
-    return current_time_ms()
+    size = BORDERED_WIDTH, BORDERED_HEIGHT
+    display = pygame.display.set_mode(size)
+
+    scheduler = FrameScheduler(spectrum.frame_seconds, max_frameskip,
+                               turbo_render_interval=turbo_render_interval)
+    if turbo:
+        scheduler.toggle_turbo()
+    run_loop(spectrum, display, scheduler)
+
+
+def run_loop(spectrum, display, scheduler):
+    while handle_events(scheduler):
+        spectrum.run_frame()
+        if scheduler.render_due():
+            update_display(spectrum, display)
+        else:
+            spectrum.skip_display()
+        scheduler.wait_for_next_frame()
+
+
+def handle_events(scheduler):
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            return False
+        if event.type == pygame.KEYDOWN and event.key == TURBO_KEY:
+            scheduler.toggle_turbo()
+    return True
+
+
+def update_display(spectrum, display):
+    pixels = surfarray.pixels3d(display)
+    rects = spectrum.update_display(pixels)
+    del pixels
+    pygame.display.update(rects)
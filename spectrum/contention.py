@@ -0,0 +1,362 @@
+from array import array
+
+from z80.io import IO
+from z80.registers import B, C, D, E, H, L, I, R, SP, PC, IX, IY
+
+FRAME_T_STATES = 69888
+FIRST_CONTENDED_T_STATE = 14335
+T_STATES_PER_LINE = 224
+CONTENDED_LINES = 192
+CONTENDED_T_STATES_PER_LINE = 128
+DELAY_PATTERN = [6, 5, 4, 3, 2, 1, 0, 0]
+MAX_INSTRUCTION_T_STATES = 23
+IO_T_STATES = 4
+
+PC_CYCLE, HL_CYCLE, BC_CYCLE, DE_CYCLE, SP_CYCLE, IR_CYCLE, NN_CYCLE, INDEX_CYCLE, NO_CYCLE, IO_CYCLE = range(0, 10)
+
+
+def build_delay_table():
+    delays = array('B', [0] * (FRAME_T_STATES + 0x100))
+    for line in xrange(0, CONTENDED_LINES):
+        line_start = FIRST_CONTENDED_T_STATE + (line * T_STATES_PER_LINE)
+        for t_state in xrange(0, CONTENDED_T_STATES_PER_LINE):
+            delays[line_start + t_state] = DELAY_PATTERN[t_state & 0x07]
+    return delays
+
+
+def build_clear_table(delays):
+    clear = array('B', [0] * len(delays))
+    distance = MAX_INSTRUCTION_T_STATES
+    for t_state in xrange(len(delays) - 1, -1, -1):
+        distance = 0 if delays[t_state] else min(distance + 1, MAX_INSTRUCTION_T_STATES)
+        clear[t_state] = distance
+    return clear
+
+
+def cycles(*groups):
+    result = []
+    for source, offset, length, count in groups:
+        result.extend([(source, offset, length)] * count)
+    return tuple(result)
+
+
+def fetch(offset=0):
+    return PC_CYCLE, offset, 4, 1
+
+
+def read(source, offset=0):
+    return source, offset, 3, 1
+
+
+def internal(source, offset=0, count=1):
+    return source, offset, 1, count
+
+
+def io():
+    return IO_CYCLE, 0, IO_T_STATES, 1
+
+
+def with_total(*variants):
+    return dict((sum(length for _, _, length in variant), variant) for variant in variants)
+
+
+def unprefixed_cycles(op_code):
+    x, y, z = op_code >> 6, (op_code >> 3) & 0x07, op_code & 0x07
+    p, q = y >> 1, y & 0x01
+    if x == 0:
+        if z == 0:
+            if y < 2:
+                return with_total(cycles(fetch()))
+            if y == 2:
+                djnz = (fetch(), internal(IR_CYCLE), read(PC_CYCLE, 1))
+                return with_total(cycles(*djnz), cycles(*(djnz + (internal(PC_CYCLE, 1, 5),))))
+            jr = (fetch(), read(PC_CYCLE, 1))
+            if y == 3:
+                return with_total(cycles(*(jr + (internal(PC_CYCLE, 1, 5),))))
+            return with_total(cycles(*jr), cycles(*(jr + (internal(PC_CYCLE, 1, 5),))))
+        if z == 1:
+            if q == 0:
+                return with_total(cycles(fetch(), read(PC_CYCLE, 1), read(PC_CYCLE, 2)))
+            return with_total(cycles(fetch(), internal(IR_CYCLE, 0, 7)))
+        if z == 2:
+            if p < 2:
+                return with_total(cycles(fetch(), read((BC_CYCLE, DE_CYCLE)[p])))
+            operand = (fetch(), read(PC_CYCLE, 1), read(PC_CYCLE, 2), read(NN_CYCLE))
+            if p == 2:
+                return with_total(cycles(*(operand + (read(NN_CYCLE, 1),))))
+            return with_total(cycles(*operand))
+        if z == 3:
+            return with_total(cycles(fetch(), internal(IR_CYCLE, 0, 2)))
+        if z < 6:
+            if y == 6:
+                return with_total(cycles(fetch(), read(HL_CYCLE), internal(HL_CYCLE), read(HL_CYCLE)))
+            return with_total(cycles(fetch()))
+        if z == 6:
+            if y == 6:
+                return with_total(cycles(fetch(), read(PC_CYCLE, 1), read(HL_CYCLE)))
+            return with_total(cycles(fetch(), read(PC_CYCLE, 1)))
+        return with_total(cycles(fetch()))
+    if x == 1:
+        if (y == 6) != (z == 6):
+            return with_total(cycles(fetch(), read(HL_CYCLE)))
+        return with_total(cycles(fetch()))
+    if x == 2:
+        if z == 6:
+            return with_total(cycles(fetch(), read(HL_CYCLE)))
+        return with_total(cycles(fetch()))
+
+    pop = (read(SP_CYCLE), read(SP_CYCLE, 1))
+    push = (read(SP_CYCLE, -1), read(SP_CYCLE, -2))
+    jump = (fetch(), read(PC_CYCLE, 1), read(PC_CYCLE, 2))
+    if z == 0:
+        return with_total(cycles(fetch(), internal(IR_CYCLE)), cycles(*((fetch(), internal(IR_CYCLE)) + pop)))
+    if z == 1:
+        if q == 0 or p == 0:
+            return with_total(cycles(*((fetch(),) + pop)))
+        if p == 3:
+            return with_total(cycles(fetch(), internal(IR_CYCLE, 0, 2)))
+        return with_total(cycles(fetch()))
+    if z == 2:
+        return with_total(cycles(*jump))
+    if z == 3:
+        if y == 0:
+            return with_total(cycles(*jump))
+        if y == 1:
+            return None
+        if y < 4:
+            return with_total(cycles(fetch(), read(PC_CYCLE, 1), io()))
+        if y == 4:
+            return with_total(cycles(fetch(), read(SP_CYCLE), read(SP_CYCLE, 1), internal(SP_CYCLE, 1),
+                                     read(SP_CYCLE, 1), read(SP_CYCLE), internal(SP_CYCLE, 0, 2)))
+        return with_total(cycles(fetch()))
+    call = jump + (internal(PC_CYCLE, 2),) + push
+    if z == 4:
+        return with_total(cycles(*jump), cycles(*call))
+    if z == 5:
+        if q == 0:
+            return with_total(cycles(*((fetch(), internal(IR_CYCLE)) + push)))
+        if p == 0:
+            return with_total(cycles(*call))
+        return None
+    if z == 6:
+        return with_total(cycles(fetch(), read(PC_CYCLE, 1)))
+    return with_total(cycles(*((fetch(), internal(IR_CYCLE)) + push)))
+
+
+def cb_cycles(op_code):
+    if op_code & 0x07 != 6:
+        return with_total(cycles(fetch(), fetch(1)))
+    if op_code >> 6 == 1:
+        return with_total(cycles(fetch(), fetch(1), read(HL_CYCLE), internal(HL_CYCLE)))
+    return with_total(cycles(fetch(), fetch(1), read(HL_CYCLE), internal(HL_CYCLE), read(HL_CYCLE)))
+
+
+def ed_cycles(op_code):
+    x, y, z = op_code >> 6, (op_code >> 3) & 0x07, op_code & 0x07
+    prefix = (fetch(), fetch(1))
+    if x == 1:
+        if z < 2:
+            return with_total(cycles(*(prefix + (io(),))))
+        if z == 2:
+            return with_total(cycles(*(prefix + (internal(IR_CYCLE, 0, 7),))))
+        if z == 3:
+            return with_total(cycles(*(prefix + (read(PC_CYCLE, 2), read(PC_CYCLE, 3),
+                                                 read(NN_CYCLE), read(NN_CYCLE, 1)))))
+        if z == 5:
+            return with_total(cycles(*(prefix + (read(SP_CYCLE), read(SP_CYCLE, 1)))))
+        if z == 7 and y < 4:
+            return with_total(cycles(*(prefix + (internal(IR_CYCLE),))))
+        if z == 7 and y < 6:
+            return with_total(cycles(*(prefix + (read(HL_CYCLE), internal(HL_CYCLE, 0, 4), read(HL_CYCLE)))))
+    elif x == 2 and z < 4 and y > 3:
+        if z == 0:
+            single = prefix + (read(HL_CYCLE), read(DE_CYCLE), internal(DE_CYCLE, 0, 2))
+            repeat = internal(DE_CYCLE, 0, 5)
+        elif z == 1:
+            single = prefix + (read(HL_CYCLE), internal(HL_CYCLE, 0, 5))
+            repeat = internal(HL_CYCLE, 0, 5)
+        elif z == 2:
+            single = prefix + (internal(IR_CYCLE), io(), read(HL_CYCLE))
+            repeat = internal(HL_CYCLE, 0, 5)
+        else:
+            single = prefix + (internal(IR_CYCLE), read(HL_CYCLE), io())
+            repeat = internal(BC_CYCLE, 0, 5)
+        if y < 6:
+            return with_total(cycles(*single))
+        return with_total(cycles(*single), cycles(*(single + (repeat,))))
+    return with_total(cycles(*prefix))
+
+
+def indexed_cycles(op_code):
+    x, y, z = op_code >> 6, (op_code >> 3) & 0x07, op_code & 0x07
+    prefix = (fetch(), fetch(1))
+    displacement = prefix + (read(PC_CYCLE, 2), internal(PC_CYCLE, 2, 5))
+    if (x == 1 and (y == 6) != (z == 6)) or (x == 2 and z == 6):
+        return with_total(cycles(*(displacement + (read(INDEX_CYCLE),))))
+    if x == 0 and y == 6 and z in (4, 5):
+        return with_total(cycles(*(displacement + (read(INDEX_CYCLE), internal(INDEX_CYCLE), read(INDEX_CYCLE)))))
+    if x == 0 and y == 6 and z == 6:
+        return with_total(cycles(*(prefix + (read(PC_CYCLE, 2), read(PC_CYCLE, 3),
+                                             internal(PC_CYCLE, 3, 2), read(INDEX_CYCLE)))))
+
+    unprefixed = unprefixed_cycles(op_code)
+    if unprefixed is None:
+        return None
+    return with_total(*[((PC_CYCLE, 0, 4),) + tuple((source, offset + 1 if source == PC_CYCLE else offset, length)
+                                                     for source, offset, length in variant)
+                        for variant in unprefixed.values()])
+
+
+def indexed_cb_cycles(op_code):
+    displacement = (fetch(), fetch(1), read(PC_CYCLE, 2), read(PC_CYCLE, 3), internal(PC_CYCLE, 3, 2),
+                    read(INDEX_CYCLE), internal(INDEX_CYCLE))
+    if op_code >> 6 == 1:
+        return with_total(cycles(*displacement))
+    return with_total(cycles(*(displacement + (read(INDEX_CYCLE),))))
+
+
+def interrupt_cycles():
+    acknowledge = ((NO_CYCLE, 0, 5, 1), read(SP_CYCLE, -1), read(SP_CYCLE, -2))
+    return with_total(cycles(*acknowledge), cycles(*(acknowledge + (read(IR_CYCLE), read(IR_CYCLE, 1)))))
+
+
+def pc_only(variants):
+    return all(source in (PC_CYCLE, NO_CYCLE) for variant in variants.values() for source, _, _ in variant)
+
+
+def build_cycle_table(cycles_for_op_code):
+    table = []
+    for op_code in xrange(0, 0x100):
+        variants = cycles_for_op_code(op_code)
+        table.append(None if variants is None else (pc_only(variants), variants))
+    return table
+
+
+def build_cycle_tables():
+    return (build_cycle_table(unprefixed_cycles), build_cycle_table(cb_cycles), build_cycle_table(ed_cycles),
+            build_cycle_table(indexed_cycles), build_cycle_table(indexed_cb_cycles))
+
+
+class ContentionModel:
+    def __init__(self, memory):
+        self.memory = memory
+        self.processor = None
+        self.registers = None
+        self.execute_instruction = None
+        self.delays = build_delay_table()
+        self.clear = build_clear_table(self.delays)
+        self.unprefixed, self.cb, self.ed, self.indexed, self.indexed_cb = build_cycle_tables()
+        self.interrupt = (False, interrupt_cycles())
+        self.frame_t_state = 0
+        self.port_access = None
+
+    def attach(self, processor):
+        self.processor = processor
+        self.registers = processor.registers
+        self.execute_instruction = processor.execute
+
+    def start_frame(self, frame_t_state=0):
+        self.frame_t_state = frame_t_state
+
+    def execute(self):
+        frame_t_state = self.frame_t_state
+        if self.clear[frame_t_state] == MAX_INSTRUCTION_T_STATES:
+            t_states = self.execute_instruction()
+        else:
+            t_states = self.execute_contended(frame_t_state)
+
+        frame_t_state += t_states
+        self.frame_t_state = frame_t_state if frame_t_state < FRAME_T_STATES else frame_t_state - FRAME_T_STATES
+        return t_states
+
+    def execute_contended(self, t_state):
+        registers = self.registers
+        memory = self.memory
+        processor = self.processor
+        pc = registers[PC]
+        nn = index = 0
+        if processor.iff[0] and processor.interrupt_controller.pending:
+            entry = self.interrupt
+        elif processor.halting:
+            entry = self.unprefixed[0x00]
+        else:
+            op_code = memory[pc]
+            if op_code == 0xcb:
+                entry = self.cb[memory[(pc + 1) & 0xffff]]
+            elif op_code == 0xed:
+                entry = self.ed[memory[(pc + 1) & 0xffff]]
+                nn = memory[(pc + 2) & 0xffff] | (memory[(pc + 3) & 0xffff] << 8)
+            elif op_code == 0xdd or op_code == 0xfd:
+                prefixed_op_code = memory[(pc + 1) & 0xffff]
+                displacement = memory[(pc + 2) & 0xffff]
+                if prefixed_op_code == 0xcb:
+                    entry = self.indexed_cb[memory[(pc + 3) & 0xffff]]
+                else:
+                    entry = self.indexed[prefixed_op_code]
+                    nn = displacement | (memory[(pc + 3) & 0xffff] << 8)
+                index = registers[IX if op_code == 0xdd else IY]
+                index = (index + (displacement if displacement < 0x80 else displacement - 0x100)) & 0xffff
+            else:
+                entry = self.unprefixed[op_code]
+                nn = memory[(pc + 1) & 0xffff] | (memory[(pc + 2) & 0xffff] << 8)
+
+        if entry is None:
+            variants = None
+        else:
+            only_pc, variants = entry
+            if only_pc and pc >> 14 != 1 and ((pc + 3) & 0xffff) >> 14 != 1:
+                return self.execute_instruction()
+        addresses = (pc, (registers[H] << 8) | registers[L], (registers[B] << 8) | registers[C],
+                     (registers[D] << 8) | registers[E], registers[SP], (registers[I] << 8) | registers[R],
+                     nn, index, 0)
+        self.port_access = None
+
+        t_states = self.execute_instruction()
+        bus_cycles = variants.get(t_states) if variants is not None else None
+        if bus_cycles is None:
+            bus_cycles = ((PC_CYCLE, 0, 4), (NO_CYCLE, 0, t_states - 4))
+
+        delays = self.delays
+        io_cycle = IO_CYCLE
+        start = t_state
+        for source, offset, length in bus_cycles:
+            if source == io_cycle:
+                if self.port_access is not None:
+                    t_state += self.port_delay(t_state, *self.port_access)
+            elif ((addresses[source] + offset) & 0xffff) >> 14 == 1:
+                t_state += delays[t_state]
+            t_state += length
+        return t_state - start
+
+    def contend_port(self, port, high_byte):
+        self.port_access = (port, high_byte)
+
+    def port_delay(self, t_state, port, high_byte):
+        delays = self.delays
+        if 0x40 <= high_byte <= 0x7f:
+            delay = delays[t_state]
+            t_state += delay + 1
+            if port & 0x01 == 0:
+                return delay + delays[t_state]
+            for _ in xrange(0, 3):
+                extra = delays[t_state]
+                delay += extra
+                t_state += extra + 1
+            return delay
+        if port & 0x01 == 0:
+            return delays[t_state + 1]
+        return 0
+
+
+class ContendedIO(IO):
+    def __init__(self, io, contention):
+        self.io = io
+        self.contention = contention
+
+    def read(self, port, high_byte):
+        self.contention.contend_port(port, high_byte)
+        return self.io.read(port, high_byte)
+
+    def write(self, port, high_byte, value):
+        self.contention.contend_port(port, high_byte)
+        self.io.write(port, high_byte, value)
@@ -1,8 +1,50 @@
+import numpy as np
+
+SCREEN_WIDTH = 256
+SCREEN_HEIGHT = 192
+SCREEN_BASE = 0x4000
+ATTRIBUTE_OFFSET = 0x1800
+SCREEN_SIZE = 0x1b00
+CELL_COUNT = 0x300
+FLASH_FRAMES = 16
+FLASH_BIT = 0x80
+
+
+def build_row_addresses():
+    return np.array([((y & 0xc0) << 5) | ((y & 0x07) << 8) | ((y & 0x38) << 2) for y in xrange(0, SCREEN_HEIGHT)])
+
+
+def build_attribute_addresses():
+    return np.array([ATTRIBUTE_OFFSET + ((y >> 3) * 0x20) for y in xrange(0, SCREEN_HEIGHT)])
+
+
+def build_cells_by_offset():
+    cells = [0] * SCREEN_SIZE
+    for offset in xrange(0, ATTRIBUTE_OFFSET):
+        row = ((offset >> 11) << 3) | ((offset >> 5) & 0x07)
+        cells[offset] = (row << 5) | (offset & 0x1f)
+    for offset in xrange(ATTRIBUTE_OFFSET, SCREEN_SIZE):
+        cells[offset] = offset - ATTRIBUTE_OFFSET
+    return cells
+
+
+ROW_ADDRESSES = build_row_addresses()
+BITMAP_INDEX = ROW_ADDRESSES[:, np.newaxis] + np.arange(0, 0x20)
+ATTRIBUTE_INDEX = np.repeat(build_attribute_addresses()[:, np.newaxis] + np.arange(0, 0x20), 8, axis=1)
+CELLS_BY_OFFSET = build_cells_by_offset()
+CELL_INDEX = np.array(CELLS_BY_OFFSET)
+
+CELL_COLUMNS = np.arange(0, CELL_COUNT) & 0x1f
+CELL_ROWS = np.arange(0, CELL_COUNT) >> 5
+CELL_BITMAP_INDEX = ROW_ADDRESSES.reshape(0x18, 8)[CELL_ROWS] + CELL_COLUMNS[:, np.newaxis]
+CELL_X = (CELL_COLUMNS << 3)[:, np.newaxis, np.newaxis] + np.arange(0, 8)[np.newaxis, np.newaxis, :]
+CELL_Y = (CELL_ROWS << 3)[:, np.newaxis, np.newaxis] + np.arange(0, 8)[np.newaxis, :, np.newaxis]
+
+
 class DisplayAdapter:
     def __init__(self, memory):
         self.memory = memory
-        self.inks = {}
-        self.papers = {}
+        self.palette = np.zeros((0x100, 2, 3), dtype=np.uint8)
 
         for flash in [False, True]:
             for bright in [False, True]:
@@ -10,37 +52,88 @@ class DisplayAdapter:
                     for ink in range(0, 8):
                         attr = (flash << 7) | (bright << 6) | (paper << 3) | ink
                         colour = Colour(ink, paper, flash, bright)
-                        self.inks[attr] = colour.ink_rgb
-                        self.papers[attr] = colour.paper_rgb
-
-    def update_display(self, screen):
-        inks = self.inks
-        papers = self.papers
-        display_memory = self.memory[0x4000:0x5b00]
-
-        for y in xrange(0, 192):
-            hi = y & 0b00111000
-            lo = y & 0b00000111
-            line = (hi >> 3) | (lo << 3)
-
-            if y < 0x40:
-                address_base = 0x0000
-            elif y < 0x80:
-                address_base = 0x0800
-            else:
-                address_base = 0x1000
-
-            for x in xrange(0, 32):
-                colour_address = 0x1800 + (0x20 * (y / 8)) + x
-
-                for bit in xrange(0, 8):
-                    pixel_address = address_base + (line * 32) + x
-                    colour_value = display_memory[colour_address]
-                    display_x = (x * 8) + (7 - bit)
-                    if display_memory[pixel_address] & (1 << bit) > 0:
-                        screen[display_x][y] = inks[colour_value]
-                    else:
-                        screen[display_x][y] = papers[colour_value]
+                        self.palette[attr] = colour.paper_rgb, colour.ink_rgb
+
+        inverted_palette = self.palette.copy()
+        inverted_palette[FLASH_BIT:] = self.palette[FLASH_BIT:, ::-1]
+        self.colours_by_flash_phase = [self.palette.reshape(0x200, 3), inverted_palette.reshape(0x200, 3)]
+        self.colours = self.colours_by_flash_phase[0]
+        self.frame_count = 0
+        self.dirty = bytearray([1]) * CELL_COUNT
+        self.dirty_cells = np.frombuffer(self.dirty, dtype=np.uint8)
+        self.shown_screen = memory.screen
+        self.tracks_writes = hasattr(memory, 'set_write_handler')
+        if self.tracks_writes:
+            self.track_screen_writes()
+
+    def track_screen_writes(self):
+        memory = self.memory
+        self.track_page_writes(1, SCREEN_BASE)
+        if hasattr(memory, 'select_pages'):
+            self.track_page_writes(3, 0xc000, lambda: memory.slots[3] is memory.banks[memory.screen_bank])
+
+    def track_page_writes(self, page, base, shows_screen=None):
+        memory = self.memory
+        dirty = self.dirty
+        cells = CELLS_BY_OFFSET
+        dirty_cells = self.dirty_cells
+        write = memory.write_handlers[page]
+        write_block = memory.block_write_handlers[page]
+
+        def tracked_write(address, value):
+            offset = address - base
+            if offset < SCREEN_SIZE and memory[address] != value and (shows_screen is None or shows_screen()):
+                dirty[cells[offset]] = 1
+            write(address, value)
+
+        def tracked_write_block(start, data):
+            offset = start - base
+            length = min(len(data), SCREEN_SIZE - offset)
+            if length > 0 and (shows_screen is None or shows_screen()):
+                old = np.frombuffer(memory[start:start + length], dtype=np.uint8)
+                new = np.frombuffer(data[:length], dtype=np.uint8)
+                dirty_cells[CELL_INDEX[offset + np.flatnonzero(old != new)]] = 1
+            write_block(start, data)
+
+        memory.set_write_handler(page, tracked_write, tracked_write_block)
+
+    def advance_frame(self):
+        self.frame_count += 1
+        if self.frame_count % FLASH_FRAMES == 0:
+            flash_phase = (self.frame_count / FLASH_FRAMES) & 0x01
+            self.colours = self.colours_by_flash_phase[flash_phase]
+            attributes = np.asarray(self.memory.screen)[ATTRIBUTE_OFFSET:]
+            self.dirty_cells[attributes & FLASH_BIT != 0] = 1
+
+    def render(self):
+        screen_bytes = np.asarray(self.memory.screen)
+        pixels = np.unpackbits(screen_bytes[BITMAP_INDEX], axis=1)
+        colours = (screen_bytes[ATTRIBUTE_INDEX].astype(np.intp) << 1) | pixels
+        return np.take(self.colours, colours, axis=0).swapaxes(0, 1)
+
+    def render_cells(self, cells):
+        screen_bytes = np.asarray(self.memory.screen)
+        pixels = np.unpackbits(screen_bytes[CELL_BITMAP_INDEX[cells]], axis=1).reshape(len(cells), 8, 8)
+        colours = (screen_bytes[cells + ATTRIBUTE_OFFSET].astype(np.intp) << 1)[:, np.newaxis, np.newaxis] | pixels
+        return np.take(self.colours, colours, axis=0)
+
+    def update_display(self, pixels):
+        if not self.tracks_writes or self.memory.screen is not self.shown_screen:
+            self.shown_screen = self.memory.screen
+            self.dirty[:] = bytearray([1]) * CELL_COUNT
+
+        self.advance_frame()
+        cells = np.flatnonzero(self.dirty_cells)
+        if len(cells) == 0:
+            return []
+
+        self.dirty[:] = bytearray(CELL_COUNT)
+        if len(cells) == CELL_COUNT:
+            pixels[:] = self.render()
+            return [(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)]
+
+        pixels[CELL_X[cells], CELL_Y[cells]] = self.render_cells(cells)
+        return [(int(column) << 3, int(row) << 3, 8, 8) for column, row in zip(CELL_COLUMNS[cells], CELL_ROWS[cells])]
 
 colour_masks = {
     0: 0x000000,
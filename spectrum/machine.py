@@ -0,0 +1,110 @@
+from memory.memory import Memory, PagedMemory, load_memory
+from spectrum.border import Border, BORDER_WIDTH, BORDER_HEIGHT
+from spectrum.clock import FrameClock
+from spectrum.contention import ContentionModel, ContendedIO
+from spectrum.display_adapter import DisplayAdapter, SCREEN_WIDTH, SCREEN_HEIGHT
+from spectrum.ports import Spectrum48Ports, Spectrum128Ports
+from spectrum.snapshot import load_z80_v1_snapshot
+from z80.idle_loop import IdleLoopDetector
+from z80.processor import Processor
+
+TIMINGS = {
+    '48k': (3500000, 69888, 32),
+    '128k': (3546900, 70908, 36)
+}
+
+
+class Machine:
+    def __init__(self, rom_file, machine='48k', contended=False, jit=False, idle_skip=True):
+        self.processor_clock_hz, self.t_states_per_frame, self.int_length = TIMINGS[machine]
+        self.frame_seconds = float(self.t_states_per_frame) / self.processor_clock_hz
+        self.t_states = 0
+        self.clock = FrameClock()
+        self.border = Border(self.clock)
+        if machine == '128k':
+            self.memory = PagedMemory()
+            io = Spectrum128Ports(self.memory, self.border)
+            self.memory.load_roms(rom_file)
+        else:
+            self.memory = Memory()
+            io = Spectrum48Ports(self.border)
+            load_memory(self.memory, rom_file, 0x0000)
+            self.memory.protect_rom()
+
+        self.contention = None
+        if contended and machine == '48k':
+            self.contention = ContentionModel(self.memory)
+            io = ContendedIO(io, self.contention)
+
+        self.idle_loop_detector = None
+        if idle_skip and self.contention is None:
+            self.idle_loop_detector = IdleLoopDetector(self.clock)
+            io = self.idle_loop_detector.watch_io(io)
+
+        self.processor = Processor(self.memory, io)
+        if self.contention is not None:
+            self.contention.attach(self.processor)
+        if self.idle_loop_detector is not None:
+            self.idle_loop_detector.attach(self.processor)
+        self.display_adapter = DisplayAdapter(self.memory)
+        self.jit = jit and self.contention is None and self.processor.block_cache is not None
+
+    def load_snapshot(self, snapshot_file):
+        self.border.reset(load_z80_v1_snapshot(snapshot_file, self.processor, self.memory))
+
+    def run_frame(self):
+        clock = self.clock
+        t_states_per_frame = self.t_states_per_frame
+        if clock.t_states >= t_states_per_frame:
+            clock.t_states -= t_states_per_frame
+        frame_start = clock.t_states
+        processor = self.processor
+
+        if self.contention is not None:
+            self.contention.start_frame(frame_start)
+            execute = self.contention.execute
+        else:
+            execute = None
+
+        instructions = 0
+        int_length = self.int_length
+        processor.set_int_line(True)
+        if execute is None:
+            processor.run(int_length - clock.t_states, clock)
+            instructions += processor.run_instructions
+        else:
+            while clock.t_states < int_length:
+                clock.t_states += execute()
+                instructions += 1
+
+        processor.set_int_line(False)
+        if self.jit:
+            run_block = processor.run_block
+            while clock.t_states < t_states_per_frame:
+                processor.repeat_t_state_budget = t_states_per_frame - clock.t_states
+                t_states, count = run_block()
+                clock.t_states += t_states
+                instructions += count
+        elif execute is None:
+            processor.run(t_states_per_frame - clock.t_states, clock)
+            instructions += processor.run_instructions
+        else:
+            while clock.t_states < t_states_per_frame:
+                clock.t_states += execute()
+                instructions += 1
+        processor.repeat_t_state_budget = 0
+
+        self.t_states += clock.t_states - frame_start
+        return instructions
+
+    def update_display(self, pixels):
+        screen_pixels = pixels[BORDER_WIDTH:BORDER_WIDTH + SCREEN_WIDTH, BORDER_HEIGHT:BORDER_HEIGHT + SCREEN_HEIGHT]
+        rects = self.border.update_display(pixels)
+        screen_rects = self.display_adapter.update_display(screen_pixels)
+        if rects:
+            return rects
+        return [(x + BORDER_WIDTH, y + BORDER_HEIGHT, width, height) for x, y, width, height in screen_rects]
+
+    def skip_display(self):
+        self.border.skip_frame()
+        self.display_adapter.advance_frame()
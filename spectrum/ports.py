@@ -0,0 +1,24 @@
+from z80.io import IO
+
+
+class Spectrum48Ports(IO):
+    def __init__(self, border):
+        self.border = border
+
+    def read(self, port, high_byte):
+        return 0xbf
+
+    def write(self, port, high_byte, value):
+        if port & 0x01 == 0:
+            self.border.write(value & 0x07)
+
+
+class Spectrum128Ports(Spectrum48Ports):
+    def __init__(self, memory, border):
+        Spectrum48Ports.__init__(self, border)
+        self.memory = memory
+
+    def write(self, port, high_byte, value):
+        Spectrum48Ports.write(self, port, high_byte, value)
+        if port & 0x02 == 0 and high_byte & 0x80 == 0:
+            self.memory.select_pages(value)
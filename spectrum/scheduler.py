@@ -0,0 +1,93 @@
+import ctypes
+import ctypes.util
+import sys
+import time
+from timeit import default_timer
+
+CLOCK_MONOTONIC = 1
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [('seconds', ctypes.c_long), ('nanoseconds', ctypes.c_long)]
+
+
+def _posix_monotonic():
+    clock_gettime = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True).clock_gettime
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_Timespec)]
+    timespec = _Timespec()
+
+    def monotonic():
+        if clock_gettime(CLOCK_MONOTONIC, ctypes.byref(timespec)) != 0:
+            raise OSError(ctypes.get_errno(), 'clock_gettime failed')
+        return timespec.seconds + (timespec.nanoseconds * 1e-9)
+
+    return monotonic
+
+
+try:
+    from time import monotonic
+except ImportError:
+    monotonic = _posix_monotonic() if sys.platform.startswith('linux') else default_timer
+
+
+class FrameScheduler:
+    def __init__(self, frame_seconds, max_frameskip=4, clock=monotonic, sleep=time.sleep, turbo_render_interval=10):
+        self.frame_seconds = frame_seconds
+        self.max_frameskip = max_frameskip
+        self.turbo = False
+        self.turbo_render_interval = turbo_render_interval
+        self.turbo_frames = 0
+        self.clock = clock
+        self.sleep = sleep
+        self.deadline = None
+        self.consecutive_skips = 0
+        self.frames = 0
+        self.late_frames = 0
+        self.skipped_frames = 0
+
+    def toggle_turbo(self):
+        self.turbo = not self.turbo
+        self.turbo_frames = 0
+        self.deadline = None
+
+    def render_due(self):
+        if self.turbo:
+            self.turbo_frames += 1
+            return self.turbo_render_interval > 0 and self.turbo_frames % self.turbo_render_interval == 0
+
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now + self.frame_seconds
+
+        if now <= self.deadline:
+            self.consecutive_skips = 0
+            return True
+
+        self.late_frames += 1
+        if self.consecutive_skips < self.max_frameskip:
+            self.consecutive_skips += 1
+            self.skipped_frames += 1
+            return False
+
+        self.consecutive_skips = 0
+        return True
+
+    def wait_for_next_frame(self):
+        self.frames += 1
+        if self.turbo:
+            return
+
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now + self.frame_seconds
+
+        ahead = self.deadline - now
+        if ahead > 0:
+            self.sleep(ahead)
+        elif -ahead > self.frame_seconds * (self.max_frameskip + 1):
+            self.deadline = now
+        self.deadline += self.frame_seconds
+
+    def __str__(self):
+        return 'frames: {0}, late: {1}, skipped renders: {2}'.format(self.frames, self.late_frames,
+                                                                     self.skipped_frames)
@@ -56,6 +56,8 @@ def load_z80_v1_snapshot(file, processor, memory):
         if end_marker != [0x00, 0xed, 0xed, 0x00]:
             raise IOError(".z80 file format invalid")
 
+    return border_colour
+
 
 def load_memory_from_compressed_binary(memory, binary_file, base):
     while base < 0x10000:
@@ -111,11 +113,12 @@ def load_sna_snapshot(file, processor, memory):
 
         processor.interrupt_mode = next_byte(snapshot_file)
 
-        # not used yet
         border_colour = next_byte(snapshot_file)
 
         load_memory_from_binary(memory, snapshot_file, 0x4000)
 
+    return border_colour
+
 
 def next_word(snapshot_file):
     return (next_byte(snapshot_file) << 8) | next_byte(snapshot_file)
@@ -3,7 +3,7 @@ from tempfile import NamedTemporaryFile
 
 from nose.tools import *
 
-from memory.memory import load_memory, save_memory, Memory, MemoryException
+from memory.memory import load_memory, save_memory, Memory, PagedMemory, MemoryException
 
 
 class TestMemory:
@@ -70,5 +70,161 @@ class TestMemory:
             assert_equals(self.memory[0x1002], 0x3c)
 
 
+class TestBytearrayMemory:
+    def setup(self):
+        self.memory = Memory()
+
+    def test_correct_size(self):
+        assert_equals(len(self.memory), 0x10000)
+
+    def test_poke_and_peek(self):
+        self.memory.poke(0x4000, 0x80)
+        assert_equals(self.memory.peek(0x4000), 0x80)
+        assert_equals(self.memory[0x4000], 0x80)
+
+    def test_poke_out_of_range_value(self):
+        with assert_raises(MemoryException):
+            self.memory.poke(1, 0x100)
+
+    def test_screen_view_shares_memory(self):
+        self.memory[0x4000] = 0x12
+        self.memory[0x5aff] = 0x34
+        screen = self.memory.screen
+        assert_equals(len(screen), 0x1b00)
+        assert_equals(bytearray(screen[0:1])[0], 0x12)
+        assert_equals(bytearray(screen[0x1aff:0x1b00])[0], 0x34)
+
+    def test_protected_rom_ignores_writes(self):
+        self.memory[0x3fff] = 0x01
+        self.memory.protect_rom()
+
+        self.memory[0x3fff] = 0x02
+        self.memory[0x4000] = 0x03
+
+        assert_equals(self.memory[0x3fff], 0x01)
+        assert_equals(self.memory[0x4000], 0x03)
+
+    def test_slice_writes_use_page_handlers(self):
+        self.memory.protect_rom()
+
+        self.memory[0x3ffe:0x4002] = [0x01, 0x02, 0x03, 0x04]
+
+        assert_equals(list(self.memory[0x3ffe:0x4002]), [0x00, 0x00, 0x03, 0x04])
+
+    def test_slice_writes_to_plain_pages_bypass_handlers(self):
+        writes = []
+        self.memory.set_write_handler(2, lambda address, value: writes.append((address, value)))
+
+        self.memory[0x7ffe:0x8002] = bytearray([0x01, 0x02, 0x03, 0x04])
+
+        assert_equals(list(self.memory[0x7ffe:0x8002]), [0x01, 0x02, 0x00, 0x00])
+        assert_equals(writes, [(0x8000, 0x03), (0x8001, 0x04)])
+
+    def test_slice_writes_use_block_handler_when_page_has_one(self):
+        blocks = []
+        self.memory.set_write_handler(2, lambda address, value: None,
+                                      lambda start, data: blocks.append((start, list(data))))
+
+        self.memory[0x8000:0x8003] = [0x01, 0x02, 0x03]
+
+        assert_equals(blocks, [(0x8000, [0x01, 0x02, 0x03])])
+
+    def test_slice_write_of_different_length_raises(self):
+        with assert_raises(ValueError):
+            self.memory[0x4000:0x4004] = [0x01, 0x02]
+
+        assert_equals(len(self.memory), 0x10000)
+
+    def test_write_handler_receives_writes_to_its_page(self):
+        writes = []
+        self.memory.set_write_handler(3, lambda address, value: writes.append((address, value)))
+
+        self.memory[0xc000] = 0x12
+
+        assert_equals(writes, [(0xc000, 0x12)])
+        assert_equals(self.memory[0xc000], 0x00)
+
+    def test_rom_and_ram_views_cover_address_space(self):
+        assert_equals(len(self.memory.rom), 0x4000)
+        assert_equals(len(self.memory.ram), 0xc000)
+
+
+class TestPagedMemory:
+    def setup(self):
+        self.memory = PagedMemory()
+
+    def test_default_mapping(self):
+        self.memory[0x4000] = 0x05
+        self.memory[0x8000] = 0x02
+        self.memory[0xc000] = 0x00
+
+        assert_equals(self.memory.banks[5][0x0000], 0x05)
+        assert_equals(self.memory.banks[2][0x0000], 0x02)
+        assert_true(self.memory.slots[3] is self.memory.banks[0])
+
+    def test_select_pages_maps_bank_into_top_slot(self):
+        self.memory.select_pages(0x03)
+        self.memory[0xffff] = 0x33
+
+        assert_true(self.memory.slots[3] is self.memory.banks[3])
+        assert_equals(self.memory.banks[3][0x3fff], 0x33)
+
+        self.memory.select_pages(0x00)
+        assert_equals(self.memory[0xffff], 0x00)
+
+    def test_select_pages_switches_rom_and_screen(self):
+        self.memory.roms[1][0x0000] = 0x48
+
+        self.memory.select_pages(0x18)
+
+        assert_equals(self.memory[0x0000], 0x48)
+        assert_equals(len(self.memory.screen), 0x1b00)
+        assert_true(self.memory.screen is self.memory.screens[7])
+
+    def test_writes_to_rom_are_ignored(self):
+        self.memory[0x0000] = 0x12
+        assert_equals(self.memory[0x0000], 0x00)
+
+    def test_paging_can_be_locked(self):
+        self.memory.select_pages(0x21)
+        self.memory.select_pages(0x04)
+
+        assert_true(self.memory.slots[3] is self.memory.banks[1])
+
+
+    def test_write_handler_receives_writes_to_its_page(self):
+        writes = []
+        self.memory.set_write_handler(2, lambda address, value: writes.append((address, value)))
+
+        self.memory[0x8000] = 0x12
+
+        assert_equals(writes, [(0x8000, 0x12)])
+        assert_equals(self.memory.banks[2][0x0000], 0x00)
+
+    def test_write_ram_writes_to_selected_bank(self):
+        self.memory.select_pages(0x04)
+
+        self.memory.write_ram(0xc001, 0x44)
+
+        assert_equals(self.memory.banks[4][0x0001], 0x44)
+
+    def test_slices_span_slots(self):
+        self.memory.select_pages(0x01)
+
+        self.memory[0xbffe:0xc002] = [0x01, 0x02, 0x03, 0x04]
+
+        assert_equals(list(self.memory[0xbffe:0xc002]), [0x01, 0x02, 0x03, 0x04])
+        assert_equals(list(self.memory.banks[1][0x0000:0x0002]), [0x03, 0x04])
+
+    def test_paging_handlers_receive_changed_pages(self):
+        pages = []
+        self.memory.add_paging_handler(pages.append)
+
+        self.memory.select_pages(0x03)
+        self.memory.select_pages(0x13)
+
+        assert_equals(pages, [3, 0])
+
+
 def _this_directory():
     return os.path.dirname(os.path.abspath(__file__))
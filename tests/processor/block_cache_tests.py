@@ -0,0 +1,204 @@
+from nose.tools import assert_equals, assert_true
+
+from memory.memory import PagedMemory
+from z80.block_cache import COMPILE_THRESHOLD, MAX_BLOCK_T_STATES
+from z80.processor import Processor
+from processor_tests import TestHelper, StubbedIO
+
+
+class TestBlockCache(TestHelper):
+    def given_program_at(self, address, *args):
+        self.given_program_counter_is(address)
+        self.given_next_instruction_is(*args)
+        self.given_program_counter_is(address)
+
+    def run_blocks(self, blocks):
+        total_t_states = 0
+        total_instructions = 0
+        for _ in xrange(blocks):
+            self.processor.repeat_t_state_budget = MAX_BLOCK_T_STATES
+            t_states, instructions = self.processor.run_block()
+            total_t_states += t_states
+            total_instructions += instructions
+        return total_t_states, total_instructions
+
+    def single_step_reference(self, program, instructions):
+        reference = TestBlockCache()
+        reference.given_program_at(0x8000, program)
+        t_states = 0
+        for _ in xrange(instructions):
+            t_states += reference.processor.execute()
+        return reference, t_states
+
+    def test_compiled_blocks_match_single_stepping(self):
+        # given
+        program = [0x21, 0x00, 0x90, 0x06, 0x20, 0x3c, 0x77, 0x23, 0x10, 0xfb, 0x18, 0xf5]
+        self.given_program_at(0x8000, program)
+
+        # when
+        t_states, instructions = self.run_blocks(100)
+
+        # then
+        reference, reference_t_states = self.single_step_reference(program, instructions)
+        assert_true(len(self.processor.block_cache.blocks) > 0)
+        assert_equals(t_states, reference_t_states)
+        assert_equals(list(self.processor.registers), list(reference.processor.registers))
+        assert_equals(self.processor.condition('z'), reference.processor.condition('z'))
+        assert_equals(self.memory[0x9000:0x9020], reference.memory[0x9000:0x9020])
+
+    def test_inlined_operations_match_single_stepping(self):
+        # given
+        program = [0x01, 0x10, 0x03,         # ld bc, 0x0310
+                   0x11, 0x00, 0x90,         # ld de, 0x9000
+                   0x1a,                     # ld a, (de)
+                   0x81,                     # add a, c
+                   0xce, 0x11,               # adc a, 0x11
+                   0x90,                     # sub b
+                   0x9e,                     # sbc a, (hl)
+                   0xe6, 0xf7,               # and 0xf7
+                   0xb2,                     # or d
+                   0xab,                     # xor e
+                   0xfe, 0x80,               # cp 0x80
+                   0x38, 0x01,               # jr c, +1
+                   0x3c,                     # inc a
+                   0x12,                     # ld (de), a
+                   0x13,                     # inc de
+                   0x0d,                     # dec c
+                   0xc2, 0x06, 0x80,         # jp nz, 0x8006
+                   0x10, 0xe9,               # djnz 0x8006
+                   0x0e, 0x10,               # ld c, 0x10
+                   0x18, 0xe5]               # jr 0x8006
+        self.given_program_at(0x8000, program)
+
+        # when
+        t_states, instructions = self.run_blocks(200)
+
+        # then
+        reference, reference_t_states = self.single_step_reference(program, instructions)
+        assert_true(len(self.processor.block_cache.blocks) > 0)
+        assert_equals(t_states, reference_t_states)
+        assert_equals(self.processor.get_16bit_reg('af'), reference.processor.get_16bit_reg('af'))
+        assert_equals(list(self.processor.registers), list(reference.processor.registers))
+        assert_equals(self.memory[0x9000:0x9400], reference.memory[0x9000:0x9400])
+
+    def test_self_looping_block_stays_within_budget(self):
+        # given
+        self.given_program_at(0x8000, 0x3c, 0xc3, 0x00, 0x80)
+        self.run_blocks(COMPILE_THRESHOLD)
+
+        # when
+        self.processor.repeat_t_state_budget = 1000
+        t_states, instructions = self.processor.run_block()
+
+        # then
+        assert_true(900 < t_states <= 1000)
+        assert_equals(t_states, instructions / 2 * 14)
+
+    def test_write_to_compiled_code_invalidates_block(self):
+        # given
+        self.given_program_at(0x8000, 0x3e, 0x01, 0xc3, 0x00, 0x80)
+        self.run_blocks(COMPILE_THRESHOLD + 1)
+
+        # when
+        self.memory[0x8001] = 0x02
+        self.run_blocks(1)
+
+        # then
+        self.assert_register('a').equals(0x02)
+
+    def test_block_rewriting_its_own_code_stops_running_stale_ops(self):
+        # given
+        program = [0x3a, 0x08, 0x80,   # ld a, (0x8008)
+                   0xee, 0x0c,         # xor 0x0c
+                   0x32, 0x08, 0x80,   # ld (0x8008), a
+                   0x00,               # nop / inc c
+                   0x04,               # inc b
+                   0xc3, 0x00, 0x80]   # jp 0x8000
+        self.given_program_at(0x8000, program)
+
+        # when
+        t_states, instructions = self.run_blocks(COMPILE_THRESHOLD + 2)
+
+        # then
+        reference, reference_t_states = self.single_step_reference(program, instructions)
+        assert_equals(t_states, reference_t_states)
+        assert_equals(list(self.processor.registers), list(reference.processor.registers))
+        assert_equals(self.memory[0x8008], reference.memory[0x8008])
+
+    def test_port_write_starts_a_new_block(self):
+        # given
+        self.given_program_at(0x8000, 0x3c, 0xd3, 0xfe, 0x18, 0xfb)
+
+        # when
+        counts = [self.run_blocks(1)[1] for _ in xrange(2 * COMPILE_THRESHOLD + 2)]
+
+        # then
+        assert_equals(counts, [1, 2] * (COMPILE_THRESHOLD + 1))
+
+    def test_compiled_block_is_not_run_past_budget(self):
+        # given
+        self.given_program_at(0x8000, 0x00, 0x00, 0x00, 0xc3, 0x00, 0x80)
+        self.run_blocks(COMPILE_THRESHOLD + 1)
+
+        # when
+        self.processor.repeat_t_state_budget = 10
+        t_states, instructions = self.processor.run_block()
+
+        # then
+        assert_equals((t_states, instructions), (4, 1))
+
+    def test_paging_invalidates_blocks_in_switched_page(self):
+        # given
+        memory = PagedMemory()
+        memory.banks[0][0x0000:0x0004] = bytearray([0x3c, 0xc3, 0x00, 0xc0])
+        memory.banks[1][0x0000:0x0004] = bytearray([0x3d, 0xc3, 0x00, 0xc0])
+        processor = Processor(memory, StubbedIO())
+        processor.special_registers['pc'] = 0xc000
+        processor.repeat_t_state_budget = MAX_BLOCK_T_STATES
+        for _ in xrange(COMPILE_THRESHOLD + 1):
+            processor.run_block()
+        before = processor.main_registers['a']
+
+        # when
+        memory.select_pages(0x01)
+        processor.run_block()
+
+        # then
+        assert_equals(processor.main_registers['a'], before - 1)
+
+    def test_block_write_to_compiled_code_invalidates_block(self):
+        # given
+        self.given_program_at(0x8000, 0x3c, 0xc3, 0x00, 0x80)
+        self.run_blocks(COMPILE_THRESHOLD + 1)
+        before = self.processor.main_registers['a']
+
+        # when
+        self.memory.write_block(0x7ff0, bytearray(0x11) + bytearray([0x3d]))
+        self.run_blocks(1)
+
+        # then
+        self.assert_register('a').equals(before - 1)
+
+    def test_ld_a_r_in_compiled_block_sees_refresh_count(self):
+        # given
+        program = [0x00, 0x00, 0xed, 0x5f, 0xc3, 0x00, 0x80]
+        self.given_program_at(0x8000, program)
+
+        # when
+        t_states, instructions = self.run_blocks(2 * COMPILE_THRESHOLD + 1)
+
+        # then
+        reference, reference_t_states = self.single_step_reference(program, instructions)
+        assert_equals(t_states, reference_t_states)
+        self.assert_register('a').equals(reference.processor.main_registers['a'])
+        self.assert_special_register('r').equals(reference.processor.special_registers['r'])
+
+    def test_run_block_single_steps_without_write_handlers(self):
+        # given
+        processor = Processor([0x00] * 0x10000, StubbedIO())
+
+        # when
+        t_states, instructions = processor.run_block()
+
+        # then
+        assert_equals((t_states, instructions), (4, 1))
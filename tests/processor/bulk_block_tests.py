@@ -0,0 +1,93 @@
+from nose.tools import assert_equals
+
+from processor_tests import TestHelper
+
+
+class TestBulkBlockOperations(TestHelper):
+    def given_program(self, helper, op_code, registers, memory):
+        for register_pair, value in registers:
+            helper.given_register_pair_contains_value(register_pair, value)
+        for address, data in memory:
+            helper.memory[address:address + len(data)] = bytearray(data)
+        helper.given_register_contains_value('r', 0x7e)
+        helper.given_program_counter_is(0x0100)
+        helper.given_next_instruction_is(0xed, op_code)
+
+    def run_to_completion(self, helper, budget, bulk):
+        t_states = 0
+        while t_states < budget and helper.processor.special_registers['pc'] == 0x0100:
+            if bulk:
+                helper.processor.repeat_t_state_budget = budget - t_states
+            t_states += helper.processor.execute()
+        return t_states
+
+    def check_bulk_matches_single_step(self, op_code, registers, memory, budget=100000):
+        # given
+        self.given_program(self, op_code, registers, memory)
+        reference = TestHelper()
+        self.given_program(reference, op_code, registers, memory)
+
+        # when
+        t_states = self.run_to_completion(self, budget, True)
+
+        # then
+        reference_t_states = self.run_to_completion(reference, budget, False)
+        assert_equals(t_states, reference_t_states)
+        assert_equals(list(self.processor.registers), list(reference.processor.registers))
+        assert_equals(self.memory, reference.memory)
+
+    def test_bulk_block_operations_match_single_stepping(self):
+        values = [
+            (0xb0, [('hl', 0x8000), ('de', 0x9000), ('bc', 0x0400)], [(0x8000, range(0, 0x100) * 4)]),
+            (0xb0, [('hl', 0x4000), ('de', 0x4001), ('bc', 0x1aff)], [(0x4000, [0xaa])]),
+            (0xb0, [('hl', 0x8000), ('de', 0x8003), ('bc', 0x0010)], [(0x8000, [0x01, 0x02, 0x03])]),
+            (0xb0, [('hl', 0xfff0), ('de', 0x7ff8), ('bc', 0x0020)], [(0xfff0, range(0, 0x10))]),
+            (0xb8, [('hl', 0x80ff), ('de', 0x90ff), ('bc', 0x0100)], [(0x8000, range(0, 0x100))]),
+            (0xb8, [('hl', 0x8010), ('de', 0x800f), ('bc', 0x0010)], [(0x8010, [0x55])]),
+            (0xb1, [('hl', 0x8000), ('bc', 0x0100), ('af', 0x4200)], [(0x8000, range(0, 0x100))]),
+            (0xb1, [('hl', 0x8000), ('bc', 0x0100), ('af', 0x4200)], [(0x8000, [0x00] * 0x100)]),
+            (0xb9, [('hl', 0x80ff), ('bc', 0x0100), ('af', 0x4200)], [(0x8000, range(0, 0x100))]),
+            (0xb9, [('hl', 0x0004), ('bc', 0x0010), ('af', 0x4200)], [])
+        ]
+
+        for op_code, registers, memory in values:
+            yield self.check_bulk_matches_single_step, op_code, registers, memory
+
+    def test_bulk_transfer_is_limited_by_t_state_budget(self):
+        self.check_bulk_matches_single_step(0xb0, [('hl', 0x4000), ('de', 0x4001), ('bc', 0x1aff)],
+                                            [(0x4000, [0xaa])], 1000)
+        self.assert_pc_address().equals(0x0100)
+
+    def test_bulk_transfer_respects_write_handlers(self):
+        # given
+        self.given_register_pair_contains_value('hl', 0x3ff0)
+        self.given_register_pair_contains_value('de', 0x3ff8)
+        self.given_register_pair_contains_value('bc', 0x0010)
+        self.memory[0x3ff0:0x4000] = bytearray(range(0, 0x10))
+        self.memory.protect_rom()
+        self.given_program_counter_is(0x8000)
+        self.given_next_instruction_is(0xed, 0xb0)
+        self.processor.repeat_t_state_budget = 100000
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 15 * 21 + 16)
+        self.assert_memory(0x3ff8).contains(0x08)
+        self.assert_memory(0x4000).contains(0x08)
+        self.assert_memory(0x4007).contains(0x0f)
+
+    def test_no_bulk_transfer_without_budget(self):
+        # given
+        self.given_register_pair_contains_value('hl', 0x8000)
+        self.given_register_pair_contains_value('de', 0x9000)
+        self.given_register_pair_contains_value('bc', 0x0010)
+        self.given_next_instruction_is(0xed, 0xb0)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 21)
+        self.assert_register_pair('bc').equals(0x000f)
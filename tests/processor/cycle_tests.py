@@ -323,7 +323,7 @@ class TestCycles(TestHelper):
         t_states = self.processor.execute()
 
         # then
-        assert_equals(t_states, 5)
+        assert_equals(t_states, 17)
 
     def test_execute_returns_correct_number_of_tstates_for_call_z_when_z_is_reset(self):
         # given
@@ -334,7 +334,7 @@ class TestCycles(TestHelper):
         t_states = self.processor.execute()
 
         # then
-        assert_equals(t_states, 3)
+        assert_equals(t_states, 10)
 
     def test_execute_returns_correct_number_of_tstates_for_ret_z_when_z_is_set(self):
         # given
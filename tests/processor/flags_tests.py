@@ -0,0 +1,48 @@
+from nose.tools import assert_equals
+
+from z80.flags import *
+from z80.funcs import bitwise_add, bitwise_sub, has_parity, to_signed
+
+
+class TestFlags:
+    def test_add_table_matches_bitwise_add(self):
+        for a in xrange(0x100):
+            for operand in xrange(0x100):
+                for carry in (0, 1):
+                    result, half_carry, full_carry = bitwise_add(a, (operand + carry) & 0xff)
+                    entry = ADD_TABLE[(a << 9) | (operand << 1) | carry]
+                    assert_equals(entry & 0xff, result)
+                    assert_equals(entry >> 8, self.expected_flags(a, result, half_carry, full_carry, False))
+
+    def test_sub_table_matches_bitwise_sub(self):
+        for a in xrange(0x100):
+            for operand in xrange(0x100):
+                for carry in (0, 1):
+                    result, half_borrow, full_borrow = bitwise_sub(a, (operand + carry) & 0xff)
+                    entry = SUB_TABLE[(a << 9) | (operand << 1) | carry]
+                    assert_equals(entry & 0xff, result)
+                    assert_equals(entry >> 8, self.expected_flags(a, result, half_borrow, full_borrow, True))
+
+    def test_szp_table(self):
+        for value in xrange(0x100):
+            flags = SZP_FLAGS[value]
+            assert_equals(flags & 0x80 != 0, to_signed(value) < 0)
+            assert_equals(flags & 0x40 != 0, value == 0)
+            assert_equals(flags & 0x04 != 0, has_parity(value))
+
+    @staticmethod
+    def expected_flags(a, result, half_carry, full_carry, subtract):
+        flags = 0
+        if to_signed(result) < 0:
+            flags |= 0x80
+        if result == 0:
+            flags |= 0x40
+        if half_carry:
+            flags |= 0x10
+        if (to_signed(a) < 0) != (to_signed(result) < 0):
+            flags |= 0x04
+        if subtract:
+            flags |= 0x02
+        if full_carry:
+            flags |= 0x01
+        return flags
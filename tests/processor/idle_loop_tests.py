@@ -0,0 +1,75 @@
+from nose.tools import assert_equals, assert_true
+
+from processor_tests import TestHelper, StubbedIO
+from spectrum.clock import FrameClock
+from z80.idle_loop import IdleLoopDetector
+
+
+class TestIdleLoopDetector(TestHelper):
+    def given_detector(self, helper):
+        helper.clock = FrameClock()
+        detector = IdleLoopDetector(helper.clock)
+        detector.attach(helper.processor)
+        return detector
+
+    def run_for(self, helper, budget):
+        clock = helper.clock
+        while clock.t_states < budget:
+            helper.processor.repeat_t_state_budget = budget - clock.t_states
+            clock.t_states += helper.processor.execute()
+
+    def check_against_single_stepping(self, program, budget=10000):
+        # given
+        detector = self.given_detector(self)
+        self.given_next_instruction_is(program)
+        reference = TestHelper()
+        reference.clock = FrameClock()
+        reference.given_next_instruction_is(program)
+
+        # when
+        self.run_for(self, budget)
+
+        # then
+        self.run_for(reference, budget)
+        assert_equals(self.clock.t_states, reference.clock.t_states)
+        assert_equals(list(self.processor.registers), list(reference.processor.registers))
+        assert_equals(self.memory, reference.memory)
+        return detector
+
+    def test_polling_loop_is_fast_forwarded(self):
+        detector = self.check_against_single_stepping([0x3a, 0x00, 0x90,   # ld a, (0x9000)
+                                                       0xa7,               # and a
+                                                       0x28, 0xfa])        # jr z, -6
+        assert_true(detector.skipped_t_states > 9000)
+
+    def test_spin_loop_is_fast_forwarded(self):
+        detector = self.check_against_single_stepping([0x18, 0xfe])
+        assert_true(detector.skipped_t_states > 9000)
+
+    def test_loop_changing_memory_is_not_fast_forwarded(self):
+        detector = self.check_against_single_stepping([0x21, 0x00, 0x90,   # ld hl, 0x9000
+                                                       0x34,               # inc (hl)
+                                                       0xc3, 0x03, 0x00])  # jp 0x0003
+        assert_equals(detector.skipped_t_states, 0)
+
+    def test_loop_rewriting_same_value_is_fast_forwarded(self):
+        detector = self.check_against_single_stepping([0x32, 0x00, 0x90,   # ld (0x9000), a
+                                                       0xc3, 0x00, 0x00])  # jp 0x0000
+        assert_true(detector.skipped_t_states > 9000)
+
+    def test_block_port_transfers_count_as_side_effects(self):
+        # given
+        detector = IdleLoopDetector(FrameClock())
+        io = detector.watch_io(StubbedIO())
+
+        # when
+        io.write_block(0xfe, 0x02, [0x01, 0x02])
+        io.read_block(0xfe, 0x02, 2)
+
+        # then
+        assert_equals(detector.side_effects, 2)
+
+    def test_counting_loop_is_not_fast_forwarded(self):
+        detector = self.check_against_single_stepping([0x3c,               # inc a
+                                                       0x18, 0xfd])        # jr -3
+        assert_equals(detector.skipped_t_states, 0)
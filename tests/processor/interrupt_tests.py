@@ -2,7 +2,7 @@ from unittest import SkipTest
 
 from nose.tools import assert_equals, assert_false, assert_true
 from processor_tests import TestHelper
-from z80.processor import InterruptRequest
+from z80.processor import InterruptRequest, STOP_T_STATES
 
 
 class AckReceiver:
@@ -131,10 +131,89 @@ class TestInterrupts(TestHelper):
         raise SkipTest()
 
     def test_im0_invoked_when_maskable_interrupts_enabled(self):
-        raise SkipTest()
+        # given
+        self.maskable_interrupts_are_enabled()
+        self.given_stack_pointer_is(0xffff)
+
+        self.maskable_interrupt_mode_is(0)
+        self.given_next_instruction_is(0xcb, 0xc0)
+
+        ack_receiver = AckReceiver()
+        self.processor.interrupt(InterruptRequest(ack_receiver.acknowledge, lambda: 0xd7))
+
+        # when
+        self.processor.execute()
+
+        # then
+        assert_true(ack_receiver.ack)
+        self.assert_pc_address().equals(0x0010)
+        self.assert_stack_pointer().equals(0xfffd)
+        self.assert_memory(0xfffd).contains(0x04)
+        self.assert_memory(0xfffe).contains(0x00)
+        self.assert_register('b').equals(0)
 
     def test_im0_not_invoked_when_maskable_interrupts_disabled(self):
-        raise SkipTest()
+        # given
+        self.maskable_interrupts_are_disabled()
+        self.given_stack_pointer_is(0xffff)
+
+        self.maskable_interrupt_mode_is(0)
+        self.given_next_instruction_is(0xcb, 0xc0)
+
+        ack_receiver = AckReceiver()
+        self.processor.interrupt(InterruptRequest(ack_receiver.acknowledge, lambda: 0xd7))
+
+        # when
+        self.processor.execute()
+
+        # then
+        assert_false(ack_receiver.ack)
+        self.assert_stack_pointer().equals(0xffff)
+        self.assert_register('b').equals(0x01)
+
+    def test_im0_without_data_executes_rst_38(self):
+        # given
+        self.maskable_interrupts_are_enabled()
+        self.given_stack_pointer_is(0xffff)
+        self.maskable_interrupt_mode_is(0)
+        self.processor.set_int_line(True)
+
+        # when
+        self.processor.execute()
+
+        # then
+        self.assert_pc_address().equals(0x0038)
+
+    def test_im2_response_is_reused(self):
+        # given
+        self.maskable_interrupts_are_enabled()
+        self.given_stack_pointer_is(0xffff)
+        self.maskable_interrupt_mode_is(2)
+        self.given_register_contains_value('i', 0xb0)
+        self.memory[0xb000] = 0xef
+        self.memory[0xb001] = 0xbe
+        self.given_register_contains_value('r', 0x00)
+        response_op = self.processor.im2_response_op
+
+        # when
+        self.an_im2_interrupt_is_generated()
+        operation, _, _ = self.processor.get_operation(0x0000)
+
+        # then
+        assert_true(operation is response_op)
+        assert_equals(operation.address, 0xbeef)
+
+    def test_pending_requests_are_bounded(self):
+        # given
+        self.maskable_interrupts_are_disabled()
+
+        # when
+        for _ in range(0, 100):
+            self.an_im1_interrupt_is_generated()
+
+        # then
+        assert_equals(len(self.processor.interrupt_controller.requests), 16)
+        assert_equals(self.processor.interrupt_controller.dropped_requests, 84)
 
     def test_im1_invoked_when_maskable_interrupts_enabled(self):
         # given
@@ -360,6 +439,80 @@ class TestInterrupts(TestHelper):
         self.assert_register('a').equals(3)
         self.assert_register('b').equals(1)
 
+    def test_int_line_is_level_triggered(self):
+        # given
+        self.maskable_interrupts_are_enabled()
+        self.maskable_interrupt_mode_is(1)
+        self.given_stack_pointer_is(0x8000)
+        self.given_next_instruction_is(0x3c)
+        self.processor.set_int_line(True)
+
+        # when
+        self.processor.execute()
+
+        # then
+        self.assert_pc_address().equals(0x0038)
+        assert_false(self.processor.iff[0])
+        assert_false(self.processor.iff[1])
+        assert_equals(len(self.processor.interrupt_controller.requests), 0)
+
+    def test_released_int_line_is_ignored(self):
+        # given
+        self.maskable_interrupts_are_enabled()
+        self.maskable_interrupt_mode_is(1)
+        self.given_next_instruction_is(0x3c)
+        self.processor.set_int_line(True)
+        self.processor.set_int_line(False)
+
+        # when
+        self.processor.execute()
+
+        # then
+        self.assert_register('a').equals(0x01)
+
+    def test_halt_holds_pc_and_refreshes_memory(self):
+        # given
+        self.given_register_contains_value('r', 0x00)
+        self.given_next_instruction_is(0x76)
+
+        # when
+        for _ in range(0, 4):
+            self.processor.execute()
+
+        # then
+        self.assert_pc_address().equals(0x0001)
+        self.assert_special_register('r').equals(0x04)
+
+    def test_halt_skips_to_end_of_run_budget(self):
+        # given
+        self.given_register_contains_value('r', 0x00)
+        self.given_next_instruction_is(0x76)
+
+        # when
+        t_states, reason = self.processor.run(1000)
+
+        # then
+        assert_equals((t_states, reason), (1000, STOP_T_STATES))
+        self.assert_pc_address().equals(0x0001)
+        self.assert_special_register('r').equals(250 & 0x7f)
+
+    def test_halt_is_left_for_interrupt_during_run(self):
+        # given
+        self.maskable_interrupts_are_enabled()
+        self.maskable_interrupt_mode_is(1)
+        self.given_stack_pointer_is(0x8000)
+        self.given_next_instruction_is(0x76)
+        self.processor.execute()
+        self.processor.set_int_line(True)
+
+        # when
+        t_states, reason = self.processor.run(1000)
+
+        # then
+        assert_equals(reason, STOP_T_STATES)
+        assert_false(self.processor.halting)
+        self.assert_memory(0x7ffe).contains(0x05)
+
     def maskable_interrupts_are_enabled(self):
         self.given_next_instruction_is(0xfb)
         self.processor.execute()
@@ -1,4 +1,8 @@
+from nose.tools import assert_equals
+
 from processor_tests import TestHelper
+from z80.io import IO
+from z80.processor import Processor
 
 
 class TestIO(TestHelper):
@@ -422,4 +426,74 @@ class TestIO(TestHelper):
         self.assert_register('b').equals(0x0f)
         self.assert_register_pair('hl').equals(0xbeee)
         self.assert_flag('z').is_set()
-        self.assert_flag('n').is_set()
\ No newline at end of file
+        self.assert_flag('n').is_set()
+    def given_block_io(self, values):
+        block_io = BlockIO(values)
+        self.processor = Processor(self.memory, block_io)
+        return block_io
+
+    def test_inir_reads_whole_block_in_one_call_when_budget_allows(self):
+        # given
+        block_io = self.given_block_io(range(0x10, 0x20))
+        self.processor.repeat_t_state_budget = 1000
+
+        self.given_register_contains_value('b', 0x10)
+        self.given_register_contains_value('c', 0xef)
+        self.given_register_pair_contains_value('hl', 0xbeef)
+        self.given_next_instruction_is(0xed, 0xb2)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 15 * 21 + 16)
+        assert_equals(block_io.block_reads, [(0xef, 0x10, 15)])
+        assert_equals(block_io.reads, [(0xef, 0x01)])
+        assert_equals(list(self.memory[0xbeef:0xbeff]), range(0x10, 0x20))
+        self.assert_pc_address().equals(0x0002)
+        self.assert_register('b').equals(0x00)
+        self.assert_register_pair('hl').equals(0xbeff)
+
+    def test_otdr_writes_whole_block_in_one_call_when_budget_allows(self):
+        # given
+        block_io = self.given_block_io([])
+        self.processor.repeat_t_state_budget = 1000
+
+        self.given_register_contains_value('b', 0x03)
+        self.given_register_contains_value('c', 0xef)
+        self.given_register_pair_contains_value('hl', 0xbeef)
+        self.memory[0xbeed:0xbef0] = bytearray([0x01, 0x02, 0x03])
+        self.given_next_instruction_is(0xed, 0xbb)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 2 * 21 + 16)
+        assert_equals(block_io.writes, [(0xef, 0x02, 0x03), (0xef, 0x01, 0x02), (0xef, 0x00, 0x01)])
+        assert_equals(len(block_io.block_writes), 1)
+        self.assert_register_pair('hl').equals(0xbeec)
+
+
+class BlockIO(IO):
+    def __init__(self, values):
+        self.values = list(values)
+        self.reads = []
+        self.writes = []
+        self.block_reads = []
+        self.block_writes = []
+
+    def read(self, port, high_byte):
+        self.reads.append((port, high_byte))
+        return self.values.pop(0)
+
+    def write(self, port, high_byte, value):
+        self.writes.append((port, high_byte, value))
+
+    def read_block(self, port, high_byte, count):
+        self.block_reads.append((port, high_byte, count))
+        return [self.values.pop(0) for _ in xrange(0, count)]
+
+    def write_block(self, port, high_byte, values):
+        self.block_writes.append((port, high_byte, values))
+        IO.write_block(self, port, high_byte, values)
@@ -0,0 +1,44 @@
+from random import Random
+
+from nose.tools import assert_equals
+
+from z80.processor import Processor
+from processor_tests import StubbedIO
+
+OPCODES = [op for op in range(0x40, 0xc0) if not 0x70 <= op <= 0x77] + [
+    0x04, 0x05, 0x0c, 0x0d, 0x14, 0x15, 0x1c, 0x1d, 0x24, 0x25, 0x2c, 0x2d, 0x3c, 0x3d,
+    0x07, 0x0f, 0x17, 0x1f, 0x27, 0x2f, 0x37, 0x3f, 0x08, 0xd9, 0xeb, 0xf5, 0xf1, 0xc5, 0xc1,
+    0x03, 0x0b, 0x23, 0x2b
+]
+
+
+class TestLazyFlags:
+    def test_lazy_flags_match_eager_flags(self):
+        for seed in range(0, 20):
+            yield self.check_program, seed
+
+    def check_program(self, seed):
+        # given
+        random = Random(seed)
+        program = [random.choice(OPCODES) for _ in range(0, 200)]
+        initial_registers = [random.randint(0x00, 0xff) for _ in range(0, 16)]
+
+        # when
+        eager = self.run_program(program, initial_registers, False)
+        lazy = self.run_program(program, initial_registers, True)
+
+        # then
+        assert_equals(lazy.main_registers.items(), eager.main_registers.items())
+        assert_equals(lazy.alternate_registers.items(), eager.alternate_registers.items())
+        assert_equals(lazy.special_registers.items(), eager.special_registers.items())
+
+    @staticmethod
+    def run_program(program, initial_registers, lazy_flags):
+        memory = [0x00] * 0x10000
+        memory[0:len(program)] = program
+        processor = Processor(memory, StubbedIO(), lazy_flags=lazy_flags)
+        processor.registers[0:16] = initial_registers
+        processor.special_registers['sp'] = 0x8000
+        for _ in program:
+            processor.execute()
+        return processor
@@ -1,3 +1,4 @@
+import os
 from random import randint
 
 from nose.tools import assert_equals, assert_in
@@ -15,9 +16,9 @@ def random_byte():
 class TestHelper:
     def __init__(self):
         self.instruction_pointer = 0x0
-        self.memory = [0x00] * 0x10000
+        self.memory = Memory()
         self.io = StubbedIO()
-        self.processor = Processor(self.memory, self.io)
+        self.processor = Processor(self.memory, self.io, lazy_flags=os.environ.get('QAOPM_LAZY_FLAGS') == '1')
 
     def given_next_instruction_is(self, *args):
         for arg in args:
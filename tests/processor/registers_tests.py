@@ -0,0 +1,55 @@
+from nose.tools import assert_equals
+
+from z80.registers import *
+
+
+class TestRegisters:
+    def test_views_share_the_register_file(self):
+        # given
+        registers = build_register_file()
+        main_registers = RegisterView(registers, MAIN_REGISTERS)
+        alternate_registers = RegisterView(registers, ALTERNATE_REGISTERS)
+
+        # when
+        main_registers['h'] = 0x12
+        alternate_registers['h'] = 0x34
+        registers[L] = 0x56
+
+        # then
+        assert_equals(registers[H], 0x12)
+        assert_equals(registers[H_ALT], 0x34)
+        assert_equals(main_registers['l'], 0x56)
+
+    def test_view_items_are_in_register_order(self):
+        # given
+        registers = build_register_file()
+        special_registers = RegisterView(registers, SPECIAL_REGISTERS)
+
+        # when
+        registers[PC] = 0x8000
+
+        # then
+        assert_equals(special_registers.items(), [('i', 0x00), ('r', 0x00), ('sp', 0xffff), ('pc', 0x8000)])
+
+    def test_word_registers(self):
+        values = [
+            ('bc', (B, C)),
+            ('hl', (H, L)),
+            ('sp', (SP, None)),
+            ('iy', (IY, None))
+        ]
+
+        for name, expected in values:
+            yield self.check_word_register, name, expected
+
+    def check_word_register(self, name, expected):
+        # given
+        registers = build_register_file()
+        high, low = word_register(name)
+
+        # when
+        set_word(registers, high, low, 0xbeef)
+
+        # then
+        assert_equals((high, low), expected)
+        assert_equals(get_word(registers, high, low), 0xbeef)
@@ -0,0 +1,70 @@
+from nose.tools import assert_equals
+
+from processor_tests import TestHelper
+from spectrum.clock import FrameClock
+from z80.processor import STOP_T_STATES, STOP_PC, STOP_PREDICATE
+
+
+class TestRun(TestHelper):
+    def test_run_stops_once_budget_is_consumed(self):
+        # given
+        self.given_next_instruction_is(0x00, 0x00, 0x00, 0x00)
+
+        # when
+        t_states, reason = self.processor.run(10)
+
+        # then
+        assert_equals((t_states, reason), (12, STOP_T_STATES))
+        self.assert_pc_address().equals(0x0003)
+        self.assert_special_register('r').equals(0x03)
+
+    def test_run_keeps_clock_current_for_port_writes(self):
+        # given
+        clock = FrameClock()
+        clock.t_states = 100
+        write_times = []
+        self.io.write = lambda port, high_byte, value: write_times.append(clock.t_states)
+        self.given_next_instruction_is(0x00, 0x3e, 0x02, 0xd3, 0xfe, 0x00)
+
+        # when
+        t_states, reason = self.processor.run(20, clock)
+
+        # then
+        assert_equals(write_times, [100 + 4 + 7])
+        assert_equals((t_states, clock.t_states), (4 + 7 + 11, 100 + 4 + 7 + 11))
+        assert_equals(self.processor.run_instructions, 3)
+
+    def test_run_until_pc_stops_at_address(self):
+        # given
+        self.given_next_instruction_is(0x06, 0x03, 0x10, 0xfe, 0x3c, 0x00)
+
+        # when
+        t_states, reason = self.processor.run_until(pc=0x0004, t_states=1000)
+
+        # then
+        assert_equals((t_states, reason), (7 + 13 + 13 + 8, STOP_PC))
+        self.assert_register('b').equals(0x00)
+        self.assert_register('a').equals(0x00)
+
+    def test_run_until_predicate_is_checked_after_each_instruction(self):
+        # given
+        self.given_next_instruction_is(0x3c, 0x3c, 0x3c, 0x3c)
+
+        # when
+        t_states, reason = self.processor.run_until(predicate=lambda processor: processor.main_registers['a'] == 2)
+
+        # then
+        assert_equals((t_states, reason), (8, STOP_PREDICATE))
+
+    def test_run_accepts_interrupts_inside_the_loop(self):
+        # given
+        self.given_stack_pointer_is(0x8000)
+        self.given_next_instruction_is(0xed, 0x56, 0xfb, 0x00, 0x18, 0xfe)
+        self.processor.set_int_line(True)
+
+        # when
+        t_states, reason = self.processor.run_until(pc=0x0038, t_states=1000)
+
+        # then
+        assert_equals(reason, STOP_PC)
+        self.assert_memory(0x7ffe).contains(0x04)
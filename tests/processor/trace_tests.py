@@ -0,0 +1,92 @@
+from StringIO import StringIO
+
+from nose.tools import assert_equals, assert_false, assert_in
+
+from processor_tests import TestHelper
+from z80.processor import Processor
+from z80.registers import A, PC
+
+
+class TestTrace(TestHelper):
+    def test_trace_records_state_before_each_instruction(self):
+        # given
+        self.processor.enable_tracing(8)
+        self.given_next_instruction_is(0x3e, 0x12,   # ld a, 0x12
+                                       0x3c)         # inc a
+
+        # when
+        self.processor.execute()
+        self.processor.execute()
+
+        # then
+        entries = list(self.processor.trace.entries())
+        assert_equals(len(entries), 2)
+        pc, opcodes, registers, t_states, op_t_states = entries[1]
+        assert_equals(pc, 0x0002)
+        assert_equals(opcodes, [0x3c, 0x00, 0x00, 0x00])
+        assert_equals(registers[A], 0x12)
+        assert_equals(registers[PC], 0x0002)
+        assert_equals((t_states, op_t_states), (7, 4))
+
+    def test_trace_keeps_most_recent_instructions(self):
+        # given
+        self.processor.enable_tracing(4)
+
+        # when
+        t_states, _ = self.processor.run(40)
+
+        # then
+        assert_equals([entry[0] for entry in self.processor.trace.entries()], [0x0006, 0x0007, 0x0008, 0x0009])
+        assert_equals(t_states, 40)
+
+    def test_dump_lists_entries_oldest_first(self):
+        # given
+        self.processor.enable_tracing(4)
+        self.given_next_instruction_is(0x00, 0x3c)
+        self.processor.execute()
+        self.processor.execute()
+        out = StringIO()
+
+        # when
+        self.processor.trace.dump(out)
+
+        # then
+        lines = out.getvalue().splitlines()
+        assert_equals(len(lines), 2)
+        assert_in(' 0001  3c 00 00 00 ', lines[1])
+
+    def test_disabled_tracing_restores_untraced_execute(self):
+        # given
+        self.processor.enable_tracing(4)
+
+        # when
+        self.processor.disable_tracing()
+        self.processor.execute()
+
+        # then
+        assert_false('execute' in vars(self.processor))
+        assert_equals(self.processor.execute.__func__, Processor.execute.__func__)
+
+    def test_disable_tracing_without_enable_is_harmless(self):
+        # when
+        self.processor.disable_tracing()
+        self.processor.disable_tracing()
+
+        # then
+        assert_false('execute' in vars(self.processor))
+        assert_equals(self.processor.execute(), 4)
+
+    def test_clear_resets_trace_clock(self):
+        # given
+        self.processor.enable_tracing(4)
+        self.processor.execute()
+        self.processor.trace.clear()
+
+        # when
+        self.processor.execute()
+
+        # then
+        entries = list(self.processor.trace.entries())
+        assert_equals(len(entries), 1)
+        assert_equals(entries[0][3], 0)
+        assert_equals(self.processor.trace.total_t_states, 4)
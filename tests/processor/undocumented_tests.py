@@ -0,0 +1,162 @@
+from nose.tools import assert_equals
+
+from processor_tests import TestHelper
+
+
+class TestUndocumented(TestHelper):
+    def test_undefined_ed_op_codes_behave_as_nops(self):
+        for op_code in [0x00, 0x3f, 0x77, 0x80, 0xc0, 0xff]:
+            yield self.check_undefined_ed_op_code, op_code
+
+    def check_undefined_ed_op_code(self, op_code):
+        # given
+        self.given_next_instruction_is(0xed, op_code)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 8)
+        self.assert_pc_address().equals(0x0002)
+
+    def test_dd_prefix_is_ignored_for_unprefixed_op(self):
+        # given
+        self.given_register_contains_value('c', 0x12)
+        self.given_next_instruction_is(0xdd, 0x41)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 8)
+        self.assert_register('b').equals(0x12)
+        self.assert_pc_address().equals(0x0002)
+
+    def test_fd_prefix_is_ignored_for_relative_jump(self):
+        # given
+        self.given_next_instruction_is(0xfd, 0x18, 0x10)
+
+        # when
+        self.processor.execute()
+
+        # then
+        self.assert_pc_address().equals(0x0013)
+
+    def test_fd_prefix_is_ignored_for_call(self):
+        # given
+        self.given_stack_pointer_is(0x8000)
+        self.given_next_instruction_is(0xfd, 0xcd, 0x34, 0x12)
+
+        # when
+        self.processor.execute()
+
+        # then
+        self.assert_pc_address().equals(0x1234)
+        self.assert_memory(0x7ffe).contains(0x04)
+        self.assert_memory(0x7fff).contains(0x00)
+
+    def test_sll_indexed_indirect(self):
+        # given
+        self.given_register_pair_contains_value('ix', 0x1000)
+        self.memory[0x1002] = 0b10000001
+        self.given_next_instruction_is(0xdd, 0xcb, 0x02, 0x36)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 23)
+        self.assert_memory(0x1002).contains(0b00000011)
+        self.assert_flag('c').is_set()
+
+    def test_indexed_cb_op_copies_result_to_register(self):
+        # given
+        self.given_register_pair_contains_value('iy', 0x1000)
+        self.memory[0x0ffe] = 0b00000001
+        self.given_next_instruction_is(0xfd, 0xcb, 0xfe, 0xc8)
+
+        # when
+        self.processor.execute()
+
+        # then
+        self.assert_memory(0x0ffe).contains(0b00000011)
+        self.assert_register('b').equals(0b00000011)
+        self.assert_pc_address().equals(0x0004)
+
+    def test_inc_ixh(self):
+        # given
+        self.given_register_pair_contains_value('ix', 0x7f34)
+        self.given_next_instruction_is(0xdd, 0x24)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 8)
+        self.assert_index_register('ix').equals(0x8034)
+        self.assert_flag('s').is_set()
+        self.assert_flag('p').is_set()
+        self.assert_pc_address().equals(0x0002)
+
+    def test_ld_iyl_immediate(self):
+        # given
+        self.given_register_pair_contains_value('iy', 0x1234)
+        self.given_next_instruction_is(0xfd, 0x2e, 0xab)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 11)
+        self.assert_index_register('iy').equals(0x12ab)
+        self.assert_pc_address().equals(0x0003)
+
+    def test_ld_register_from_index_half(self):
+        # given
+        self.given_register_pair_contains_value('ix', 0x1234)
+        self.given_next_instruction_is(0xdd, 0x45)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 8)
+        self.assert_register('b').equals(0x34)
+
+    def test_ld_index_half_from_index_half(self):
+        # given
+        self.given_register_pair_contains_value('iy', 0x1234)
+        self.given_next_instruction_is(0xfd, 0x65)
+
+        # when
+        self.processor.execute()
+
+        # then
+        self.assert_index_register('iy').equals(0x3434)
+
+    def test_ld_ixh_from_a(self):
+        # given
+        self.given_register_contains_value('a', 0x56)
+        self.given_register_pair_contains_value('ix', 0x1234)
+        self.given_next_instruction_is(0xdd, 0x67)
+
+        # when
+        self.processor.execute()
+
+        # then
+        self.assert_index_register('ix').equals(0x5634)
+
+    def test_sub_index_half(self):
+        # given
+        self.given_register_contains_value('a', 0x10)
+        self.given_register_pair_contains_value('iy', 0x0011)
+        self.given_next_instruction_is(0xfd, 0x95)
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        assert_equals(t_states, 8)
+        self.assert_register('a').equals(0xff)
+        self.assert_flag('c').is_set()
+        self.assert_flag('n').is_set()
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from nose.tools import assert_equals, assert_true
+
+from spectrum.benchmark import BenchmarkResult, run_benchmark
+from spectrum.machine import Machine
+
+
+class TestBenchmark:
+    def setup(self):
+        rom = bytearray(0x4000)
+        rom[0x0000:0x0005] = bytearray([0xd3, 0xfe, 0x3c, 0x18, 0xfb])
+        rom_file, self.rom_file_name = tempfile.mkstemp()
+        os.write(rom_file, bytes(rom))
+        os.close(rom_file)
+        self.spectrum = Machine(self.rom_file_name)
+
+    def teardown(self):
+        os.remove(self.rom_file_name)
+
+    def test_benchmark_runs_requested_frames(self):
+        # when
+        result = run_benchmark(self.spectrum, frames=3)
+
+        # then
+        assert_equals(result.frames, 3)
+        assert_true(result.t_states >= 3 * 69888)
+        assert_true(result.instructions > 0)
+        assert_true(result.render_seconds > 0)
+
+    def test_benchmark_stops_after_requested_t_states(self):
+        # when
+        result = run_benchmark(self.spectrum, t_states=69888 + 1000)
+
+        # then
+        assert_equals(result.frames, 2)
+
+    def test_benchmark_without_rendering(self):
+        # when
+        result = run_benchmark(self.spectrum, frames=1, render=False)
+
+        # then
+        assert_equals(result.render_seconds, 0.0)
+
+    def test_rates_are_zero_when_no_time_elapsed(self):
+        # given
+        result = BenchmarkResult(frames=1, t_states=69888, instructions=100, cpu_seconds=0.0, render_seconds=0.0)
+
+        # then
+        assert_equals(result.emulated_mhz(), 0.0)
+        assert_equals(result.frames_per_second(), 0.0)
+        assert_equals(result.instructions_per_second(), 0.0)
+        assert_true('emulated MHz:      0.000' in str(result))
+
+    def test_headless_mode_does_not_import_pygame(self):
+        # when
+        output = subprocess.check_output([sys.executable, '-c',
+                                          'import sys; import spectrum.benchmark; print("pygame" in sys.modules)'])
+
+        # then
+        assert_equals(output.strip(), 'False')
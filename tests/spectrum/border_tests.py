@@ -0,0 +1,97 @@
+import numpy as np
+from nose.tools import assert_equals, assert_true
+
+from spectrum.border import Border, PIXEL_T_STATES, FIRST_PAPER_T_STATE
+from spectrum.clock import FrameClock
+
+
+class TestBorder:
+    def setup(self):
+        self.clock = FrameClock()
+        self.border = Border(self.clock, 1)
+
+    def test_pixel_t_states_start_at_first_paper_pixel(self):
+        assert_equals(PIXEL_T_STATES[32][32], FIRST_PAPER_T_STATE)
+        assert_equals(PIXEL_T_STATES[34][32], FIRST_PAPER_T_STATE + 1)
+        assert_equals(PIXEL_T_STATES[32][33], FIRST_PAPER_T_STATE + 224)
+        assert_equals(PIXEL_T_STATES[0][0], FIRST_PAPER_T_STATE - 16 - (32 * 224))
+
+    def test_uniform_border_renders_frame_colour(self):
+        # when
+        pixels = self.border.render()
+
+        # then
+        assert_equals(pixels.shape, (320, 256, 3))
+        assert_equals(tuple(pixels[0][0]), (0x00, 0x00, 0xaa))
+        assert_equals(tuple(pixels[319][255]), (0x00, 0x00, 0xaa))
+
+    def test_unchanged_border_is_not_rendered_again(self):
+        # given
+        self.border.render()
+
+        # when
+        pixels = self.border.render()
+
+        # then
+        assert_equals(pixels, None)
+
+    def test_writing_same_colour_logs_no_event(self):
+        # when
+        self.border.write(1)
+
+        # then
+        assert_equals(len(self.border.times), 0)
+
+    def test_colour_changes_take_effect_from_their_t_state(self):
+        # given
+        self.clock.t_states = FIRST_PAPER_T_STATE + (10 * 224)
+        self.border.write(2)
+
+        # when
+        pixels = self.border.render()
+
+        # then
+        assert_equals(tuple(pixels[0][41]), (0x00, 0x00, 0xaa))
+        assert_equals(tuple(pixels[31][42]), (0x00, 0x00, 0xaa))
+        assert_equals(tuple(pixels[32][42]), (0xaa, 0x00, 0x00))
+        assert_equals(tuple(pixels[0][43]), (0xaa, 0x00, 0x00))
+
+    def test_next_frame_starts_with_last_colour(self):
+        # given
+        self.clock.t_states = 1000
+        self.border.write(2)
+        self.border.render()
+
+        # when
+        pixels = self.border.render()
+
+        # then
+        assert_equals(len(self.border.times), 0)
+        assert_equals(tuple(pixels[0][0]), (0xaa, 0x00, 0x00))
+
+    def test_update_display_writes_only_around_screen(self):
+        # given
+        pixels = np.zeros((320, 256, 3), dtype=np.uint8)
+        pixels[:] = (0x12, 0x34, 0x56)
+
+        # when
+        rects = self.border.update_display(pixels)
+
+        # then
+        assert_equals(rects, [(0, 0, 320, 256)])
+        assert_equals(tuple(pixels[0][0]), (0x00, 0x00, 0xaa))
+        assert_equals(tuple(pixels[319][140]), (0x00, 0x00, 0xaa))
+        assert_equals(tuple(pixels[32][32]), (0x12, 0x34, 0x56))
+        assert_true(self.border.update_display(pixels) == [])
+
+    def test_skipped_frame_discards_log_and_keeps_last_colour(self):
+        # given
+        self.clock.t_states = 1000
+        self.border.write(2)
+
+        # when
+        self.border.skip_frame()
+
+        # then
+        assert_equals(len(self.border.times), 0)
+        assert_equals(tuple(self.border.render()[0][0]), (0xaa, 0x00, 0x00))
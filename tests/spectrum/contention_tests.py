@@ -0,0 +1,213 @@
+from nose.tools import assert_equals
+
+from memory.memory import Memory
+from spectrum.contention import ContentionModel, ContendedIO, FIRST_CONTENDED_T_STATE, build_cycle_tables, \
+    build_delay_table
+from tests.processor.processor_tests import StubbedIO
+from z80.processor import Processor
+from z80.registers import B, F
+
+
+class TestContention:
+    def setup(self):
+        self.memory = Memory()
+        self.contention = ContentionModel(self.memory)
+        self.io = StubbedIO()
+        self.processor = Processor(self.memory, ContendedIO(self.io, self.contention))
+        self.contention.attach(self.processor)
+
+    def test_delay_table_follows_ula_pattern(self):
+        delays = build_delay_table()
+
+        assert_equals(delays[FIRST_CONTENDED_T_STATE - 1], 0)
+        assert_equals(list(delays[FIRST_CONTENDED_T_STATE:FIRST_CONTENDED_T_STATE + 8]), [6, 5, 4, 3, 2, 1, 0, 0])
+        assert_equals(delays[FIRST_CONTENDED_T_STATE + 128], 0)
+        assert_equals(delays[FIRST_CONTENDED_T_STATE + 224], 6)
+
+    def test_uncontended_fetch_is_not_delayed(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE
+        self.memory[0x0000] = 0x00
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 4)
+        assert_equals(self.contention.frame_t_state, FIRST_CONTENDED_T_STATE + 4)
+
+    def test_contended_fetch_is_delayed(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE + 1
+        self.processor.special_registers['pc'] = 0x4000
+        self.memory[0x4000] = 0x00
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 9)
+
+    def test_write_to_contended_memory_is_delayed_at_its_own_cycle(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE - 4
+        self.processor.main_registers['h'] = 0x58
+        self.processor.main_registers['l'] = 0x00
+        self.memory[0x0000] = 0x77
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 13)
+        assert_equals(self.memory[0x5800], self.processor.main_registers['a'])
+
+    def test_each_pushed_byte_is_delayed(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE - 5
+        self.processor.special_registers['sp'] = 0x5802
+        self.memory[0x0000] = 0xc5
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 11 + 6 + 5)
+
+    def test_contended_instruction_sequence_timing(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE - 1
+        self.processor.special_registers['pc'] = 0x4000
+        self.memory[0x4000:0x4003] = [0x00, 0x00, 0x00]
+
+        # when
+        t_states = [self.contention.execute() for _ in xrange(3)]
+
+        # then
+        assert_equals(t_states, [4, 7, 8])
+        assert_equals(self.contention.frame_t_state, FIRST_CONTENDED_T_STATE + 18)
+
+    def test_contended_operand_address_read_is_delayed(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE - 10
+        self.memory[0x0000:0x0003] = [0x3a, 0x00, 0x58]
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 13 + 6)
+
+    def test_prefixed_op_code_fetch_is_delayed(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE - 4
+        self.processor.special_registers['pc'] = 0x4000
+        self.memory[0x4000:0x4002] = [0xcb, 0x07]
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 8 + 6)
+
+    def test_internal_cycles_on_contended_address_are_delayed(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE - 8
+        self.processor.special_registers['pc'] = 0x4000
+        self.memory[0x4000:0x4002] = [0x18, 0x00]
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 12 + 6 + 6)
+
+    def test_indexed_read_is_delayed(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE - 16
+        self.processor.index_registers['ix'] = 0x57ff
+        self.memory[0x0000:0x0003] = [0xdd, 0x7e, 0x01]
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 19 + 6)
+
+    def test_cycle_tables_match_instruction_timings(self):
+        unprefixed, cb, ed, indexed, indexed_cb = build_cycle_tables()
+        prefixes = (0xcb, 0xdd, 0xed, 0xfd)
+        for op_code in xrange(0, 0x100):
+            for flags in (0x00, 0xff):
+                if op_code not in prefixes:
+                    self.check_cycle_table([op_code, 0x01, 0x02], unprefixed[op_code], flags)
+                    self.check_cycle_table([0xdd, op_code, 0x01, 0x02], indexed[op_code], flags)
+                self.check_cycle_table([0xcb, op_code], cb[op_code], flags)
+                self.check_cycle_table([0xed, op_code, 0x01, 0x02], ed[op_code], flags)
+                self.check_cycle_table([0xdd, 0xcb, 0x01, op_code], indexed_cb[op_code], flags)
+
+    def check_cycle_table(self, code, entry, flags):
+        # given
+        self.processor.registers[:] = [0] * len(self.processor.registers)
+        self.processor.halting = False
+        self.processor.registers[F] = flags
+        self.processor.registers[B] = 0x02
+        self.processor.special_registers['sp'] = 0x8000
+        self.processor.special_registers['pc'] = 0x9000
+        self.memory[0x9000:0x9000 + len(code)] = code
+
+        # when
+        t_states = self.processor.execute()
+
+        # then
+        _, variants = entry
+        assert_equals(sum(length for _, _, length in variants[t_states]), t_states)
+
+    def test_write_to_ula_port_is_delayed(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE
+        self.processor.main_registers['a'] = 0x00
+        self.memory[0x0000] = 0xd3
+        self.memory[0x0001] = 0xfe
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 17)
+
+    def test_odd_port_with_contended_high_byte_is_delayed_on_every_cycle(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE
+        self.processor.main_registers['a'] = 0x40
+        self.memory[0x0000] = 0xd3
+        self.memory[0x0001] = 0xff
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 23)
+
+    def test_odd_port_with_uncontended_high_byte_is_not_delayed(self):
+        # given
+        self.contention.frame_t_state = FIRST_CONTENDED_T_STATE
+        self.processor.main_registers['a'] = 0x00
+        self.memory[0x0000] = 0xd3
+        self.memory[0x0001] = 0xff
+
+        # when
+        t_states = self.contention.execute()
+
+        # then
+        assert_equals(t_states, 11)
+
+    def test_frame_t_state_wraps(self):
+        # given
+        self.contention.frame_t_state = 69886
+
+        # when
+        self.contention.execute()
+
+        # then
+        assert_equals(self.contention.frame_t_state, 2)
@@ -1,7 +1,8 @@
+import numpy as np
 from nose.tools import assert_equals
 
-from memory.memory import Memory
-from spectrum.display_adapter import DisplayAdapter
+from memory.memory import Memory, PagedMemory
+from spectrum.display_adapter import DisplayAdapter, ROW_ADDRESSES, CELLS_BY_OFFSET
 
 
 class TestDisplayAdapter:
@@ -9,6 +10,167 @@ class TestDisplayAdapter:
         self.memory = Memory()
         self.display_adapter = DisplayAdapter(self.memory)
 
+    def test_row_addresses_follow_interleaved_layout(self):
+        values = [(0, 0x0000), (1, 0x0100), (8, 0x0020), (63, 0x07e0), (64, 0x0800), (191, 0x17e0)]
+        for y, address in values:
+            yield self.check_row_address, y, address
+
+    @staticmethod
+    def check_row_address(y, address):
+        assert_equals(ROW_ADDRESSES[y], address)
+
+    def test_render_uses_ink_for_set_bits_and_paper_for_clear_bits(self):
+        # given
+        self.memory[0x4000] = 0b10100000
+        self.memory[0x5800] = 0x25
+
+        # when
+        frame = self.display_adapter.render()
+
+        # then
+        assert_equals(frame.shape, (256, 192, 3))
+        assert_equals(tuple(frame[0][0]), (0x00, 0xaa, 0xaa))
+        assert_equals(tuple(frame[1][0]), (0x00, 0xaa, 0x00))
+        assert_equals(tuple(frame[2][0]), (0x00, 0xaa, 0xaa))
+
+    def test_render_maps_last_screen_byte_to_bottom_right_pixel(self):
+        # given
+        self.memory[0x57ff] = 0b00000001
+        self.memory[0x5aff] = 0x47
+
+        # when
+        frame = self.display_adapter.render()
+
+        # then
+        assert_equals(tuple(frame[255][191]), (0xff, 0xff, 0xff))
+        assert_equals(tuple(frame[254][191]), (0x00, 0x00, 0x00))
+
+    def test_render_reads_shadow_screen_on_128k(self):
+        # given
+        memory = PagedMemory()
+        memory.banks[7][0x1800] = 0x38
+        memory.select_pages(0x08)
+
+        # when
+        frame = DisplayAdapter(memory).render()
+
+        # then
+        assert_equals(tuple(frame[0][0]), (0xaa, 0xaa, 0xaa))
+
+    def test_update_display_writes_frame_to_pixels(self):
+        # given
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        self.memory[0x4000] = 0b10000000
+        self.memory[0x5800] = 0x07
+
+        # when
+        self.display_adapter.update_display(screen)
+
+        # then
+        assert_equals(tuple(screen[0][0]), (0xaa, 0xaa, 0xaa))
+        assert_equals(tuple(screen[1][0]), (0x00, 0x00, 0x00))
+
+    def test_screen_offsets_map_to_character_cells(self):
+        values = [(0x0000, 0), (0x0100, 0), (0x0021, 33), (0x0800, 256), (0x17ff, 767), (0x1800, 0), (0x1aff, 767)]
+        for offset, cell in values:
+            yield self.check_screen_offset_maps_to_cell, offset, cell
+
+    @staticmethod
+    def check_screen_offset_maps_to_cell(offset, cell):
+        assert_equals(CELLS_BY_OFFSET[offset], cell)
+
+    def test_first_update_redraws_whole_screen(self):
+        # given
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+
+        # when
+        rects = self.display_adapter.update_display(screen)
+
+        # then
+        assert_equals(rects, [(0, 0, 256, 192)])
+
+    def test_update_without_writes_redraws_nothing(self):
+        # given
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        self.display_adapter.update_display(screen)
+
+        # when
+        rects = self.display_adapter.update_display(screen)
+
+        # then
+        assert_equals(rects, [])
+
+    def test_write_of_unchanged_value_does_not_dirty_cell(self):
+        # given
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        self.display_adapter.update_display(screen)
+        self.memory[0x4000] = 0x00
+
+        # when
+        rects = self.display_adapter.update_display(screen)
+
+        # then
+        assert_equals(rects, [])
+
+    def test_update_redraws_only_changed_cells(self):
+        # given
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        self.display_adapter.update_display(screen)
+        self.memory[0x4121] = 0b01000000
+        self.memory[0x5821] = 0x07
+        self.memory[0x5a00] = 0x38
+
+        # when
+        rects = self.display_adapter.update_display(screen)
+
+        # then
+        assert_equals(rects, [(8, 8, 8, 8), (0, 128, 8, 8)])
+        assert_equals(tuple(screen[8][9]), (0x00, 0x00, 0x00))
+        assert_equals(tuple(screen[9][9]), (0xaa, 0xaa, 0xaa))
+        assert_equals(tuple(screen[0][128]), (0xaa, 0xaa, 0xaa))
+        assert_equals(tuple(screen[16][8]), (0x00, 0x00, 0x00))
+
+    def test_block_write_dirties_only_changed_cells(self):
+        # given
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        self.display_adapter.update_display(screen)
+
+        # when
+        self.memory.write_block(0x57ff, bytearray([0x01, 0x00, 0x38]))
+        rects = self.display_adapter.update_display(screen)
+
+        # then
+        assert_equals(rects, [(8, 0, 8, 8), (248, 184, 8, 8)])
+
+    def test_write_to_shadow_screen_through_top_slot_dirties_cell(self):
+        # given
+        memory = PagedMemory()
+        memory.select_pages(0x0f)
+        display_adapter = DisplayAdapter(memory)
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        display_adapter.update_display(screen)
+
+        # when
+        memory[0xc000] = 0b10000000
+        rects = display_adapter.update_display(screen)
+
+        # then
+        assert_equals(rects, [(0, 0, 8, 8)])
+
+    def test_switching_screen_bank_redraws_whole_screen(self):
+        # given
+        memory = PagedMemory()
+        display_adapter = DisplayAdapter(memory)
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        display_adapter.update_display(screen)
+
+        # when
+        memory.select_pages(0x08)
+        rects = display_adapter.update_display(screen)
+
+        # then
+        assert_equals(rects, [(0, 0, 256, 192)])
+
     # def test_memory_address_and_bit_position_maps_to_coordinate_correctly(self):
     #     values = [(0x0000, 7, 0, 0), (0x0001, 6, 9, 0), (0x57ff, 0, 255, 191)]
     #     for address, bit, x, y in values:
@@ -61,3 +223,44 @@ class TestDisplayAdapter:
     #     assert_equals(colour.get_ink_rgb(), ink_colour)
     #     assert_equals(colour.get_paper_rgb(), paper_colour)
     #     assert_equals(colour.flash, flash)
+
+    def test_flash_cells_swap_ink_and_paper_every_16_frames(self):
+        # given
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        self.memory[0x4000] = 0b10000000
+        self.memory[0x5800] = 0x87
+
+        # when
+        for _ in range(0, 16):
+            rects = self.display_adapter.update_display(screen)
+
+        # then
+        assert_equals(rects, [(0, 0, 8, 8)])
+        assert_equals(tuple(screen[0][0]), (0x00, 0x00, 0x00))
+        assert_equals(tuple(screen[1][0]), (0xaa, 0xaa, 0xaa))
+
+    def test_flash_cells_return_to_normal_after_32_frames(self):
+        # given
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        self.memory[0x4000] = 0b10000000
+        self.memory[0x5800] = 0x87
+
+        # when
+        for _ in range(0, 32):
+            self.display_adapter.update_display(screen)
+
+        # then
+        assert_equals(tuple(screen[0][0]), (0xaa, 0xaa, 0xaa))
+        assert_equals(tuple(screen[1][0]), (0x00, 0x00, 0x00))
+
+    def test_cells_without_flash_are_not_redrawn_on_phase_flip(self):
+        # given
+        screen = np.zeros((256, 192, 3), dtype=np.uint8)
+        self.memory[0x5800] = 0x07
+
+        # when
+        for _ in range(0, 16):
+            rects = self.display_adapter.update_display(screen)
+
+        # then
+        assert_equals(rects, [])
@@ -0,0 +1,146 @@
+import os
+import tempfile
+
+from nose.tools import assert_equals, assert_true
+
+from spectrum.machine import Machine
+
+
+class TestMachine:
+    def setup(self):
+        self.rom_file_name = None
+
+    def teardown(self):
+        os.remove(self.rom_file_name)
+
+    def given_rom(self, *routines):
+        rom = bytearray(0x4000)
+        for address, code in routines:
+            rom[address:address + len(code)] = bytearray(code)
+        rom_file, self.rom_file_name = tempfile.mkstemp()
+        os.write(rom_file, bytes(rom))
+        os.close(rom_file)
+        return Machine(self.rom_file_name)
+
+    def test_frame_runs_69888_t_states_at_3_5_mhz(self):
+        # given
+        spectrum = self.given_rom((0x0000, [0xf3, 0x18, 0xfe]))
+
+        # when
+        spectrum.run_frame()
+
+        # then
+        assert_equals(spectrum.processor_clock_hz, 3500000)
+        assert_true(69888 <= spectrum.t_states < 69888 + 23)
+
+    def test_frame_overrun_is_carried_into_next_frame(self):
+        # given
+        spectrum = self.given_rom((0x0000, [0xf3, 0x18, 0xfe]))
+
+        # when
+        for _ in range(0, 10):
+            spectrum.run_frame()
+
+        # then
+        assert_true(10 * 69888 <= spectrum.t_states < (10 * 69888) + 23)
+
+    def test_interrupt_is_taken_once_per_frame(self):
+        # given
+        spectrum = self.given_rom((0x0000, [0xed, 0x56, 0xfb, 0x18, 0xfe]),
+                                  (0x0038, [0x04, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xfb, 0xc9]))
+        spectrum.processor.special_registers['sp'] = 0x8000
+
+        # when
+        for _ in range(0, 5):
+            spectrum.run_frame()
+
+        # then
+        assert_equals(spectrum.processor.main_registers['b'], 5)
+
+    def test_halted_frame_is_skipped_in_a_few_steps(self):
+        # given
+        spectrum = self.given_rom((0x0000, [0xfb, 0x76, 0x18, 0xfc]),
+                                  (0x0038, [0x04, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xfb, 0xc9]))
+        spectrum.processor.special_registers['sp'] = 0x8000
+
+        # when
+        instructions = [spectrum.run_frame() for _ in range(0, 5)]
+
+        # then
+        assert_true(max(instructions) < 20)
+        assert_equals(spectrum.processor.main_registers['b'], 5)
+        assert_true(5 * 69888 <= spectrum.t_states < (5 * 69888) + 23)
+
+    def test_idle_skip_matches_stepping_through_polling_loop(self):
+        # given
+        spectrum = self.given_rom((0x0000, [0xed, 0x56, 0xfb, 0x3a, 0x00, 0x80, 0xb8, 0x28, 0xfa, 0x47, 0x18, 0xf7]),
+                                  (0x0038, [0xf5, 0x3a, 0x00, 0x80, 0x3c, 0x32, 0x00, 0x80, 0xf1, 0xfb, 0xc9]))
+        reference = Machine(self.rom_file_name, idle_skip=False)
+        for machine in (spectrum, reference):
+            machine.processor.special_registers['sp'] = 0x9000
+
+        # when
+        for _ in range(0, 5):
+            spectrum.run_frame()
+            reference.run_frame()
+
+        # then
+        assert_true(spectrum.idle_loop_detector.skipped_t_states > 4 * 60000)
+        assert_equals(spectrum.t_states, reference.t_states)
+        assert_equals(spectrum.processor.registers, reference.processor.registers)
+        assert_equals(spectrum.memory[0x8000], 5)
+        assert_equals(spectrum.memory, reference.memory)
+
+    def test_jit_matches_stepping_through_block_ops_port_writes_and_idle_loops(self):
+        # given
+        spectrum = self.given_rom((0x0000, [0xed, 0x56, 0xfb, 0x21, 0x00, 0x40, 0x11, 0x01, 0x40, 0x01, 0x00, 0x02,
+                                            0x3c, 0x77, 0xed, 0xb0, 0xe6, 0x07, 0xd3, 0xfe, 0x3a, 0x00, 0x80, 0x4f,
+                                            0x3a, 0x00, 0x80, 0xb9, 0x28, 0xfa, 0x18, 0xe3]),
+                                  (0x0038, [0xf5, 0x3a, 0x00, 0x80, 0x3c, 0x32, 0x00, 0x80, 0xf1, 0xfb, 0xc9]))
+        spectrum = Machine(self.rom_file_name, jit=True)
+        reference = Machine(self.rom_file_name)
+        for machine in (spectrum, reference):
+            machine.processor.special_registers['sp'] = 0x9000
+
+        # when
+        for _ in range(0, 10):
+            spectrum.run_frame()
+            reference.run_frame()
+
+        # then
+        assert_true(len(spectrum.processor.block_cache.blocks) > 0)
+        assert_true(spectrum.idle_loop_detector.skips > 0)
+        assert_equals(spectrum.t_states, reference.t_states)
+        assert_equals(spectrum.border.times, reference.border.times)
+        assert_equals(spectrum.processor.registers, reference.processor.registers)
+        assert_equals(spectrum.memory, reference.memory)
+
+    def test_ldir_screen_fill_is_written_as_a_block_through_display_tracking(self):
+        # given
+        spectrum = self.given_rom((0x0000, [0xf3, 0x21, 0x00, 0x40, 0x11, 0x01, 0x40, 0x01, 0xff, 0x07,
+                                            0x36, 0xff, 0xed, 0xb0, 0x18, 0xfe]))
+        byte_writes = []
+        write = spectrum.memory.write_handlers[1]
+        spectrum.memory.write_handlers[1] = lambda address, value: byte_writes.append(address) or write(address, value)
+        spectrum.display_adapter.dirty[:] = bytearray(len(spectrum.display_adapter.dirty))
+
+        # when
+        spectrum.run_frame()
+
+        # then
+        assert_equals(byte_writes, [0x4000, 0x47ff])
+        assert_equals(spectrum.memory[0x4000:0x4800], bytearray([0xff]) * 0x800)
+        assert_equals(spectrum.memory[0x4800], 0x00)
+        assert_equals(list(spectrum.display_adapter.dirty), [1] * 0x100 + [0] * 0x200)
+
+    def test_disabled_interrupts_do_not_queue_requests(self):
+        # given
+        spectrum = self.given_rom((0x0000, [0xf3, 0x18, 0xfe]))
+
+        # when
+        for _ in range(0, 5):
+            spectrum.run_frame()
+
+        # then
+        assert_equals(len(spectrum.processor.interrupt_controller.requests), 0)
+        assert_equals(spectrum.processor.interrupt_controller.int_line, False)
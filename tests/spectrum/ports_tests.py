@@ -0,0 +1,40 @@
+from nose.tools import assert_equals, assert_true
+
+from memory.memory import PagedMemory
+from spectrum.border import Border
+from spectrum.clock import FrameClock
+from spectrum.ports import Spectrum48Ports, Spectrum128Ports
+
+
+class TestSpectrum48Ports:
+    def setup(self):
+        self.border = Border(FrameClock())
+        self.ports = Spectrum48Ports(self.border)
+
+    def test_write_to_ula_port_sets_border_colour(self):
+        self.ports.write(0xfe, 0x00, 0x12)
+
+        assert_equals(self.border.colour, 0x02)
+
+    def test_write_to_odd_port_does_not_set_border_colour(self):
+        self.ports.write(0xff, 0x00, 0x12)
+
+        assert_equals(self.border.colour, 0x07)
+
+
+class TestSpectrum128Ports:
+    def setup(self):
+        self.memory = PagedMemory()
+        self.border = Border(FrameClock())
+        self.ports = Spectrum128Ports(self.memory, self.border)
+
+    def test_write_to_7ffd_selects_pages(self):
+        self.ports.write(0xfd, 0x7f, 0x06)
+
+        assert_true(self.memory.slots[3] is self.memory.banks[6])
+
+    def test_write_to_ula_port_does_not_select_pages(self):
+        self.ports.write(0xfe, 0x7f, 0x06)
+
+        assert_true(self.memory.slots[3] is self.memory.banks[0])
+        assert_equals(self.border.colour, 0x06)
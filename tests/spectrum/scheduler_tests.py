@@ -0,0 +1,116 @@
+from nose.tools import assert_equals, assert_true, assert_false
+
+from spectrum.scheduler import FrameScheduler, monotonic
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestFrameScheduler:
+    def setup(self):
+        self.clock = FakeClock()
+        self.scheduler = FrameScheduler(0.02, 2, self.clock, self.clock.sleep)
+
+    def test_monotonic_clock_does_not_go_backwards(self):
+        first = monotonic()
+
+        assert_true(monotonic() >= first)
+
+    def test_sleeps_until_next_frame_when_ahead(self):
+        # given
+        self.scheduler.render_due()
+        self.clock.now += 0.005
+
+        # when
+        self.scheduler.wait_for_next_frame()
+
+        # then
+        assert_equals(len(self.clock.sleeps), 1)
+        assert_true(abs(self.clock.sleeps[0] - 0.015) < 1e-9)
+        assert_equals(self.scheduler.late_frames, 0)
+
+    def test_skips_render_when_behind(self):
+        # given
+        self.scheduler.render_due()
+        self.scheduler.wait_for_next_frame()
+        self.clock.now += 0.05
+
+        # when
+        render = self.scheduler.render_due()
+
+        # then
+        assert_false(render)
+        assert_equals(self.scheduler.late_frames, 1)
+        assert_equals(self.scheduler.skipped_frames, 1)
+
+    def test_renders_after_max_frameskip_even_when_behind(self):
+        # given
+        self.scheduler.render_due()
+        self.clock.now += 1.0
+
+        # when
+        renders = [self.scheduler.render_due() for _ in range(0, 3)]
+
+        # then
+        assert_equals(renders, [False, False, True])
+        assert_equals(self.scheduler.skipped_frames, 2)
+
+    def test_resynchronises_when_far_behind(self):
+        # given
+        self.scheduler.render_due()
+        self.clock.now += 1.0
+
+        # when
+        self.scheduler.wait_for_next_frame()
+
+        # then
+        assert_true(self.scheduler.render_due())
+        assert_equals(self.clock.sleeps, [])
+
+    def test_turbo_renders_every_nth_frame_without_sleeping(self):
+        # given
+        scheduler = FrameScheduler(0.02, 2, self.clock, self.clock.sleep, turbo_render_interval=3)
+        scheduler.toggle_turbo()
+
+        # when
+        renders = []
+        for _ in range(0, 6):
+            renders.append(scheduler.render_due())
+            scheduler.wait_for_next_frame()
+
+        # then
+        assert_equals(renders, [False, False, True, False, False, True])
+        assert_equals(self.clock.sleeps, [])
+        assert_equals(scheduler.late_frames, 0)
+
+    def test_turbo_without_render_interval_never_renders(self):
+        # given
+        scheduler = FrameScheduler(0.02, 2, self.clock, self.clock.sleep, turbo_render_interval=0)
+        scheduler.toggle_turbo()
+
+        # then
+        assert_false(any(scheduler.render_due() for _ in range(0, 20)))
+
+    def test_leaving_turbo_restarts_pacing_from_now(self):
+        # given
+        self.scheduler.toggle_turbo()
+        self.scheduler.render_due()
+        self.scheduler.wait_for_next_frame()
+        self.clock.now += 5.0
+
+        # when
+        self.scheduler.toggle_turbo()
+
+        # then
+        assert_true(self.scheduler.render_due())
+        assert_equals(self.scheduler.late_frames, 0)
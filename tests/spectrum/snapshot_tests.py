@@ -8,7 +8,7 @@ from tests.processor.processor_tests import TestHelper
 class TestSnapshotLoader(TestHelper):
     def test_load_sna_snapshot_reads_values_correctly(self):
         # when
-        load_sna_snapshot(_this_directory() + '/test_snapshot.sna', self.processor, self.memory)
+        border_colour = load_sna_snapshot(_this_directory() + '/test_snapshot.sna', self.processor, self.memory)
 
         # then
         self.assert_special_register('i').equals(0x3f)
@@ -34,7 +34,7 @@ class TestSnapshotLoader(TestHelper):
 
         assert_equals(self.processor.interrupt_mode, 1)
 
-        #assert_equals(self.border_colour, 7)
+        assert_equals(border_colour, 7)
 
         # self.assert_memory(0x4020).contains(0x38)
 
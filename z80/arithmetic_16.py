@@ -1,5 +1,6 @@
 from baseop import BaseOp
 from funcs import *
+from z80.registers import H, L, INDEX_REGISTERS, word_register, get_word, set_word
 
 
 class OpAddHl16Reg(BaseOp):
@@ -7,11 +8,14 @@ class OpAddHl16Reg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.source_reg = source_reg
+        self.high, self.low = word_register(source_reg)
 
     def execute(self, processor, memory, pc):
-        result, half_carry, full_carry = bitwise_add_16bit(processor.get_16bit_reg('hl'),
-                                                           processor.get_16bit_reg(self.source_reg))
-        processor.set_16bit_reg('hl', result)
+        registers = processor.registers
+        result, half_carry, full_carry = bitwise_add_16bit((registers[H] << 8) | registers[L],
+                                                           get_word(registers, self.high, self.low))
+        registers[H] = result >> 8
+        registers[L] = result & 0xff
         processor.set_condition('h', half_carry)
         processor.set_condition('n', False)
         processor.set_condition('c', full_carry)
@@ -26,14 +30,18 @@ class OpAdcHl16Reg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.high, self.low = word_register(reg)
 
     def execute(self, processor, memory, pc):
-        signed_hl = to_signed_16bit(self.processor.get_16bit_reg('hl'))
-        to_add = (self.processor.get_16bit_reg(self.reg) + (1 if self.processor.condition('c') else 0)) & 0xffff
-        result, half_carry, full_carry = bitwise_add_16bit(self.processor.get_16bit_reg('hl'), to_add)
+        registers = processor.registers
+        hl = (registers[H] << 8) | registers[L]
+        signed_hl = to_signed_16bit(hl)
+        to_add = (get_word(registers, self.high, self.low) + (1 if processor.condition('c') else 0)) & 0xffff
+        result, half_carry, full_carry = bitwise_add_16bit(hl, to_add)
         signed_result = to_signed_16bit(result)
 
-        processor.set_16bit_reg('hl', result)
+        registers[H] = result >> 8
+        registers[L] = result & 0xff
         processor.set_condition('s', result & 0x8000 > 0)
         processor.set_condition('z', result == 0)
         processor.set_condition('h', half_carry)
@@ -51,15 +59,18 @@ class OpSbcHl16Reg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.high, self.low = word_register(reg)
 
     def execute(self, processor, memory, pc):
-        signed_hl = to_signed_16bit(self.processor.get_16bit_reg('hl'))
-        to_sub = (self.processor.get_16bit_reg(self.reg) + (1 if self.processor.condition('c') else 0)) & 0xffff
-        result, half_borrow, full_borrow = bitwise_sub_16bit(self.processor.get_16bit_reg('hl'), to_sub)
+        registers = processor.registers
+        hl = (registers[H] << 8) | registers[L]
+        signed_hl = to_signed_16bit(hl)
+        to_sub = (get_word(registers, self.high, self.low) + (1 if processor.condition('c') else 0)) & 0xffff
+        result, half_borrow, full_borrow = bitwise_sub_16bit(hl, to_sub)
         signed_result = to_signed_16bit(result)
 
-        processor = self.processor
-        processor.set_16bit_reg('hl', result)
+        registers[H] = result >> 8
+        registers[L] = result & 0xff
         processor.set_condition('s', result & 0x8000 > 0)
         processor.set_condition('z', result == 0)
         processor.set_condition('h', half_borrow)
@@ -78,12 +89,15 @@ class OpAddIndexedReg(BaseOp):
         self.processor = processor
         self.indexed_reg = indexed_reg
         self.source_reg = source_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
+        self.high, self.low = word_register(source_reg)
 
     def execute(self, processor, memory, pc):
-        result, half_carry, full_carry = bitwise_add_16bit(processor.index_registers[self.indexed_reg],
-                                                           processor.get_16bit_reg(self.source_reg))
+        registers = processor.registers
+        result, half_carry, full_carry = bitwise_add_16bit(registers[self.indexed],
+                                                           get_word(registers, self.high, self.low))
 
-        processor.index_registers[self.indexed_reg] = result
+        registers[self.indexed] = result
         processor.set_condition('h', half_carry)
         processor.set_condition('n', False)
         processor.set_condition('c', full_carry)
@@ -101,5 +115,3 @@ def inc_16reg(processor, reg_pair):
 def dec_16reg(processor, reg_pair):
     result = (processor.get_16bit_reg(reg_pair) - 1) & 0xffff
     processor.set_16bit_reg(reg_pair, result)
-
-
@@ -1,16 +1,21 @@
 from memory.memory import fetch_byte, fetch_signed_byte
-from z80.funcs import has_parity, to_signed, bitwise_add, bitwise_sub
 from z80.baseop import BaseOp
+from z80.flags import ADD_TABLE, SUB_TABLE, SZP_FLAGS, AND_FLAGS, UNAFFECTED_FLAGS
+from z80.registers import A, F, H, L, C_FLAG, N_FLAG, P_FLAG, H_FLAG, Z_FLAG, S_FLAG, MAIN_REGISTERS, INDEX_REGISTERS
 
 
 class OpAddA8Reg(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        _add_a(self.processor, self.processor.main_registers[self.reg], False)
+        registers = processor.registers
+        _add_a(processor, registers[self.index], False)
         return 4, False, pc
 
     def __str__(self):
@@ -22,9 +27,11 @@ class OpAdcA8Reg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        _add_a(self.processor, self.processor.main_registers[self.reg], self.processor.condition('c'))
+        registers = processor.registers
+        _add_a(processor, registers[self.index], registers[F] & C_FLAG)
         return 4, False, pc
 
     def __str__(self):
@@ -32,14 +39,17 @@ class OpAdcA8Reg(BaseOp):
 
 
 class OpAddAHlIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        value = self.memory[0xffff & self.processor.get_16bit_reg('hl')]
-        _add_a(self.processor, value, False)
+        registers = processor.registers
+        value = memory[(registers[H] << 8) | registers[L]]
+        _add_a(processor, value, False)
         return 7, False, pc
 
     def __str__(self):
@@ -53,8 +63,9 @@ class OpAdcAHlIndirect(BaseOp):
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        value = self.memory[0xffff & self.processor.get_16bit_reg('hl')]
-        _add_a(self.processor, value, self.processor.condition('c'))
+        registers = processor.registers
+        value = memory[(registers[H] << 8) | registers[L]]
+        _add_a(processor, value, registers[F] & C_FLAG)
         return 7, False, pc
 
     def __str__(self):
@@ -62,6 +73,8 @@ class OpAdcAHlIndirect(BaseOp):
 
 
 class OpAddAImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
@@ -69,7 +82,7 @@ class OpAddAImmediate(BaseOp):
 
     def execute(self, processor, memory, pc):
         value, pc = fetch_byte(memory, pc)
-        _add_a(self.processor, value, False)
+        _add_a(processor, value, False)
         return 7, False, pc
 
     def __str__(self):
@@ -83,8 +96,9 @@ class OpAdcAImmediate(BaseOp):
         self.memory = memory
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         value, pc = fetch_byte(memory, pc)
-        _add_a(self.processor, value, self.processor.condition('c'))
+        _add_a(processor, value, registers[F] & C_FLAG)
         return 7, False, pc
 
     def __str__(self):
@@ -92,13 +106,17 @@ class OpAdcAImmediate(BaseOp):
 
 
 class OpSubA8Reg(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        _sub_a(self.processor, self.processor.main_registers[self.reg], False)
+        registers = processor.registers
+        _sub_a(processor, registers[self.index], False)
         return 4, False, pc
 
     def __str__(self):
@@ -110,9 +128,11 @@ class OpSbcA8Reg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        _sub_a(self.processor, self.processor.main_registers[self.reg], self.processor.condition('c'))
+        registers = processor.registers
+        _sub_a(processor, registers[self.index], registers[F] & C_FLAG)
         return 4, False, pc
 
     def __str__(self):
@@ -120,14 +140,17 @@ class OpSbcA8Reg(BaseOp):
 
 
 class OpSubAHlIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        value = self.memory[0xffff & self.processor.get_16bit_reg('hl')]
-        _sub_a(self.processor, value, False)
+        registers = processor.registers
+        value = memory[(registers[H] << 8) | registers[L]]
+        _sub_a(processor, value, False)
         return 7, False, pc
 
     def __str__(self):
@@ -141,8 +164,9 @@ class OpSbcAHlIndirect(BaseOp):
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        value = self.memory[0xffff & self.processor.get_16bit_reg('hl')]
-        _sub_a(self.processor, value, self.processor.condition('c'))
+        registers = processor.registers
+        value = memory[(registers[H] << 8) | registers[L]]
+        _sub_a(processor, value, registers[F] & C_FLAG)
         return 7, False, pc
 
     def __str__(self):
@@ -150,6 +174,8 @@ class OpSbcAHlIndirect(BaseOp):
 
 
 class OpSubAImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
@@ -157,7 +183,7 @@ class OpSubAImmediate(BaseOp):
 
     def execute(self, processor, memory, pc):
         value, pc = fetch_byte(memory, pc)
-        _sub_a(self.processor, value, False)
+        _sub_a(processor, value, False)
         return 7, False, pc
 
     def __str__(self):
@@ -171,8 +197,9 @@ class OpSbcAImmediate(BaseOp):
         self.memory = memory
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         value, pc = fetch_byte(memory, pc)
-        _sub_a(self.processor, value, self.processor.condition('c'))
+        _sub_a(processor, value, registers[F] & C_FLAG)
         return 7, False, pc
 
     def __str__(self):
@@ -180,16 +207,20 @@ class OpSbcAImmediate(BaseOp):
 
 
 class OpAddAIndexedIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         offset, pc = fetch_signed_byte(memory, pc)
-        value = self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)]
-        _add_a(self.processor, value, False)
+        value = memory[0xffff & (registers[self.indexed] + offset)]
+        _add_a(processor, value, False)
         return 19, False, pc
 
     def __str__(self):
@@ -202,11 +233,13 @@ class OpAdcAIndexedIndirect(BaseOp):
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         offset, pc = fetch_signed_byte(memory, pc)
-        value = self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)]
-        _add_a(self.processor, value, self.processor.condition('c'))
+        value = memory[0xffff & (registers[self.indexed] + offset)]
+        _add_a(processor, value, registers[F] & C_FLAG)
         return 19, False, pc
 
     def __str__(self):
@@ -214,16 +247,20 @@ class OpAdcAIndexedIndirect(BaseOp):
 
 
 class OpSubAIndexedIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         offset, pc = fetch_signed_byte(memory, pc)
-        value = self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)]
-        _sub_a(self.processor, value, False)
+        value = memory[0xffff & (registers[self.indexed] + offset)]
+        _sub_a(processor, value, False)
         return 19, False, pc
 
     def __str__(self):
@@ -236,11 +273,13 @@ class OpSbcAIndexedIndirect(BaseOp):
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         offset, pc = fetch_signed_byte(memory, pc)
-        value = self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)]
-        _sub_a(self.processor, value, self.processor.condition('c'))
+        value = memory[0xffff & (registers[self.indexed] + offset)]
+        _sub_a(processor, value, registers[F] & C_FLAG)
         return 19, False, pc
 
     def __str__(self):
@@ -248,13 +287,17 @@ class OpSbcAIndexedIndirect(BaseOp):
 
 
 class OpAndA8Reg(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        _and_a_value(self.processor, self.processor.main_registers[self.reg])
+        registers = processor.registers
+        _and_a_value(processor, registers[self.index])
         return 4, False, pc
 
     def __str__(self):
@@ -262,13 +305,16 @@ class OpAndA8Reg(BaseOp):
 
 
 class OpAndAHlIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _and_a_value(self.processor, self.memory[0xffff & self.processor.get_16bit_reg('hl')])
+        registers = processor.registers
+        _and_a_value(processor, memory[(registers[H] << 8) | registers[L]])
         return 7, False, pc
 
     def __str__(self):
@@ -276,13 +322,15 @@ class OpAndAHlIndirect(BaseOp):
 
 
 class OpAndAImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         value, pc = fetch_byte(memory, pc)
-        _and_a_value(self.processor, value)
+        _and_a_value(processor, value)
         return 7, False, pc
 
     def __str__(self):
@@ -290,15 +338,19 @@ class OpAndAImmediate(BaseOp):
 
 
 class OpAndIndexedIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         offset, pc = fetch_signed_byte(memory, pc)
-        _and_a_value(self.processor, self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)])
+        _and_a_value(processor, memory[0xffff & (registers[self.indexed] + offset)])
         return 19, False, pc
 
     def __str__(self):
@@ -306,13 +358,17 @@ class OpAndIndexedIndirect(BaseOp):
 
 
 class OpXorA8Reg(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        _xor_a_value(self.processor, self.processor.main_registers[self.reg])
+        registers = processor.registers
+        _xor_a_value(processor, registers[self.index])
         return 4, False, pc
 
     def __str__(self):
@@ -320,13 +376,16 @@ class OpXorA8Reg(BaseOp):
 
 
 class OpXorAHlIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _xor_a_value(self.processor, self.memory[0xffff & self.processor.get_16bit_reg('hl')])
+        registers = processor.registers
+        _xor_a_value(processor, memory[(registers[H] << 8) | registers[L]])
         return 7, False, pc
 
     def __str__(self):
@@ -334,13 +393,15 @@ class OpXorAHlIndirect(BaseOp):
 
 
 class OpXorAImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         value, pc = fetch_byte(memory, pc)
-        _xor_a_value(self.processor, value)
+        _xor_a_value(processor, value)
         return 7, False, pc
 
     def __str__(self):
@@ -348,15 +409,19 @@ class OpXorAImmediate(BaseOp):
 
 
 class OpXorIndexedIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         offset, pc = fetch_signed_byte(memory, pc)
-        _xor_a_value(self.processor, self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)])
+        _xor_a_value(processor, memory[0xffff & (registers[self.indexed] + offset)])
         return 19, False, pc
 
     def __str__(self):
@@ -364,13 +429,17 @@ class OpXorIndexedIndirect(BaseOp):
 
 
 class OpOrA8Reg(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        _or_a_value(self.processor, self.processor.main_registers[self.reg])
+        registers = processor.registers
+        _or_a_value(processor, registers[self.index])
         return 4, False, pc
 
     def __str__(self):
@@ -378,13 +447,16 @@ class OpOrA8Reg(BaseOp):
 
 
 class OpOrAHlIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _or_a_value(self.processor, self.memory[0xffff & self.processor.get_16bit_reg('hl')])
+        registers = processor.registers
+        _or_a_value(processor, memory[(registers[H] << 8) | registers[L]])
         return 7, False, pc
 
     def __str__(self):
@@ -392,13 +464,15 @@ class OpOrAHlIndirect(BaseOp):
 
 
 class OpOrAImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         value, pc = fetch_byte(memory, pc)
-        _or_a_value(self.processor, value)
+        _or_a_value(processor, value)
         return 7, False, pc
 
     def __str__(self):
@@ -406,15 +480,19 @@ class OpOrAImmediate(BaseOp):
 
 
 class OpOrIndexedIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         offset, pc = fetch_signed_byte(memory, pc)
-        _or_a_value(self.processor, self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)])
+        _or_a_value(processor, memory[0xffff & (registers[self.indexed] + offset)])
         return 19, False, pc
 
     def __str__(self):
@@ -422,13 +500,17 @@ class OpOrIndexedIndirect(BaseOp):
 
 
 class OpCpA8Reg(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        _cp_value(self.processor, self.processor.main_registers[self.reg], False)
+        registers = processor.registers
+        _cp_value(processor, registers[self.index], False)
         return 4, False, pc
 
     def __str__(self):
@@ -436,14 +518,17 @@ class OpCpA8Reg(BaseOp):
 
 
 class OpCpAHlIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        value = self.memory[0xffff & self.processor.get_16bit_reg('hl')]
-        _cp_value(self.processor, value, False)
+        registers = processor.registers
+        value = memory[(registers[H] << 8) | registers[L]]
+        _cp_value(processor, value, False)
         return 7, False, pc
 
     def __str__(self):
@@ -451,13 +536,15 @@ class OpCpAHlIndirect(BaseOp):
 
 
 class OpCpImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         value, pc = fetch_byte(memory, pc)
-        _cp_value(self.processor, value, False)
+        _cp_value(processor, value, False)
         return 7, False, pc
 
     def __str__(self):
@@ -465,15 +552,19 @@ class OpCpImmediate(BaseOp):
 
 
 class OpCpIndexedIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         offset, pc = fetch_signed_byte(memory, pc)
-        _cp_value(self.processor, self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)], False)
+        _cp_value(processor, memory[0xffff & (registers[self.indexed] + offset)], False)
         return 19, False, pc
 
     def __str__(self):
@@ -486,16 +577,14 @@ class OpNeg(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        result, half_carry, _ = bitwise_sub(0, processor.main_registers['a'])
-
-        set_condition = processor.set_condition
-        set_condition('s', to_signed(result) < 0)
-        set_condition('z', result == 0)
-        set_condition('h', half_carry)
-        set_condition('p', processor.main_registers['a'] == 0x80)
-        set_condition('n', True)
-        set_condition('c', processor.main_registers['a'] != 0x00)
-        processor.main_registers['a'] = result
+        registers = processor.registers
+        a = registers[A]
+        entry = SUB_TABLE[a << 1]
+        flags = (entry >> 8) & ~P_FLAG
+        if a == 0x80:
+            flags |= P_FLAG
+        registers[A] = entry & 0xff
+        registers[F] = (registers[F] & UNAFFECTED_FLAGS) | flags
         return 8, False, pc
 
     def __str__(self):
@@ -508,9 +597,9 @@ class OpCpl(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        processor.main_registers['a'] = 0xff - processor.main_registers['a']
-        processor.set_condition('h', True)
-        processor.set_condition('n', True)
+        registers = processor.registers
+        registers[A] = 0xff - registers[A]
+        registers[F] |= H_FLAG | N_FLAG
         return 4, False, pc
 
     def __str__(self):
@@ -523,9 +612,8 @@ class OpScf(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        processor.set_condition('h', False)
-        processor.set_condition('n', False)
-        processor.set_condition('c', True)
+        registers = processor.registers
+        registers[F] = (registers[F] & ~(H_FLAG | N_FLAG)) | C_FLAG
         return 4, False, pc
 
     def __str__(self):
@@ -538,9 +626,9 @@ class OpCcf(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        processor.set_condition('h', processor.condition('c'))
-        processor.set_condition('c', not processor.condition('c'))
-        processor.set_condition('n', False)
+        registers = processor.registers
+        f = registers[F]
+        registers[F] = (f & ~(H_FLAG | N_FLAG | C_FLAG)) | (H_FLAG if f & C_FLAG else C_FLAG)
         return 4, False, pc
 
     def __str__(self):
@@ -553,8 +641,9 @@ class OpDaa(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        digits = [int(x,16) for x in hex(self.processor.main_registers['a'])[2:].zfill(2)]
-        fc = self.processor.condition('c')
+        registers = processor.registers
+        digits = [int(x,16) for x in hex(registers[A])[2:].zfill(2)]
+        fc = registers[F] & C_FLAG
         hc = self.processor.condition('h')
 
         if self.processor.condition('n'):
@@ -568,149 +657,119 @@ class OpDaa(BaseOp):
 
     @staticmethod
     def _daa_after_add(processor, digits, fc, hc):
+        registers = processor.registers
         if not fc and not hc:
             if digits[0] <= 0x9 and digits[1] <= 0x9:
                 pass
             elif digits[0] <= 0x8 and digits[1] >= 0xa:
-                processor.main_registers['a'] += 0x6
+                registers[A] += 0x6
             elif digits[0] >= 0xa and digits[1] <= 0x9:
-                processor.main_registers['a'] += 0x60
+                registers[A] += 0x60
                 processor.set_condition('c', True)
             elif digits[0] >= 0x9 and digits[1] >= 0xa:
-                processor.main_registers['a'] += 0x66
+                registers[A] += 0x66
                 processor.set_condition('c', True)
         elif not fc and hc:
             if digits[0] <= 0x9 and digits[1] <= 0x3:
-                processor.main_registers['a'] += 0x6
+                registers[A] += 0x6
             elif digits[0] >= 0xa and digits[1] <= 0x3:
-                processor.main_registers['a'] += 0x66
+                registers[A] += 0x66
                 processor.set_condition('c', True)
         elif fc and not hc:
             if digits[0] <= 0x2 and digits[1] <= 0x9:
-                processor.main_registers['a'] += 0x60
+                registers[A] += 0x60
                 processor.set_condition('c', True)
             elif digits[0] <= 0x2 and digits[1] >= 0xa:
-                processor.main_registers['a'] += 0x66
+                registers[A] += 0x66
                 processor.set_condition('c', True)
         elif fc and hc:
             if digits[0] <= 0x3 and digits[1] <= 0x3:
-                processor.main_registers['a'] += 0x66
+                registers[A] += 0x66
                 processor.set_condition('c', True)
 
-        processor.main_registers['a'] &= 0xff
+        registers[A] &= 0xff
 
-        result = processor.main_registers['a']
-        processor.set_condition('s', (result & 0b10000000) > 0)
-        processor.set_condition('z', result == 0)
-        processor.set_condition('p', has_parity(result))
+        registers[F] = (registers[F] & ~(S_FLAG | Z_FLAG | P_FLAG)) | SZP_FLAGS[registers[A]]
 
     @staticmethod
     def _daa_after_sub(processor, digits, fc, hc):
+        registers = processor.registers
         if not fc and not hc:
             if digits[0] <= 0x9 and digits[1] <= 0x9:
                 pass
         elif not fc and hc:
             if digits[0] <= 0x8 and digits[1] >= 0x6:
-                processor.main_registers['a'] += 0xfa
+                registers[A] += 0xfa
         elif fc and not hc:
             if digits[0] >= 0x7 and digits[1] <= 0x9:
-                processor.main_registers['a'] += 0xa0
+                registers[A] += 0xa0
                 processor.set_condition('c', True)
         elif fc and hc:
             if digits[0] >= 0x6 and digits[1] >= 0x6:
-                processor.main_registers['a'] += 0x9a
+                registers[A] += 0x9a
                 processor.set_condition('c', True)
 
-        processor.main_registers['a'] &= 0xff
+        registers[A] &= 0xff
 
-        result = processor.main_registers['a']
-        processor.set_condition('s', (result & 0b10000000) > 0)
-        processor.set_condition('z', result == 0)
-        processor.set_condition('p', has_parity(result))
+        registers[F] = (registers[F] & ~(S_FLAG | Z_FLAG | P_FLAG)) | SZP_FLAGS[registers[A]]
 
 
 def _add_a(processor, value, carry):
-    signed_a = to_signed(processor.main_registers['a'])
-    if carry:
-        value = (value + 1) & 0xff
-    result, half_carry, full_carry = bitwise_add(processor.main_registers['a'], value)
-    signed_result = to_signed(result)
-    processor.main_registers['a'] = result
-    set_condition = processor.set_condition
-    set_condition('s', signed_result < 0)
-    set_condition('z', result == 0)
-    set_condition('h', half_carry)
-    set_condition('p', (signed_a < 0) != (signed_result < 0))
-    set_condition('n', False)
-    set_condition('c', full_carry)
+    registers = processor.registers
+    index = (registers[A] << 9) | (value << 1) | carry
+    entry = ADD_TABLE[index]
+    registers[A] = entry & 0xff
+    if processor.lazy_flags:
+        processor.pending_flags = (ADD_TABLE, index, 8, UNAFFECTED_FLAGS)
+    else:
+        registers[F] = (registers[F] & UNAFFECTED_FLAGS) | (entry >> 8)
 
 
 def _sub_a(processor, value, carry):
-    signed_a = to_signed(processor.main_registers['a'])
-    if carry:
-        value = (value + 1) & 0xff
-    result, half_carry, full_carry = bitwise_sub(processor.main_registers['a'], value)
-    signed_result = to_signed(result)
-    processor.main_registers['a'] = result
-    set_condition = processor.set_condition
-    set_condition('s', signed_result < 0)
-    set_condition('z', result == 0)
-    set_condition('h', half_carry)
-    set_condition('p', (signed_a < 0) != (signed_result < 0))
-    set_condition('n', True)
-    set_condition('c', full_carry)
+    registers = processor.registers
+    index = (registers[A] << 9) | (value << 1) | carry
+    entry = SUB_TABLE[index]
+    registers[A] = entry & 0xff
+    if processor.lazy_flags:
+        processor.pending_flags = (SUB_TABLE, index, 8, UNAFFECTED_FLAGS)
+    else:
+        registers[F] = (registers[F] & UNAFFECTED_FLAGS) | (entry >> 8)
 
 
 def _and_a_value(processor, value):
-    result = processor.main_registers['a'] & value
-    processor.main_registers['a'] = result
-    set_condition = processor.set_condition
-    set_condition('s', result & 0b10000000 > 0)
-    set_condition('z', result == 0)
-    set_condition('h', True)
-    set_condition('p', has_parity(result))
-    set_condition('n', False)
-    set_condition('c', False)
+    registers = processor.registers
+    result = registers[A] & value
+    registers[A] = result
+    if processor.lazy_flags:
+        processor.pending_flags = (AND_FLAGS, result, 0, UNAFFECTED_FLAGS)
+    else:
+        registers[F] = (registers[F] & UNAFFECTED_FLAGS) | AND_FLAGS[result]
 
 
 def _xor_a_value(processor, value):
-    result = processor.main_registers['a'] ^ value
-    processor.main_registers['a'] = result
-
-    set_condition = processor.set_condition
-    set_condition('s', result & 0b10000000 > 0)
-    set_condition('z', result == 0)
-    set_condition('h', False)
-    set_condition('p', has_parity(result))
-    set_condition('n', False)
-    set_condition('c', False)
+    registers = processor.registers
+    result = registers[A] ^ value
+    registers[A] = result
+    if processor.lazy_flags:
+        processor.pending_flags = (SZP_FLAGS, result, 0, UNAFFECTED_FLAGS)
+    else:
+        registers[F] = (registers[F] & UNAFFECTED_FLAGS) | SZP_FLAGS[result]
 
 
 def _or_a_value(processor, value):
-    result = processor.main_registers['a'] | value
-    processor.main_registers['a'] = result
-
-    set_condition = processor.set_condition
-    set_condition('s', result & 0b10000000 > 0)
-    set_condition('z', result == 0)
-    set_condition('h', False)
-    set_condition('p', has_parity(result))
-    set_condition('n', False)
-    set_condition('c', False)
+    registers = processor.registers
+    result = registers[A] | value
+    registers[A] = result
+    if processor.lazy_flags:
+        processor.pending_flags = (SZP_FLAGS, result, 0, UNAFFECTED_FLAGS)
+    else:
+        registers[F] = (registers[F] & UNAFFECTED_FLAGS) | SZP_FLAGS[result]
 
 
 def _cp_value(processor, value, carry):
-    signed_a = to_signed(processor.main_registers['a'])
-    if carry:
-        value = (value + 1) & 0xff
-    result, half_carry, full_carry = bitwise_sub(processor.main_registers['a'], value)
-    signed_result = to_signed(result)
-
-    set_condition = processor.set_condition
-    set_condition('s', signed_result < 0)
-    set_condition('z', result == 0)
-    set_condition('h', half_carry)
-    set_condition('p', (signed_a < 0) != (signed_result < 0))
-    set_condition('n', True)
-    set_condition('c', full_carry)
-
+    registers = processor.registers
+    index = (registers[A] << 9) | (value << 1) | carry
+    if processor.lazy_flags:
+        processor.pending_flags = (SUB_TABLE, index, 8, UNAFFECTED_FLAGS)
+    else:
+        registers[F] = (registers[F] & UNAFFECTED_FLAGS) | (SUB_TABLE[index] >> 8)
@@ -1,4 +1,14 @@
+from memory.memory import fetch_signed_byte
+
+
 class BaseOp:
+    reads_flags = True
+    uses_r = False
+    ends_block = False
+    starts_block = False
+    uses_block_time = False
+    writes_memory = False
+
     def __init__(self):
         pass
 
@@ -9,19 +19,33 @@ class BaseOp:
         return 'unimplemented operation'
 
 
-class Undocumented(BaseOp):
-    def __init__(self, mnemonic):
+class IndexedCbOp(BaseOp):
+    def __init__(self):
+        BaseOp.__init__(self)
+
+    def execute(self, processor, memory, pc):
+        offset, pc = fetch_signed_byte(memory, pc)
+        return self.execute_with_offset(processor, memory, (pc + 1) & 0xffff, offset)
+
+
+class UndocumentedNop(BaseOp):
+    reads_flags = False
+
+    def __init__(self, mnemonic, t_states):
         BaseOp.__init__(self)
         self.mnemonic = mnemonic
+        self.t_states = t_states
 
     def execute(self, processor, memory, pc):
-        raise NotImplementedError(self.mnemonic)
+        return self.t_states, False, pc
 
     def __str__(self):
         return self.mnemonic
 
 
 class Nop(BaseOp):
+    reads_flags = False
+
     def __init__(self):
         BaseOp.__init__(self)
 
@@ -31,3 +55,12 @@ class Nop(BaseOp):
     def __str__(self):
         return 'nop'
 
+
+def operation_table(operations_by_code, undefined_operation=None):
+    table = [None] * 0x100
+    for code in range(0x00, 0x100):
+        if code in operations_by_code:
+            table[code] = operations_by_code[code]
+        elif undefined_operation is not None:
+            table[code] = undefined_operation(code)
+    return table
@@ -1,6 +1,7 @@
-from baseop import BaseOp
+from baseop import BaseOp, IndexedCbOp
 from memory.memory import fetch_signed_byte
 from z80.funcs import to_signed
+from z80.registers import H, L, MAIN_REGISTERS, INDEX_REGISTERS
 
 
 class OpBitReg(BaseOp):
@@ -8,10 +9,12 @@ class OpBitReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
         self.bit_pos = bit_pos
 
     def execute(self, processor, memory, pc):
-        _bit(self.processor, self.processor.main_registers[self.reg], self.bit_pos)
+        registers = processor.registers
+        _bit(processor, registers[self.index], self.bit_pos)
         return 8, False, pc
 
     def __str__(self):
@@ -26,27 +29,26 @@ class OpBitHlIndirect(BaseOp):
         self.bit_pos = bit_pos
 
     def execute(self, processor, memory, pc):
-        _bit(self.processor, self.memory[0xffff & self.processor.get_16bit_reg('hl')], self.bit_pos)
+        registers = processor.registers
+        _bit(processor, memory[(registers[H] << 8) | registers[L]], self.bit_pos)
         return 12, False, pc
 
     def __str__(self):
         return 'bit {}, (hl)'.format(self.bit_pos)
 
 
-class OpBitIndexedIndirect(BaseOp):
+class OpBitIndexedIndirect(IndexedCbOp):
     def __init__(self, processor, memory, indexed_reg, bit_pos):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
         self.bit_pos = bit_pos
 
-    def execute(self, processor, memory, pc):
-        raise NotImplementedError()
-
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        _bit(self.processor, self.memory[0xffff & address], self.bit_pos)
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        _bit(processor, memory[address], self.bit_pos)
         return 20, False, pc
 
     def __str__(self):
@@ -64,10 +66,12 @@ class OpResReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
         self.bit_pos = bit_pos
 
     def execute(self, processor, memory, pc):
-        self.processor.main_registers[self.reg] = _res(self.processor.main_registers[self.reg], self.bit_pos)
+        registers = processor.registers
+        registers[self.index] = _res(registers[self.index], self.bit_pos)
         return 8, False, pc
 
     def __str__(self):
@@ -75,6 +79,8 @@ class OpResReg(BaseOp):
 
 
 class OpResHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, bit_pos):
         BaseOp.__init__(self)
         self.processor = processor
@@ -82,28 +88,29 @@ class OpResHlIndirect(BaseOp):
         self.bit_pos = bit_pos
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        self.memory[0xffff & address] = _res(self.memory[0xffff & address], self.bit_pos)
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        memory[address] = _res(memory[address], self.bit_pos)
         return 15, False, pc
 
     def __str__(self):
         return 'res {}, (hl)'.format(self.bit_pos)
 
 
-class OpResIndexedIndirect(BaseOp):
+class OpResIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg, bit_pos):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
         self.bit_pos = bit_pos
 
-    def execute(self, processor, memory, pc):
-        raise NotImplementedError()
-
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        self.memory[0xffff & address] = _res(self.memory[0xffff & address], self.bit_pos)
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        memory[address] = _res(memory[address], self.bit_pos)
         return 23, False, pc
 
     def __str__(self):
@@ -119,10 +126,12 @@ class OpSetReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
         self.bit_pos = bit_pos
 
     def execute(self, processor, memory, pc):
-        self.processor.main_registers[self.reg] = _set(self.processor.main_registers[self.reg], self.bit_pos)
+        registers = processor.registers
+        registers[self.index] = _set(registers[self.index], self.bit_pos)
         return 8, False, pc
 
     def __str__(self):
@@ -130,6 +139,8 @@ class OpSetReg(BaseOp):
 
 
 class OpSetHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, bit_pos):
         BaseOp.__init__(self)
         self.processor = processor
@@ -137,28 +148,29 @@ class OpSetHlIndirect(BaseOp):
         self.bit_pos = bit_pos
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        self.memory[0xffff & address] = _set(self.memory[0xffff & address], self.bit_pos)
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        memory[address] = _set(memory[address], self.bit_pos)
         return 15, False, pc
 
     def __str__(self):
         return 'set {}, (hl)'.format(self.bit_pos)
 
 
-class OpSetIndexedIndirect(BaseOp):
+class OpSetIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg, bit_pos):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
         self.bit_pos = bit_pos
 
-    def execute(self, processor, memory, pc):
-        raise NotImplementedError()
-
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        self.memory[0xffff & address] = _set(self.memory[0xffff & address], self.bit_pos)
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        memory[address] = _set(memory[address], self.bit_pos)
         return 23, False, pc
 
     def __str__(self):
@@ -0,0 +1,426 @@
+from z80.arithmetic_8 import OpAddA8Reg, OpAddAImmediate, OpAddAHlIndirect, OpAdcA8Reg, OpAdcAImmediate, \
+    OpAdcAHlIndirect, OpSubA8Reg, OpSubAImmediate, OpSubAHlIndirect, OpSbcA8Reg, OpSbcAImmediate, OpSbcAHlIndirect, \
+    OpAndA8Reg, OpAndAImmediate, OpAndAHlIndirect, OpXorA8Reg, OpXorAImmediate, OpXorAHlIndirect, OpOrA8Reg, \
+    OpOrAImmediate, OpOrAHlIndirect, OpCpA8Reg, OpCpImmediate, OpCpAHlIndirect
+from z80.baseop import Nop
+from z80.flags import ADD_TABLE, SUB_TABLE, AND_FLAGS, SZP_FLAGS, INC_FLAGS, DEC_FLAGS, UNAFFECTED_FLAGS
+from z80.funcs import to_signed
+from z80.inc_operations import OpInc8Reg, OpDec8Reg, OpInc16Reg, OpDec16Reg
+from z80.jump import OpJp, OpJpNz, OpJpZ, OpJpNc, OpJpC, OpJpPo, OpJpPe, OpJpP, OpJpM, OpJr, OpJrNz, OpJrZ, OpJrNc, \
+    OpJrC, OpDjnz
+from z80.ld_operations import OpLd8RegFrom8Reg, OpLd8RegImmediate, OpLd8RegFrom16RegIndirect, \
+    OpLd16RegIndirectFrom8Reg, OpLd16RegImmediate
+from z80.registers import A, F, B, H, L, SP, PC, R, C_FLAG, FLAG_MASKS
+
+COMPILE_THRESHOLD = 4
+MAX_BLOCK_INSTRUCTIONS = 64
+REGION_SHIFT = 8
+MAX_INSTRUCTION_SIZE = 4
+MAX_INVALIDATIONS = 8
+MAX_INSTRUCTION_T_STATES = 23
+MAX_BLOCK_T_STATES = MAX_BLOCK_INSTRUCTIONS * MAX_INSTRUCTION_T_STATES
+CONDITIONAL_EXIT_T_STATES = 7
+
+
+class BlockCache:
+    def __init__(self, processor):
+        self.processor = processor
+        self.memory = processor.memory
+        self.registers = processor.registers
+        self.blocks = {}
+        self.counts = {}
+        self.invalidations = {}
+        self.region_blocks = [None] * (0x10000 >> REGION_SHIFT)
+        self.watched_pages = [False] * 4
+        if hasattr(self.memory, 'add_paging_handler'):
+            self.memory.add_paging_handler(self.invalidate_page)
+
+    def run(self):
+        pc = self.registers[PC]
+        budget = self.processor.repeat_t_state_budget
+        block = self.blocks.get(pc)
+        if block is not None and block.max_t_states <= budget:
+            return block(self.processor, self.memory, self.registers)
+        if budget < MAX_BLOCK_T_STATES:
+            return self.processor.execute(), 1
+
+        count = self.counts.get(pc, 0) + 1
+        self.counts[pc] = count
+        return self.interpret(pc, count == COMPILE_THRESHOLD)
+
+    def interpret(self, start, compile_block):
+        processor = self.processor
+        memory = self.memory
+        registers = self.registers
+        trace = []
+        t_states = 0
+        max_t_states = CONDITIONAL_EXIT_T_STATES
+        while True:
+            before_pc = registers[PC]
+            operation, _, pc = processor.get_operation(before_pc)
+            if operation.starts_block and trace:
+                break
+            if processor.pending_flags is not None and operation.reads_flags:
+                processor.resolve_flags()
+            if operation.uses_block_time:
+                processor.block_t_states = t_states
+
+            op_t_states, jumped, after_pc = operation.execute(processor, memory, pc)
+            t_states += op_t_states
+            max_t_states += min(op_t_states, MAX_INSTRUCTION_T_STATES)
+            if not jumped:
+                registers[PC] = after_pc
+            current_r = registers[R]
+            registers[R] = (current_r & 0b10000000) | ((current_r + ((after_pc - before_pc) & 0xffff)) & 0b01111111)
+            trace.append((operation, before_pc, pc, after_pc))
+
+            if jumped or operation.ends_block or len(trace) == MAX_BLOCK_INSTRUCTIONS:
+                break
+
+        processor.last_operation = trace[-1][0]
+        if compile_block:
+            block = compile_trace(trace, processor.lazy_flags, memory, min(max_t_states, MAX_BLOCK_T_STATES))
+            self.blocks[start] = block
+            self.watch(start, trace)
+        return t_states, len(trace)
+
+    def watch(self, start, trace):
+        for _, before_pc, pc, _ in trace:
+            for address in (before_pc, (pc + MAX_INSTRUCTION_SIZE - 1) & 0xffff):
+                region = address >> REGION_SHIFT
+                if self.region_blocks[region] is None:
+                    self.region_blocks[region] = set()
+                self.region_blocks[region].add(start)
+                self.watch_page(address >> 14)
+
+    def watch_page(self, page):
+        if self.watched_pages[page]:
+            return
+
+        self.watched_pages[page] = True
+        region_blocks = self.region_blocks
+        invalidate = self.invalidate
+        write = self.memory.write_handlers[page]
+        write_block = self.memory.block_write_handlers[page]
+
+        def invalidating_write(address, value):
+            if region_blocks[address >> REGION_SHIFT] is not None:
+                invalidate(address >> REGION_SHIFT)
+            write(address, value)
+
+        def invalidating_write_block(start, data):
+            for region in xrange(start >> REGION_SHIFT, ((start + len(data) - 1) >> REGION_SHIFT) + 1):
+                if region_blocks[region] is not None:
+                    invalidate(region)
+            write_block(start, data)
+
+        self.memory.set_write_handler(page, invalidating_write, invalidating_write_block)
+
+    def invalidate_page(self, page):
+        first_region = (page << 14) >> REGION_SHIFT
+        for region in xrange(first_region, first_region + (0x4000 >> REGION_SHIFT)):
+            if self.region_blocks[region] is not None:
+                self.invalidate(region)
+
+    def invalidate(self, region):
+        for start in self.region_blocks[region]:
+            block = self.blocks.pop(start, None)
+            if block is not None:
+                block.invalidated = True
+                invalidations = self.invalidations.get(start, 0) + 1
+                self.invalidations[start] = invalidations
+                if invalidations < MAX_INVALIDATIONS:
+                    del self.counts[start]
+        self.region_blocks[region] = None
+
+
+def compile_trace(trace, lazy_flags, memory, max_t_states):
+    namespace = dict(INLINE_NAMESPACE, write_handlers=memory.write_handlers)
+    start = trace[0][1]
+    inlined = []
+    for operation, before_pc, pc, after_pc in trace:
+        inline = INLINE_OPERATIONS.get(operation.__class__)
+        inlined.append(inline(operation, memory, pc, lazy_flags) if inline is not None else None)
+    loops = any(inline is not None and inline[2] is not None and inline[2][1] == start for inline in inlined)
+
+    lines = []
+    pending_r = []
+    pending_t_states = 0
+    last = len(trace) - 1
+    for index, (operation, before_pc, pc, after_pc) in enumerate(trace):
+        namespace['op{0}'.format(index)] = operation
+        length = (after_pc - before_pc) & 0xffff
+        count = 'instructions + {0}'.format(index + 1) if loops else str(index + 1)
+        if lazy_flags and operation.reads_flags:
+            lines.append('if processor.pending_flags is not None:')
+            lines.append('    processor.resolve_flags()')
+
+        if inlined[index] is None:
+            namespace['execute{0}'.format(index)] = operation.execute
+            if operation.uses_r and pending_r:
+                lines.extend(_increment_r(sum(pending_r)))
+                pending_r = []
+            if pending_t_states:
+                lines.append('total += {0}'.format(pending_t_states))
+                pending_t_states = 0
+            if operation.uses_block_time:
+                lines.append('processor.block_t_states = total')
+            lines.append('registers[PC] = {0}'.format(before_pc))
+            lines.append('t_states, jumped, pc = execute{0}(processor, memory, {1})'.format(index, pc))
+            lines.append('total += t_states')
+            exit_lines = _exit(index, '{0} + ((pc - {1}) & 0xffff)'.format(sum(pending_r), before_pc), 'total', count)
+            if index == last:
+                lines.append('if not jumped:')
+                lines.append('    registers[PC] = pc')
+                lines.extend(exit_lines)
+                break
+            lines.append('if jumped:')
+            lines.extend(_indent(exit_lines, 1))
+            after_pc = 'pc'
+        else:
+            body, t_states, branch = inlined[index]
+            lines.extend(body)
+            if branch is not None:
+                condition, target, taken_t_states, loops_back = branch
+                taken = ['total += {0}'.format(pending_t_states + taken_t_states)]
+                if loops_back:
+                    if pending_r:
+                        taken = _increment_r(sum(pending_r)) + taken
+                    taken += ['detector = processor.idle_loop_detector',
+                              'if detector is not None:',
+                              '    registers[PC] = {0}'.format(before_pc),
+                              '    processor.block_t_states = total - {0}'.format(taken_t_states),
+                              '    total += detector.loop_back({0}, {1})'.format(target, taken_t_states)]
+                    taken += _increment_r(length)
+                else:
+                    taken += _increment_r(sum(pending_r) + length)
+                if target == start:
+                    taken += ['if total + {0} <= budget and not block.invalidated:'.format(max_t_states),
+                              '    instructions += {0}'.format(index + 1),
+                              '    continue']
+                taken += ['registers[PC] = {0}'.format(target),
+                          'processor.last_operation = op{0}'.format(index),
+                          'return total, {0}'.format(count)]
+                if condition is None:
+                    lines.extend(taken)
+                    break
+                lines.append('if {0}:'.format(condition))
+                lines.extend(_indent(taken, 1))
+            pending_t_states += t_states
+            exit_lines = _exit(index, sum(pending_r) + length, 'total + {0}'.format(pending_t_states), count)
+            if index == last:
+                lines.append('registers[PC] = {0}'.format(after_pc))
+                lines.extend(exit_lines)
+                break
+
+        if operation.writes_memory or operation.starts_block:
+            lines.append('if block.invalidated:')
+            lines.append('    registers[PC] = {0}'.format(after_pc))
+            lines.extend(_indent(exit_lines, 1))
+        pending_r.append(length)
+
+    header = ['def block(processor, memory, registers):',
+              '    total = 0']
+    if loops:
+        header += ['    instructions = 0',
+                   '    budget = processor.repeat_t_state_budget',
+                   '    while True:']
+        lines = _indent(lines, 2)
+    else:
+        lines = _indent(lines, 1)
+    source = '\n'.join(header + lines) + '\n'
+    exec(compile(source, '<block {0:04x}>'.format(start), 'exec'), namespace)
+    block = namespace['block']
+    block.invalidated = False
+    block.max_t_states = max_t_states
+    return block
+
+
+def _exit(index, r_delta, total, count):
+    return ['processor.last_operation = op{0}'.format(index)] + _increment_r(r_delta) + \
+        ['return {0}, {1}'.format(total, count)]
+
+
+def _increment_r(delta):
+    return ['current_r = registers[R]',
+            'registers[R] = (current_r & 0x80) | ((current_r + {0}) & 0x7f)'.format(delta)]
+
+
+def _indent(lines, depth):
+    return ['    ' * depth + line for line in lines]
+
+
+def _set_flags(table, index, shift, keep, lazy_flags):
+    if lazy_flags:
+        return ['processor.pending_flags = ({0}, {1}, {2}, {3})'.format(table, index, shift, keep)]
+    lookup = '{0}[{1}]'.format(table, index) if shift == 0 else '({0}[{1}] >> {2})'.format(table, index, shift)
+    return ['registers[F] = (registers[F] & {0}) | {1}'.format(keep, lookup)]
+
+
+def _condition(flag, jump_value, lazy_flags):
+    body = ['if processor.pending_flags is not None:',
+            '    processor.resolve_flags()'] if lazy_flags else []
+    test = 'registers[F] & {0}'.format(FLAG_MASKS[flag])
+    return body, test if jump_value else 'not ' + test
+
+
+def _inline_nop(operation, memory, pc, lazy_flags):
+    return [], 4, None
+
+
+def _inline_ld_reg_reg(operation, memory, pc, lazy_flags):
+    return ['registers[{0}] = registers[{1}]'.format(operation.destination, operation.source)], 4, None
+
+
+def _inline_ld_reg_immediate(operation, memory, pc, lazy_flags):
+    return ['registers[{0}] = {1}'.format(operation.index, memory[pc])], 7, None
+
+
+def _inline_ld_reg_indirect(operation, memory, pc, lazy_flags):
+    return ['registers[{0}] = memory[(registers[{1}] << 8) | registers[{2}]]'.format(
+        operation.destination, operation.high, operation.low)], 7, None
+
+
+def _inline_ld_indirect_reg(operation, memory, pc, lazy_flags):
+    return ['address = (registers[{0}] << 8) | registers[{1}]'.format(operation.high, operation.low),
+            'write_handlers[address >> 14](address, registers[{0}])'.format(operation.source)], 7, None
+
+
+def _inline_ld_pair_immediate(operation, memory, pc, lazy_flags):
+    return ['registers[{0}] = {1}'.format(operation.high, memory[(pc + 1) & 0xffff]),
+            'registers[{0}] = {1}'.format(operation.low, memory[pc])], 10, None
+
+
+def _inline_step_pair(step):
+    def inline(operation, memory, pc, lazy_flags):
+        if operation.is_sp:
+            return ['registers[SP] = (registers[SP] {0}) & 0xffff'.format(step)], 6, None
+        return ['value = (((registers[{0}] << 8) | registers[{1}]) {2}) & 0xffff'.format(
+                    operation.high, operation.low, step),
+                'registers[{0}] = value >> 8'.format(operation.high),
+                'registers[{0}] = value & 0xff'.format(operation.low)], 6, None
+    return inline
+
+
+def _inline_step_reg(table, step):
+    def inline(operation, memory, pc, lazy_flags):
+        return ['value = registers[{0}]'.format(operation.index)] + \
+            _set_flags(table, 'value', 0, UNAFFECTED_FLAGS | C_FLAG, lazy_flags) + \
+            ['registers[{0}] = (value {1}) & 0xff'.format(operation.index, step)], 4, None
+    return inline
+
+
+def _operand_reg(operation, memory, pc):
+    return 'registers[{0}]'.format(operation.index), 4
+
+
+def _operand_immediate(operation, memory, pc):
+    return str(memory[pc]), 7
+
+
+def _operand_hl_indirect(operation, memory, pc):
+    return 'memory[(registers[H] << 8) | registers[L]]', 7
+
+
+def _inline_arithmetic(table, with_carry, operand):
+    def inline(operation, memory, pc, lazy_flags):
+        value, t_states = operand(operation, memory, pc)
+        carry = '(registers[F] & 1)' if with_carry else '0'
+        body = ['index = (registers[A] << 9) | ({0} << 1) | {1}'.format(value, carry),
+                'registers[A] = {0}[index] & 0xff'.format(table)]
+        return body + _set_flags(table, 'index', 8, UNAFFECTED_FLAGS, lazy_flags), t_states, None
+    return inline
+
+
+def _inline_logic(table, operator, operand):
+    def inline(operation, memory, pc, lazy_flags):
+        value, t_states = operand(operation, memory, pc)
+        body = ['value = registers[A] {0} {1}'.format(operator, value),
+                'registers[A] = value']
+        return body + _set_flags(table, 'value', 0, UNAFFECTED_FLAGS, lazy_flags), t_states, None
+    return inline
+
+
+def _inline_compare(operand):
+    def inline(operation, memory, pc, lazy_flags):
+        value, t_states = operand(operation, memory, pc)
+        index = '((registers[A] << 9) | ({0} << 1))'.format(value)
+        return _set_flags('SUB_TABLE', index, 8, UNAFFECTED_FLAGS, lazy_flags), t_states, None
+    return inline
+
+
+def _inline_djnz(operation, memory, pc, lazy_flags):
+    target = (pc + 1 + to_signed(memory[pc])) & 0xffff
+    return ['value = (registers[B] - 1) & 0xff',
+            'registers[B] = value'], 8, ('value', target, 13, False)
+
+
+def _inline_jr(flag=None, jump_value=None):
+    def inline(operation, memory, pc, lazy_flags):
+        offset = to_signed(memory[pc])
+        target = (pc + 1 + offset) & 0xffff
+        if flag is None:
+            return [], 12, (None, target, 12, offset < 0)
+        body, condition = _condition(flag, jump_value, lazy_flags)
+        return body, 7, (condition, target, 12, offset < 0)
+    return inline
+
+
+def _inline_jp(flag=None, jump_value=None):
+    def inline(operation, memory, pc, lazy_flags):
+        target = (memory[(pc + 1) & 0xffff] << 8) | memory[pc]
+        if flag is None:
+            return [], 10, (None, target, 10, True)
+        body, condition = _condition(flag, jump_value, lazy_flags)
+        return body, 10, (condition, target, 10, True)
+    return inline
+
+
+INLINE_NAMESPACE = {'PC': PC, 'R': R, 'F': F, 'A': A, 'B': B, 'H': H, 'L': L, 'SP': SP,
+                    'ADD_TABLE': ADD_TABLE, 'SUB_TABLE': SUB_TABLE, 'AND_FLAGS': AND_FLAGS,
+                    'SZP_FLAGS': SZP_FLAGS, 'INC_FLAGS': INC_FLAGS, 'DEC_FLAGS': DEC_FLAGS}
+
+INLINE_OPERATIONS = {
+    Nop: _inline_nop,
+    OpLd8RegFrom8Reg: _inline_ld_reg_reg,
+    OpLd8RegImmediate: _inline_ld_reg_immediate,
+    OpLd8RegFrom16RegIndirect: _inline_ld_reg_indirect,
+    OpLd16RegIndirectFrom8Reg: _inline_ld_indirect_reg,
+    OpLd16RegImmediate: _inline_ld_pair_immediate,
+    OpInc16Reg: _inline_step_pair('+ 1'),
+    OpDec16Reg: _inline_step_pair('- 1'),
+    OpInc8Reg: _inline_step_reg('INC_FLAGS', '+ 1'),
+    OpDec8Reg: _inline_step_reg('DEC_FLAGS', '- 1'),
+    OpDjnz: _inline_djnz,
+    OpJr: _inline_jr(),
+    OpJrNz: _inline_jr('z', False),
+    OpJrZ: _inline_jr('z', True),
+    OpJrNc: _inline_jr('c', False),
+    OpJrC: _inline_jr('c', True),
+    OpJp: _inline_jp(),
+    OpJpNz: _inline_jp('z', False),
+    OpJpZ: _inline_jp('z', True),
+    OpJpNc: _inline_jp('c', False),
+    OpJpC: _inline_jp('c', True),
+    OpJpPo: _inline_jp('p', False),
+    OpJpPe: _inline_jp('p', True),
+    OpJpP: _inline_jp('s', False),
+    OpJpM: _inline_jp('s', True),
+}
+
+for operations in ((OpAddA8Reg, OpAddAImmediate, OpAddAHlIndirect, 'ADD_TABLE', False),
+                   (OpAdcA8Reg, OpAdcAImmediate, OpAdcAHlIndirect, 'ADD_TABLE', True),
+                   (OpSubA8Reg, OpSubAImmediate, OpSubAHlIndirect, 'SUB_TABLE', False),
+                   (OpSbcA8Reg, OpSbcAImmediate, OpSbcAHlIndirect, 'SUB_TABLE', True)):
+    for operation, operand in zip(operations[:3], (_operand_reg, _operand_immediate, _operand_hl_indirect)):
+        INLINE_OPERATIONS[operation] = _inline_arithmetic(operations[3], operations[4], operand)
+
+for operations in ((OpAndA8Reg, OpAndAImmediate, OpAndAHlIndirect, 'AND_FLAGS', '&'),
+                   (OpXorA8Reg, OpXorAImmediate, OpXorAHlIndirect, 'SZP_FLAGS', '^'),
+                   (OpOrA8Reg, OpOrAImmediate, OpOrAHlIndirect, 'SZP_FLAGS', '|')):
+    for operation, operand in zip(operations[:3], (_operand_reg, _operand_immediate, _operand_hl_indirect)):
+        INLINE_OPERATIONS[operation] = _inline_logic(operations[3], operations[4], operand)
+
+for operation, operand in zip((OpCpA8Reg, OpCpImmediate, OpCpAHlIndirect),
+                              (_operand_reg, _operand_immediate, _operand_hl_indirect)):
+    INLINE_OPERATIONS[operation] = _inline_compare(operand)
@@ -1,15 +1,20 @@
 from baseop import BaseOp
 from z80.funcs import bitwise_sub
+from z80.registers import A, B, C, D, E, H, L, R
+
+REPEAT_T_STATES = 21
 
 
 class OpLdi(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _block_transfer(self.processor, self.memory, 1)
+        _block_transfer(processor, self.memory, 1)
         return 16, False, pc
 
     def __str__(self):
@@ -17,13 +22,15 @@ class OpLdi(BaseOp):
 
 
 class OpLdd(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _block_transfer(self.processor, self.memory, -1)
+        _block_transfer(processor, self.memory, -1)
         return 16, False, pc
 
     def __str__(self):
@@ -37,7 +44,7 @@ class OpCpi(BaseOp):
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _block_compare(self.processor, self.memory, 1)
+        _block_compare(processor, self.memory, 1)
         return 16, False, pc
 
     def __str__(self):
@@ -51,7 +58,7 @@ class OpCpd(BaseOp):
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _block_compare(self.processor, self.memory, -1)
+        _block_compare(processor, self.memory, -1)
         return 16, False, pc
 
     def __str__(self):
@@ -59,41 +66,65 @@ class OpCpd(BaseOp):
 
 
 class BlockOp(BaseOp):
+    starts_block = True
+    uses_block_time = True
+    ends_block = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
         self.last_t_states = None
 
-    def _decrement_bc_and_update_pc(self, pc):
-        bc = self.processor.get_16bit_reg('bc')
-        if not bc == 0x0000:
-            self.processor.special_registers['pc'] = (self.processor.special_registers['pc']) % 0x10000
+    def _decrement_bc_and_update_pc(self, processor, pc):
+        registers = processor.registers
+        bc = (registers[B] << 8) | registers[C]
         return (16, False, pc) if bc == 0x0000 else (21, True, pc)
 
+    def _bulk_iterations(self, processor):
+        registers = processor.registers
+        return repeat_iterations(processor, ((registers[B] << 8) | registers[C]) or 0x10000)
+
+    def _finish_bulk(self, processor, iterations, pc):
+        return finish_repeats(processor, iterations, self._decrement_bc_and_update_pc(processor, pc))
+
 
 class OpLdir(BlockOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BlockOp.__init__(self, processor)
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _block_transfer(self.processor, self.memory, 1)
-        self.processor.set_condition('p', False)
-        return self._decrement_bc_and_update_pc(pc)
+        iterations = self._bulk_iterations(processor)
+        if iterations:
+            iterations = _bulk_transfer(processor, self.memory, 1, iterations)
+        _block_transfer(processor, self.memory, 1)
+        processor.set_condition('p', False)
+        if iterations:
+            return self._finish_bulk(processor, iterations, pc)
+        return self._decrement_bc_and_update_pc(processor, pc)
 
     def __str__(self):
         return 'ldir'
 
 
 class OpLddr(BlockOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BlockOp.__init__(self, processor)
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _block_transfer(self.processor, self.memory, -1)
-        self.processor.set_condition('p', False)
-        return self._decrement_bc_and_update_pc(pc)
+        iterations = self._bulk_iterations(processor)
+        if iterations:
+            iterations = _bulk_transfer(processor, self.memory, -1, iterations)
+        _block_transfer(processor, self.memory, -1)
+        processor.set_condition('p', False)
+        if iterations:
+            return self._finish_bulk(processor, iterations, pc)
+        return self._decrement_bc_and_update_pc(processor, pc)
 
     def __str__(self):
         return 'lddr'
@@ -105,8 +136,13 @@ class OpCpir(BlockOp):
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _block_compare(self.processor, self.memory, 1)
-        return self._decrement_bc_and_update_pc(pc)
+        iterations = self._bulk_iterations(processor)
+        if iterations:
+            iterations = _bulk_compare(processor, self.memory, 1, iterations)
+        _block_compare(processor, self.memory, 1)
+        if iterations:
+            return self._finish_bulk(processor, iterations, pc)
+        return self._decrement_bc_and_update_pc(processor, pc)
 
     def __str__(self):
         return 'cpir'
@@ -118,24 +154,32 @@ class OpCpdr(BlockOp):
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        _block_compare(self.processor, self.memory, -1)
-        return self._decrement_bc_and_update_pc(pc)
+        iterations = self._bulk_iterations(processor)
+        if iterations:
+            iterations = _bulk_compare(processor, self.memory, -1, iterations)
+        _block_compare(processor, self.memory, -1)
+        if iterations:
+            return self._finish_bulk(processor, iterations, pc)
+        return self._decrement_bc_and_update_pc(processor, pc)
 
     def __str__(self):
         return 'cpdr'
 
 
 def _block_transfer(processor, memory, increment):
-    src_addr = processor.get_16bit_reg('hl')
-    tgt_addr = processor.get_16bit_reg('de')
+    registers = processor.registers
+    src_addr = (registers[H] << 8) | registers[L]
+    tgt_addr = (registers[D] << 8) | registers[E]
 
-    memory[0xffff & tgt_addr] = memory[src_addr]
+    memory[tgt_addr] = memory[src_addr]
 
-    src_addr = (src_addr + increment) % 0x10000
-    processor.set_16bit_reg('hl', src_addr)
+    src_addr = (src_addr + increment) & 0xffff
+    registers[H] = src_addr >> 8
+    registers[L] = src_addr & 0xff
 
-    tgt_addr = (tgt_addr + increment) % 0x10000
-    processor.set_16bit_reg('de', tgt_addr)
+    tgt_addr = (tgt_addr + increment) & 0xffff
+    registers[D] = tgt_addr >> 8
+    registers[E] = tgt_addr & 0xff
 
     counter = _decrement_bc(processor)
 
@@ -144,14 +188,104 @@ def _block_transfer(processor, memory, increment):
     processor.set_condition('n', False)
 
 
+def repeat_iterations(processor, remaining):
+    budget = processor.repeat_t_state_budget
+    if budget <= REPEAT_T_STATES:
+        return 0
+    if processor.interrupt_controller.pending and (processor.iff[0] or processor.enable_iff):
+        return 0
+    return min(remaining, (budget - 1) // REPEAT_T_STATES + 1) - 1
+
+
+def finish_repeats(processor, iterations, result):
+    t_states, jumped, pc = result
+    registers = processor.registers
+    current_r = registers[R]
+    registers[R] = (current_r & 0b10000000) | ((current_r + 2 * iterations) & 0b01111111)
+    return t_states + iterations * REPEAT_T_STATES, jumped, pc
+
+
+def _bulk_transfer(processor, memory, increment, iterations):
+    registers = processor.registers
+    src_addr = (registers[H] << 8) | registers[L]
+    tgt_addr = (registers[D] << 8) | registers[E]
+    if increment > 0:
+        iterations = min(iterations, 0x10000 - src_addr, 0x10000 - tgt_addr)
+        src_start, tgt_start = src_addr, tgt_addr
+    else:
+        iterations = min(iterations, src_addr + 1, tgt_addr + 1)
+        src_start, tgt_start = src_addr - iterations + 1, tgt_addr - iterations + 1
+    distance = (tgt_addr - src_addr) * increment
+
+    overlapping = 0 < distance < iterations
+    write_block = getattr(memory, 'write_block', None)
+    if write_block is None or (overlapping and min(src_start, tgt_start) < 0x4000):
+        for offset in xrange(0, iterations * increment, increment):
+            memory[tgt_addr + offset] = memory[src_addr + offset]
+    elif overlapping:
+        if increment > 0:
+            data = (memory[src_addr:tgt_addr] * (iterations // distance + 1))[:iterations]
+        else:
+            pattern = memory[tgt_addr + 1:src_addr + 1]
+            pattern.reverse()
+            data = (pattern * (iterations // distance + 1))[:iterations]
+            data.reverse()
+        write_block(tgt_start, data)
+    else:
+        write_block(tgt_start, memory[src_start:src_start + iterations])
+
+    src_addr = (src_addr + iterations * increment) & 0xffff
+    registers[H] = src_addr >> 8
+    registers[L] = src_addr & 0xff
+
+    tgt_addr = (tgt_addr + iterations * increment) & 0xffff
+    registers[D] = tgt_addr >> 8
+    registers[E] = tgt_addr & 0xff
+
+    _decrement_bc(processor, iterations)
+    return iterations
+
+
+def _bulk_compare(processor, memory, increment, iterations):
+    registers = processor.registers
+    src_addr = (registers[H] << 8) | registers[L]
+    value = registers[A]
+    if increment > 0:
+        iterations = min(iterations, 0x10000 - src_addr)
+    else:
+        iterations = min(iterations, src_addr + 1)
+
+    if isinstance(memory, bytearray):
+        if increment > 0:
+            match = memory.find(chr(value), src_addr, src_addr + iterations)
+        else:
+            match = memory.rfind(chr(value), src_addr - iterations + 1, src_addr + 1)
+        if match != -1:
+            iterations = (match - src_addr) * increment
+    else:
+        for offset in xrange(0, iterations):
+            if memory[src_addr + offset * increment] == value:
+                iterations = offset
+                break
+
+    src_addr = (src_addr + iterations * increment) & 0xffff
+    registers[H] = src_addr >> 8
+    registers[L] = src_addr & 0xff
+
+    _decrement_bc(processor, iterations)
+    return iterations
+
+
 def _block_compare(processor, memory, increment):
-    src_addr = processor.get_16bit_reg('hl')
+    registers = processor.registers
+    src_addr = (registers[H] << 8) | registers[L]
 
     value_to_compare = memory[src_addr]
-    result, half_carry, full_carry = bitwise_sub(processor.main_registers['a'], value_to_compare)
+    result, half_carry, full_carry = bitwise_sub(registers[A], value_to_compare)
 
-    src_addr = (src_addr + increment) % 0x10000
-    processor.set_16bit_reg('hl', src_addr)
+    src_addr = (src_addr + increment) & 0xffff
+    registers[H] = src_addr >> 8
+    registers[L] = src_addr & 0xff
 
     new_bc = _decrement_bc(processor)
 
@@ -162,9 +296,9 @@ def _block_compare(processor, memory, increment):
     processor.set_condition('n', True)
 
 
-def _decrement_bc(processor):
-    counter = processor.get_16bit_reg('bc')
-    counter = (counter - 1) & 0xffff
-
-    processor.set_16bit_reg('bc', counter)
+def _decrement_bc(processor, count=1):
+    registers = processor.registers
+    counter = (((registers[B] << 8) | registers[C]) - count) & 0xffff
+    registers[B] = counter >> 8
+    registers[C] = counter & 0xff
     return counter
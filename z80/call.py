@@ -1,16 +1,20 @@
 from funcs import big_endian_value, high_low_pair
 from memory.memory import fetch_word
 from z80.baseop import BaseOp
+from z80.registers import PC
 
 
 class OpCall(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         word, pc = fetch_word(memory, pc)
-        call_to(self.processor, 3, word)
+        call_to(processor, 3, word)
         return 17, True, pc
 
     def __str__(self):
@@ -18,6 +22,9 @@ class OpCall(BaseOp):
 
 
 class OpCallDirect(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, address, interrupt_triggered = False):
         BaseOp.__init__(self)
         self.processor = processor
@@ -25,7 +32,7 @@ class OpCallDirect(BaseOp):
         self.interrupt_triggered = interrupt_triggered
 
     def execute(self, processor, memory, pc):
-        call_to(self.processor, 0 if self.interrupt_triggered else 3, self.address)
+        call_to(processor, 0 if self.interrupt_triggered else 3, self.address)
         return 17, True, pc
 
     def __str__(self):
@@ -33,6 +40,9 @@ class OpCallDirect(BaseOp):
 
 
 class OpRst(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, jump_address, interrupt_triggered = False):
         BaseOp.__init__(self)
         self.processor = processor
@@ -40,7 +50,7 @@ class OpRst(BaseOp):
         self.interrupt_triggered = interrupt_triggered
 
     def execute(self, processor, memory, pc):
-        call_to(self.processor, 0 if self.interrupt_triggered else 1, self.jump_address)
+        call_to(processor, 0 if self.interrupt_triggered else 1, self.jump_address)
         return 11, True, pc
 
     def __str__(self):
@@ -48,148 +58,174 @@ class OpRst(BaseOp):
 
 
 class OpCallNz(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        if not self.processor.condition('z'):
-            call_to(self.processor, 3, address)
-            return 5, True, pc
+        if not processor.condition('z'):
+            call_to(processor, 3, address)
+            return 17, True, pc
         else:
-            return 3, False, pc
+            return 10, False, pc
 
     def __str__(self):
         return 'call nz, nn'
 
 
 class OpCallZ(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        if self.processor.condition('z'):
-            call_to(self.processor, 3, address)
-            return 5, True, pc
+        if processor.condition('z'):
+            call_to(processor, 3, address)
+            return 17, True, pc
         else:
-            return 3, False, pc
+            return 10, False, pc
 
     def __str__(self):
         return 'call z, nn'
 
 
 class OpCallNc(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        if not self.processor.condition('c'):
-            call_to(self.processor, 3, address)
-            return 5, True, pc
+        if not processor.condition('c'):
+            call_to(processor, 3, address)
+            return 17, True, pc
         else:
-            return 3, False, pc
+            return 10, False, pc
 
     def __str__(self):
         return 'call nc, nn'
 
 
 class OpCallC(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        if self.processor.condition('c'):
-            call_to(self.processor, 3, address)
-            return 5, True, pc
+        if processor.condition('c'):
+            call_to(processor, 3, address)
+            return 17, True, pc
         else:
-            return 3, False, pc
+            return 10, False, pc
 
     def __str__(self):
         return 'call c, nn'
 
 
 class OpCallPo(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        if not self.processor.condition('p'):
-            call_to(self.processor, 3, address)
-            return 5, True, pc
+        if not processor.condition('p'):
+            call_to(processor, 3, address)
+            return 17, True, pc
         else:
-            return 3, False, pc
+            return 10, False, pc
 
     def __str__(self):
         return 'call po, nn'
 
 
 class OpCallPe(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        if self.processor.condition('p'):
-            call_to(self.processor, 3, address)
-            return 5, True, pc
+        if processor.condition('p'):
+            call_to(processor, 3, address)
+            return 17, True, pc
         else:
-            return 3, False, pc
+            return 10, False, pc
 
     def __str__(self):
         return 'call pe, nn'
 
 
 class OpCallP(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        if not self.processor.condition('s'):
-            call_to(self.processor, 3, address)
-            return 5, True, pc
+        if not processor.condition('s'):
+            call_to(processor, 3, address)
+            return 17, True, pc
         else:
-            return 3, False, pc
+            return 10, False, pc
 
     def __str__(self):
         return 'call p, nn'
 
 
 class OpCallM(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        if self.processor.condition('s'):
-            call_to(self.processor, 3, address)
-            return 5, True, pc
+        if processor.condition('s'):
+            call_to(processor, 3, address)
+            return 17, True, pc
         else:
-            return 3, False, pc
+            return 10, False, pc
 
     def __str__(self):
         return 'call m, nn'
 
 
 class OpRet(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.restore_pc_from_stack()
+        processor.restore_pc_from_stack()
         return 10, True, pc
 
     def __str__(self):
@@ -197,13 +233,15 @@ class OpRet(BaseOp):
 
 
 class OpRetNz(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        if not self.processor.condition('z'):
-            self.processor.restore_pc_from_stack()
+        if not processor.condition('z'):
+            processor.restore_pc_from_stack()
             return 11, True, pc
         else:
             return 5, False, pc
@@ -213,13 +251,15 @@ class OpRetNz(BaseOp):
 
 
 class OpRetZ(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        if self.processor.condition('z'):
-            self.processor.restore_pc_from_stack()
+        if processor.condition('z'):
+            processor.restore_pc_from_stack()
             return 11, True, pc
         else:
             return 5, False, pc
@@ -229,13 +269,15 @@ class OpRetZ(BaseOp):
 
 
 class OpRetNc(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        if not self.processor.condition('c'):
-            self.processor.restore_pc_from_stack()
+        if not processor.condition('c'):
+            processor.restore_pc_from_stack()
             return 11, True, pc
         else:
             return 5, False, pc
@@ -245,13 +287,15 @@ class OpRetNc(BaseOp):
 
 
 class OpRetC(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        if self.processor.condition('c'):
-            self.processor.restore_pc_from_stack()
+        if processor.condition('c'):
+            processor.restore_pc_from_stack()
             return 11, True, pc
         else:
             return 5, False, pc
@@ -261,13 +305,15 @@ class OpRetC(BaseOp):
 
 
 class OpRetPo(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        if not self.processor.condition('p'):
-            self.processor.restore_pc_from_stack()
+        if not processor.condition('p'):
+            processor.restore_pc_from_stack()
             return 11, True, pc
         else:
             return 5, False, pc
@@ -277,13 +323,15 @@ class OpRetPo(BaseOp):
 
 
 class OpRetPe(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        if self.processor.condition('p'):
-            self.processor.restore_pc_from_stack()
+        if processor.condition('p'):
+            processor.restore_pc_from_stack()
             return 11, True, pc
         else:
             return 5, False, pc
@@ -293,13 +341,15 @@ class OpRetPe(BaseOp):
 
 
 class OpRetP(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        if not self.processor.condition('s'):
-            self.processor.restore_pc_from_stack()
+        if not processor.condition('s'):
+            processor.restore_pc_from_stack()
             return 11, True, pc
         else:
             return 5, False, pc
@@ -309,13 +359,15 @@ class OpRetP(BaseOp):
 
 
 class OpRetM(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        if self.processor.condition('s'):
-            self.processor.restore_pc_from_stack()
+        if processor.condition('s'):
+            processor.restore_pc_from_stack()
             return 11, True, pc
         else:
             return 5, False, pc
@@ -325,7 +377,8 @@ class OpRetM(BaseOp):
 
 
 def call_to(processor, instruction_size, destination):
-    sp_high, sp_low = high_low_pair(processor.special_registers['pc'] + instruction_size)
+    registers = processor.registers
+    sp_high, sp_low = high_low_pair((registers[PC] + instruction_size) & 0xffff)
     processor.push_byte(sp_high)
     processor.push_byte(sp_low)
-    processor.special_registers['pc'] = destination
+    registers[PC] = destination
@@ -1,4 +1,5 @@
 from memory.memory import fetch_byte
+from z80.baseop import operation_table
 from z80.bit import *
 from z80.shift import *
 from z80.rotate import *
@@ -9,7 +10,7 @@ class OpCbGroup(BaseOp):
         BaseOp.__init__(self)
         self.last_t_states = None
         self.processor = processor
-        self.ops = {
+        self.ops = operation_table({
             0x00: OpRlcReg(processor, 'b'),
             0x01: OpRlcReg(processor, 'c'),
             0x02: OpRlcReg(processor, 'd'),
@@ -281,7 +282,7 @@ class OpCbGroup(BaseOp):
             0xfd: OpSetReg(processor, 'l', 7),
             0xfe: OpSetHlIndirect(processor, memory, 7),
             0xff: OpSetReg(processor, 'a', 7)
-        }
+        })
 
     def execute(self, processor, memory, pc):
         code, pc = fetch_byte(memory, pc)
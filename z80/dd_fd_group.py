@@ -1,12 +1,14 @@
 from z80.arithmetic_16 import *
 from z80.arithmetic_8 import *
-from z80.baseop import Undocumented
+from z80.baseop import operation_table
 from z80.exchange_operations import *
 from z80.inc_operations import *
+from z80.index_half_operations import *
 from z80.indexed_cb_group import *
 from z80.jump import *
 from z80.ld_operations import *
 from z80.stack import *
+from z80.registers import PC
 
 
 class OpDdFdGroup(BaseOp):
@@ -15,7 +17,7 @@ class OpDdFdGroup(BaseOp):
         self.last_t_states = None
         self.processor = processor
 
-        self.ops = {
+        self.ops = operation_table({
             0x09: OpAddIndexedReg(processor, register, 'bc'),
 
             0x19: OpAddIndexedReg(processor, register, 'de'),
@@ -23,51 +25,51 @@ class OpDdFdGroup(BaseOp):
             0x21: OpLdIndexedImmediate(processor, register),
             0x22: OpLdExtIndexed(processor, memory, register),
             0x23: OpIncIndexed(processor, register),
-            0x24: Undocumented('inc ixh'),
-            0x25: Undocumented('dec ixh'),
-            0x26: Undocumented('ld ixh, n'),
+            0x24: OpIncIndexHalf(processor, register, 'h'),
+            0x25: OpDecIndexHalf(processor, register, 'h'),
+            0x26: OpLdIndexHalfImmediate(processor, register, 'h'),
             0x29: OpAddIndexedReg(processor, register, register),
             0x2a: OpLdIndexedExt(processor, memory, register),
             0x2b: OpDecIndexed(processor, register),
-            0x2c: Undocumented('inc ixl'),
-            0x2d: Undocumented('dec ixl'),
-            0x2e: Undocumented('ld ixl, n'),
+            0x2c: OpIncIndexHalf(processor, register, 'l'),
+            0x2d: OpDecIndexHalf(processor, register, 'l'),
+            0x2e: OpLdIndexHalfImmediate(processor, register, 'l'),
 
             0x34: OpIncIndexedIndirect(processor, memory, register),
             0x35: OpDecIndexedIndirect(processor, memory, register),
             0x36: OpLdIndexedIndirectImmediate(processor, memory, register),
             0x39: OpAddIndexedReg(processor, register, 'sp'),
 
-            0x44: Undocumented('ld b, ixh'),
-            0x45: Undocumented('ld b, ixl'),
+            0x44: OpLd8RegIndexHalf(processor, 'b', register, 'h'),
+            0x45: OpLd8RegIndexHalf(processor, 'b', register, 'l'),
             0x46: OpLd8RegIndexedIndirect(processor, memory, 'b', register),
-            0x4c: Undocumented('ld c, ixh'),
-            0x4d: Undocumented('ld c, ixl'),
+            0x4c: OpLd8RegIndexHalf(processor, 'c', register, 'h'),
+            0x4d: OpLd8RegIndexHalf(processor, 'c', register, 'l'),
             0x4e: OpLd8RegIndexedIndirect(processor, memory, 'c', register),
 
-            0x54: Undocumented('ld d, ixh'),
-            0x55: Undocumented('ld d, ixl'),
+            0x54: OpLd8RegIndexHalf(processor, 'd', register, 'h'),
+            0x55: OpLd8RegIndexHalf(processor, 'd', register, 'l'),
             0x56: OpLd8RegIndexedIndirect(processor, memory, 'd', register),
-            0x5c: Undocumented('ld e, ixh'),
-            0x5d: Undocumented('ld e, ixl'),
+            0x5c: OpLd8RegIndexHalf(processor, 'e', register, 'h'),
+            0x5d: OpLd8RegIndexHalf(processor, 'e', register, 'l'),
             0x5e: OpLd8RegIndexedIndirect(processor, memory, 'e', register),
 
-            0x60: Undocumented('ld ixh, b'),
-            0x61: Undocumented('ld ixh, c'),
-            0x62: Undocumented('ld ixh, d'),
-            0x63: Undocumented('ld ixh, e'),
-            0x64: Undocumented('ld ixh, h'),
-            0x65: Undocumented('ld ixh, l'),
+            0x60: OpLdIndexHalf8Reg(processor, register, 'h', 'b'),
+            0x61: OpLdIndexHalf8Reg(processor, register, 'h', 'c'),
+            0x62: OpLdIndexHalf8Reg(processor, register, 'h', 'd'),
+            0x63: OpLdIndexHalf8Reg(processor, register, 'h', 'e'),
+            0x64: OpLdIndexHalfIndexHalf(processor, register, 'h', 'h'),
+            0x65: OpLdIndexHalfIndexHalf(processor, register, 'h', 'l'),
             0x66: OpLd8RegIndexedIndirect(processor, memory, 'h', register),
-            0x67: Undocumented('ld ixl, a'),
-            0x68: Undocumented('ld ixl, b'),
-            0x69: Undocumented('ld ixl, c'),
-            0x6a: Undocumented('ld ixl, d'),
-            0x6b: Undocumented('ld ixl, e'),
-            0x6c: Undocumented('ld ixl, h'),
-            0x6d: Undocumented('ld ixl, l'),
+            0x67: OpLdIndexHalf8Reg(processor, register, 'h', 'a'),
+            0x68: OpLdIndexHalf8Reg(processor, register, 'l', 'b'),
+            0x69: OpLdIndexHalf8Reg(processor, register, 'l', 'c'),
+            0x6a: OpLdIndexHalf8Reg(processor, register, 'l', 'd'),
+            0x6b: OpLdIndexHalf8Reg(processor, register, 'l', 'e'),
+            0x6c: OpLdIndexHalfIndexHalf(processor, register, 'l', 'h'),
+            0x6d: OpLdIndexHalfIndexHalf(processor, register, 'l', 'l'),
             0x6e: OpLd8RegIndexedIndirect(processor, memory, 'l', register),
-            0x6f: Undocumented('ld ixl, a'),
+            0x6f: OpLdIndexHalf8Reg(processor, register, 'l', 'a'),
 
             0x70: OpLdIndexedIndirect8Reg(processor, memory, register, 'b'),
             0x71: OpLdIndexedIndirect8Reg(processor, memory, register, 'c'),
@@ -76,36 +78,36 @@ class OpDdFdGroup(BaseOp):
             0x74: OpLdIndexedIndirect8Reg(processor, memory, register, 'h'),
             0x75: OpLdIndexedIndirect8Reg(processor, memory, register, 'l'),
             0x77: OpLdIndexedIndirect8Reg(processor, memory, register, 'a'),
-            0x7c: Undocumented('ld a, ixh'),
-            0x7d: Undocumented('ld a, ixl'),
+            0x7c: OpLd8RegIndexHalf(processor, 'a', register, 'h'),
+            0x7d: OpLd8RegIndexHalf(processor, 'a', register, 'l'),
             0x7e: OpLd8RegIndexedIndirect(processor, memory, 'a', register),
 
-            0x84: Undocumented('add a, ixh'),
-            0x85: Undocumented('add a, ixl'),
+            0x84: OpAddAIndexHalf(processor, register, 'h'),
+            0x85: OpAddAIndexHalf(processor, register, 'l'),
             0x86: OpAddAIndexedIndirect(processor, memory, register),
-            0x8c: Undocumented('adc a, ixh'),
-            0x8d: Undocumented('adc a, ixl'),
+            0x8c: OpAdcAIndexHalf(processor, register, 'h'),
+            0x8d: OpAdcAIndexHalf(processor, register, 'l'),
             0x8e: OpAdcAIndexedIndirect(processor, memory, register),
 
-            0x94: Undocumented('sub ixh'),
-            0x95: Undocumented('sub ixl'),
+            0x94: OpSubAIndexHalf(processor, register, 'h'),
+            0x95: OpSubAIndexHalf(processor, register, 'l'),
             0x96: OpSubAIndexedIndirect(processor, memory, register),
-            0x9c: Undocumented('sbc a, ixh'),
-            0x9d: Undocumented('sbc a, ixl'),
+            0x9c: OpSbcAIndexHalf(processor, register, 'h'),
+            0x9d: OpSbcAIndexHalf(processor, register, 'l'),
             0x9e: OpSbcAIndexedIndirect(processor, memory, register),
 
-            0xa4: Undocumented('and ixh'),
-            0xa5: Undocumented('and ixl'),
+            0xa4: OpAndIndexHalf(processor, register, 'h'),
+            0xa5: OpAndIndexHalf(processor, register, 'l'),
             0xa6: OpAndIndexedIndirect(processor, memory, register),
-            0xac: Undocumented('xor a, ixh'),
-            0xad: Undocumented('xor a, ixl'),
+            0xac: OpXorIndexHalf(processor, register, 'h'),
+            0xad: OpXorIndexHalf(processor, register, 'l'),
             0xae: OpXorIndexedIndirect(processor, memory, register),
 
-            0xb4: Undocumented('or ixh'),
-            0xb5: Undocumented('or ixl'),
+            0xb4: OpOrIndexHalf(processor, register, 'h'),
+            0xb5: OpOrIndexHalf(processor, register, 'l'),
             0xb6: OpOrIndexedIndirect(processor, memory, register),
-            0xbc: Undocumented('cp ixh'),
-            0xbd: Undocumented('cp ixl'),
+            0xbc: OpCpIndexHalf(processor, register, 'h'),
+            0xbd: OpCpIndexHalf(processor, register, 'l'),
             0xbe: OpCpIndexedIndirect(processor, memory, register),
 
             0xcb: OpIndexedCbGroup(register, processor, memory),
@@ -116,7 +118,7 @@ class OpDdFdGroup(BaseOp):
             0xe9: OpJpIndexedIndirect(processor, register),
 
             0xf9: OpLdSpIndexed(processor, register),
-        }
+        })
 
     def execute(self, processor, memory, pc):
         code, pc = fetch_byte(memory, pc)
@@ -126,3 +128,29 @@ class OpDdFdGroup(BaseOp):
     def __str__(self):
         return 'DD FD GROUP'
 
+    def fill_undefined_ops(self, unprefixed_ops):
+        for code in range(0x00, 0x100):
+            if self.ops[code] is None:
+                self.ops[code] = OpIgnoredPrefix(unprefixed_ops[code])
+
+
+class OpIgnoredPrefix(BaseOp):
+    def __init__(self, operation):
+        BaseOp.__init__(self)
+        self.operation = operation
+        self.reads_flags = operation.reads_flags
+        self.uses_r = operation.uses_r
+        self.ends_block = operation.ends_block
+        self.starts_block = operation.starts_block
+        self.uses_block_time = operation.uses_block_time
+        self.writes_memory = operation.writes_memory
+
+    def execute(self, processor, memory, pc):
+        registers = processor.registers
+        registers[PC] = (registers[PC] + 1) & 0xffff
+        t_states, jumped, pc = self.operation.execute(processor, memory, pc)
+        return t_states + 4, jumped, pc
+
+    def __str__(self):
+        return str(self.operation)
+
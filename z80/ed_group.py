@@ -1,5 +1,6 @@
 from z80.arithmetic_16 import *
 from z80.arithmetic_8 import *
+from z80.baseop import UndocumentedNop, operation_table
 from z80.block_operations import *
 from z80.interrupt_operations import *
 from z80.io import *
@@ -17,7 +18,7 @@ class OpEdGroup(BaseOp):
         op_im0 = OpIm(processor, 0)
         op_in_a_c = OpIn8RegC(processor, io, 'a')
         op_retn = OpRetn(processor)
-        self.ops = {
+        self.ops = operation_table({
             0x40: OpIn8RegC(processor, io, 'b'),
             0x41: OpOutC8Reg(processor, io, 'b'),
             0x42: OpSbcHl16Reg(processor, 'bc'),
@@ -101,7 +102,7 @@ class OpEdGroup(BaseOp):
             0xb9: OpCpdr(processor, memory),
             0xba: OpIndr(processor, memory, io),
             0xbb: OpOtdr(processor, memory, io)
-        }
+        }, UNDEFINED_OPERATIONS.__getitem__)
 
     def execute(self, processor, memory, pc):
         code, pc = fetch_byte(memory, pc)
@@ -111,3 +112,5 @@ class OpEdGroup(BaseOp):
     def __str__(self):
         return 'ED GROUP'
 
+
+UNDEFINED_OPERATIONS = [UndocumentedNop('defb 0xed, {:#04x}'.format(code), 8) for code in range(0x00, 0x100)]
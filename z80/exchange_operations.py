@@ -1,5 +1,6 @@
 from baseop import BaseOp
 from z80.funcs import big_endian_value, high_low_pair
+from z80.registers import A, F, B, C, D, E, H, L, SP, INDEX_REGISTERS
 
 
 class OpExAfAfPrime(BaseOp):
@@ -8,7 +9,7 @@ class OpExAfAfPrime(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        _ex_with_alternate(self.processor, 'af')
+        _ex_with_alternate(processor.registers, A, F)
         return 4, False, pc
 
     def __str__(self):
@@ -16,14 +17,17 @@ class OpExAfAfPrime(BaseOp):
 
 
 class OpExx(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        _ex_with_alternate(self.processor, 'bc')
-        _ex_with_alternate(self.processor, 'de')
-        _ex_with_alternate(self.processor, 'hl')
+        registers = processor.registers
+        _ex_with_alternate(registers, B, C)
+        _ex_with_alternate(registers, D, E)
+        _ex_with_alternate(registers, H, L)
         return 4, False, pc
 
     def __str__(self):
@@ -31,20 +35,24 @@ class OpExx(BaseOp):
 
 
 class OpExSpIndirectHl(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        old_h = self.processor.main_registers['h']
-        old_l = self.processor.main_registers['l']
+        registers = processor.registers
+        old_h = registers[H]
+        old_l = registers[L]
 
-        self.processor.main_registers['h'] = self.memory[0xffff & (self.processor.special_registers['sp'] + 1)]
-        self.processor.main_registers['l'] = self.memory[0xffff & self.processor.special_registers['sp']]
+        registers[H] = memory[0xffff & (registers[SP] + 1)]
+        registers[L] = memory[0xffff & registers[SP]]
 
-        self.memory[self.processor.special_registers['sp']] = old_l
-        self.memory[0xffff & (self.processor.special_registers['sp'] + 1)] = old_h
+        memory[registers[SP]] = old_l
+        memory[0xffff & (registers[SP] + 1)] = old_h
         return 19, False, pc
 
     def __str__(self):
@@ -52,17 +60,20 @@ class OpExSpIndirectHl(BaseOp):
 
 
 class OpExDeHl(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        old_h = self.processor.main_registers['h']
-        old_l = self.processor.main_registers['l']
-        self.processor.main_registers['h'] = self.processor.main_registers['d']
-        self.processor.main_registers['l'] = self.processor.main_registers['e']
-        self.processor.main_registers['d'] = old_h
-        self.processor.main_registers['e'] = old_l
+        registers = processor.registers
+        old_h = registers[H]
+        old_l = registers[L]
+        registers[H] = registers[D]
+        registers[L] = registers[E]
+        registers[D] = old_h
+        registers[E] = old_l
         return 4, False, pc
 
     def __str__(self):
@@ -70,30 +81,32 @@ class OpExDeHl(BaseOp):
 
 
 class OpExSpIndirectIndexed(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
-        old_index = self.processor.index_registers[self.indexed_reg]
-        self.processor.index_registers[self.indexed_reg] = big_endian_value(
-            [self.memory[self.processor.special_registers['sp']],
-             self.memory[0xffff & (self.processor.special_registers['sp'] + 1)]])
+        registers = processor.registers
+        old_index = registers[self.indexed]
+        registers[self.indexed] = big_endian_value(
+            [memory[registers[SP]],
+             memory[0xffff & (registers[SP] + 1)]])
 
         high_byte, low_byte = high_low_pair(old_index)
-        self.memory[0xffff & self.processor.special_registers['sp']] = low_byte
-        self.memory[0xffff & (self.processor.special_registers['sp'] + 1)] = high_byte
+        memory[0xffff & registers[SP]] = low_byte
+        memory[0xffff & (registers[SP] + 1)] = high_byte
         return 23, False, pc
 
     def __str__(self):
         return 'ex (sp), {}'.format(self.indexed_reg)
 
 
-def _ex_with_alternate(processor, register_pair):
-    old_main = [processor.main_registers[register_pair[0]], processor.main_registers[register_pair[1]]]
-    processor.main_registers[register_pair[0]] = processor.alternate_registers[register_pair[0]]
-    processor.main_registers[register_pair[1]] = processor.alternate_registers[register_pair[1]]
-    processor.alternate_registers[register_pair[0]] = old_main[0]
-    processor.alternate_registers[register_pair[1]] = old_main[1]
+def _ex_with_alternate(registers, high, low):
+    registers[high], registers[high + 8] = registers[high + 8], registers[high]
+    registers[low], registers[low + 8] = registers[low + 8], registers[low]
@@ -0,0 +1,100 @@
+from array import array
+
+from z80.registers import C_FLAG, N_FLAG, P_FLAG, H_FLAG, Z_FLAG, S_FLAG
+
+UNAFFECTED_FLAGS = 0x28
+
+
+def _build_szp_table():
+    table = array('B', [0] * 0x100)
+    for value in xrange(0x100):
+        flags = value & S_FLAG
+        if value == 0:
+            flags |= Z_FLAG
+        if bin(value).count('1') % 2 == 0:
+            flags |= P_FLAG
+        table[value] = flags
+    return table
+
+
+def _build_add_table():
+    table = array('H', [0] * 0x20000)
+    for a in xrange(0x100):
+        for operand in xrange(0x100):
+            for carry in (0, 1):
+                value = (operand + carry) & 0xff
+                result = a + value
+                flags = 0
+                if (a & 0xf) + (value & 0xf) > 0xf:
+                    flags |= H_FLAG
+                if result > 0xff:
+                    flags |= C_FLAG
+                result &= 0xff
+                table[(a << 9) | (operand << 1) | carry] = (_sign_zero_overflow(a, result) | flags) << 8 | result
+    return table
+
+
+def _build_sub_table():
+    table = array('H', [0] * 0x20000)
+    for a in xrange(0x100):
+        for operand in xrange(0x100):
+            for carry in (0, 1):
+                value = (operand + carry) & 0xff
+                result = a - value
+                flags = N_FLAG
+                if (a & 0xf) < (value & 0xf):
+                    flags |= H_FLAG
+                if result < 0:
+                    flags |= C_FLAG
+                result &= 0xff
+                table[(a << 9) | (operand << 1) | carry] = (_sign_zero_overflow(a, result) | flags) << 8 | result
+    return table
+
+
+def _sign_zero_overflow(a, result):
+    flags = result & S_FLAG
+    if result == 0:
+        flags |= Z_FLAG
+    if (a ^ result) & 0x80:
+        flags |= P_FLAG
+    return flags
+
+
+def _build_inc_table():
+    table = array('B', [0] * 0x100)
+    for value in xrange(0x100):
+        result = (value + 1) & 0xff
+        flags = result & S_FLAG
+        if result == 0:
+            flags |= Z_FLAG
+        if value & 0xf == 0xf:
+            flags |= H_FLAG
+        if value == 0x7f:
+            flags |= P_FLAG
+        table[value] = flags
+    return table
+
+
+def _build_dec_table():
+    table = array('B', [0] * 0x100)
+    for value in xrange(0x100):
+        result = (value - 1) & 0xff
+        flags = (result & S_FLAG) | N_FLAG
+        if result == 0:
+            flags |= Z_FLAG
+        if value & 0xf == 0x0:
+            flags |= H_FLAG
+        if value == 0x80:
+            flags |= P_FLAG
+        table[value] = flags
+    return table
+
+
+SZP_FLAGS = _build_szp_table()
+AND_FLAGS = array('B', [flags | H_FLAG for flags in SZP_FLAGS])
+INC_FLAGS = _build_inc_table()
+DEC_FLAGS = _build_dec_table()
+
+# indexed by (a << 9) | (operand << 1) | carry; high byte is F, low byte is the result
+ADD_TABLE = _build_add_table()
+SUB_TABLE = _build_sub_table()
@@ -0,0 +1,104 @@
+from z80.io import IO
+from z80.registers import PC, R
+
+MAX_LOOP_BYTES = 64
+MAX_LOOP_T_STATES = 256
+
+
+class IdleLoopDetector:
+    def __init__(self, clock):
+        self.clock = clock
+        self.processor = None
+        self.registers = None
+        self.memory = None
+        self.side_effects = 0
+        self.skipped_t_states = 0
+        self.skips = 0
+        self.loop_pc = None
+        self.loop_state = None
+        self.loop_t_states = 0
+        self.loop_r = 0
+        self.loop_side_effects = 0
+        self.loop_memory = None
+
+    def attach(self, processor):
+        self.processor = processor
+        self.registers = processor.registers
+        self.memory = processor.memory
+        processor.idle_loop_detector = self
+
+    def watch_io(self, io):
+        return SideEffectCountingIO(io, self)
+
+    def loop_back(self, target, op_t_states):
+        registers = self.registers
+        pc = registers[PC]
+        if not 0 <= pc - target <= MAX_LOOP_BYTES:
+            return 0
+
+        processor = self.processor
+        t_states = self.clock.t_states + processor.block_t_states
+        current_r = registers[R]
+        if pc != self.loop_pc or self.side_effects != self.loop_side_effects:
+            self.record(pc, None, t_states, current_r)
+            return 0
+
+        state = registers[:]
+        state[R] = 0
+        state.append(processor.pending_flags)
+        state.extend(processor.iff)
+
+        iteration = t_states - self.loop_t_states
+        if state != self.loop_state or not 0 < iteration <= MAX_LOOP_T_STATES:
+            self.record(pc, state, t_states, current_r)
+            return 0
+
+        memory = self.memory[0:0x10000]
+        if memory != self.loop_memory:
+            self.record(pc, state, t_states, current_r, memory)
+            return 0
+
+        budget = processor.repeat_t_state_budget - processor.block_t_states
+        iterations = (budget - op_t_states - 1) // iteration
+        if iterations <= 0 or (processor.interrupt_controller.pending and (processor.iff[0] or processor.enable_iff)):
+            self.record(pc, state, t_states, current_r, memory)
+            return 0
+
+        skipped = iterations * iteration
+        r_step = (current_r - self.loop_r) & 0b01111111
+        current_r = (current_r & 0b10000000) | ((current_r + iterations * r_step) & 0b01111111)
+        registers[R] = current_r
+        self.skipped_t_states += skipped
+        self.skips += 1
+        self.record(pc, state, t_states + skipped, current_r, memory)
+        return skipped
+
+    def record(self, pc, state, t_states, current_r, memory=None):
+        self.loop_pc = pc
+        self.loop_state = state
+        self.loop_t_states = t_states
+        self.loop_r = current_r
+        self.loop_side_effects = self.side_effects
+        self.loop_memory = memory
+
+
+class SideEffectCountingIO(IO):
+    def __init__(self, io, detector):
+        self.io = io
+        self.detector = detector
+
+    def read(self, port, high_byte):
+        self.detector.side_effects += 1
+        return self.io.read(port, high_byte)
+
+    def write(self, port, high_byte, value):
+        self.detector.side_effects += 1
+        self.io.write(port, high_byte, value)
+
+    def read_block(self, port, high_byte, count):
+        self.detector.side_effects += 1
+        return self.io.read_block(port, high_byte, count)
+
+    def write_block(self, port, high_byte, values):
+        self.detector.side_effects += 1
+        self.io.write_block(port, high_byte, values)
@@ -1,6 +1,7 @@
 from baseop import BaseOp
-from funcs import bitwise_add, bitwise_sub, to_signed
 from memory.memory import fetch_signed_byte
+from z80.flags import INC_FLAGS, DEC_FLAGS, UNAFFECTED_FLAGS
+from z80.registers import F, H, L, SP, C_FLAG, MAIN_REGISTERS, INDEX_REGISTERS, REGISTER_PAIRS
 
 
 class OpInc8Reg(BaseOp):
@@ -8,9 +9,11 @@ class OpInc8Reg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        self.processor.main_registers[self.reg] = _inc_value(self.processor, self.processor.main_registers[self.reg])
+        registers = processor.registers
+        registers[self.index] = _inc_value(processor, registers[self.index])
         return 4, False, pc
 
     def __str__(self):
@@ -22,9 +25,11 @@ class OpDec8Reg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        self.processor.main_registers[self.reg] = _dec_value(self.processor, self.processor.main_registers[self.reg])
+        registers = processor.registers
+        registers[self.index] = _dec_value(processor, registers[self.index])
         return 4, False, pc
 
     def __str__(self):
@@ -32,14 +37,26 @@ class OpDec8Reg(BaseOp):
 
 
 class OpInc16Reg(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.is_sp = reg == 'sp'
+        if not self.is_sp:
+            self.high, self.low = REGISTER_PAIRS[reg]
 
     def execute(self, processor, memory, pc):
-        result = (self.processor.get_16bit_reg(self.reg) + 1) & 0xffff
-        self.processor.set_16bit_reg(self.reg, result)
+        registers = processor.registers
+        if self.is_sp:
+            registers[SP] = (registers[SP] + 1) & 0xffff
+        else:
+            high = self.high
+            low = self.low
+            result = (((registers[high] << 8) | registers[low]) + 1) & 0xffff
+            registers[high] = result >> 8
+            registers[low] = result & 0xff
         return 6, False, pc
 
     def __str__(self):
@@ -47,14 +64,26 @@ class OpInc16Reg(BaseOp):
 
 
 class OpDec16Reg(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.is_sp = reg == 'sp'
+        if not self.is_sp:
+            self.high, self.low = REGISTER_PAIRS[reg]
 
     def execute(self, processor, memory, pc):
-        result = (self.processor.get_16bit_reg(self.reg) - 1) & 0xffff
-        self.processor.set_16bit_reg(self.reg, result)
+        registers = processor.registers
+        if self.is_sp:
+            registers[SP] = (registers[SP] - 1) & 0xffff
+        else:
+            high = self.high
+            low = self.low
+            result = (((registers[high] << 8) | registers[low]) - 1) & 0xffff
+            registers[high] = result >> 8
+            registers[low] = result & 0xff
         return 6, False, pc
 
     def __str__(self):
@@ -62,15 +91,17 @@ class OpDec16Reg(BaseOp):
 
 
 class OpIncHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _inc_value(self.processor, self.memory[0xffff & address])
-        self.memory[0xffff & address] = result
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        memory[address] = _inc_value(processor, memory[address])
         return 11, False, pc
 
     def __str__(self):
@@ -78,15 +109,17 @@ class OpIncHlIndirect(BaseOp):
 
 
 class OpDecHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _dec_value(self.processor, self.memory[0xffff & address])
-        self.memory[0xffff & address] = result
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        memory[address] = _dec_value(processor, memory[address])
         return 11, False, pc
 
     def __str__(self):
@@ -94,14 +127,17 @@ class OpDecHlIndirect(BaseOp):
 
 
 class OpIncIndexed(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
-        result = (self.processor.index_registers[self.indexed_reg] + 1) & 0xffff
-        self.processor.index_registers[self.indexed_reg] = result
+        registers = processor.registers
+        registers[self.indexed] = (registers[self.indexed] + 1) & 0xffff
         return 10, False, pc
 
     def __str__(self):
@@ -109,14 +145,17 @@ class OpIncIndexed(BaseOp):
 
 
 class OpDecIndexed(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
-        result = (self.processor.index_registers[self.indexed_reg] - 1) & 0xffff
-        self.processor.index_registers[self.indexed_reg] = result
+        registers = processor.registers
+        registers[self.indexed] = (registers[self.indexed] - 1) & 0xffff
         return 10, False, pc
 
     def __str__(self):
@@ -124,17 +163,19 @@ class OpDecIndexed(BaseOp):
 
 
 class OpIncIndexedIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
         offset, pc = fetch_signed_byte(memory, pc)
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        result = _inc_value(self.processor, self.memory[0xffff & address])
-        self.memory[0xffff & address] = result
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        memory[address] = _inc_value(processor, memory[address])
         return 23, False, pc
 
     def __str__(self):
@@ -142,17 +183,19 @@ class OpIncIndexedIndirect(BaseOp):
 
 
 class OpDecIndexedIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
         offset, pc = fetch_signed_byte(memory, pc)
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        result = _dec_value(self.processor, self.memory[0xffff & address])
-        self.memory[0xffff & address] = result
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        memory[address] = _dec_value(processor, memory[address])
         return 23, False, pc
 
     def __str__(self):
@@ -160,22 +203,18 @@ class OpDecIndexedIndirect(BaseOp):
 
 
 def _inc_value(processor, value):
-    processor.set_condition('p', value == 0x7f)
-    result, half_carry, _ = bitwise_add(value, 1)
-
-    processor.set_condition('s', to_signed(result) < 0)
-    processor.set_condition('z', result == 0)
-    processor.set_condition('h', half_carry)
-    processor.set_condition('n', False)
-    return result
+    if processor.lazy_flags:
+        processor.pending_flags = (INC_FLAGS, value, 0, UNAFFECTED_FLAGS | C_FLAG)
+    else:
+        registers = processor.registers
+        registers[F] = (registers[F] & (UNAFFECTED_FLAGS | C_FLAG)) | INC_FLAGS[value]
+    return (value + 1) & 0xff
 
 
 def _dec_value(processor, value):
-    processor.set_condition('p', value == 0x80)
-    result, half_carry, _ = bitwise_sub(value, 1)
-
-    processor.set_condition('s', to_signed(result) < 0)
-    processor.set_condition('z', result == 0)
-    processor.set_condition('h', half_carry)
-    processor.set_condition('n', True)
-    return result
+    if processor.lazy_flags:
+        processor.pending_flags = (DEC_FLAGS, value, 0, UNAFFECTED_FLAGS | C_FLAG)
+    else:
+        registers = processor.registers
+        registers[F] = (registers[F] & (UNAFFECTED_FLAGS | C_FLAG)) | DEC_FLAGS[value]
+    return (value - 1) & 0xff
@@ -0,0 +1,251 @@
+from memory.memory import fetch_byte
+from z80.arithmetic_8 import _add_a, _sub_a, _and_a_value, _xor_a_value, _or_a_value, _cp_value
+from z80.baseop import BaseOp
+from z80.inc_operations import _inc_value, _dec_value
+from z80.registers import F, C_FLAG, MAIN_REGISTERS, INDEX_REGISTERS
+
+HALF_SHIFTS = {'h': 8, 'l': 0}
+
+
+class IndexHalf:
+    def __init__(self, register, half):
+        self.name = register + half
+        self.index = INDEX_REGISTERS[register]
+        self.shift = HALF_SHIFTS[half]
+        self.keep = 0xff00 >> self.shift
+
+    def get(self, registers):
+        return (registers[self.index] >> self.shift) & 0xff
+
+    def set(self, registers, value):
+        index = self.index
+        registers[index] = (registers[index] & self.keep) | (value << self.shift)
+
+
+class OpLdIndexHalf8Reg(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, register, half, source_reg):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.destination = IndexHalf(register, half)
+        self.source_reg = source_reg
+        self.source = MAIN_REGISTERS[source_reg]
+
+    def execute(self, processor, memory, pc):
+        registers = processor.registers
+        self.destination.set(registers, registers[self.source])
+        return 8, False, pc
+
+    def __str__(self):
+        return 'ld {}, {}'.format(self.destination.name, self.source_reg)
+
+
+class OpLd8RegIndexHalf(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, destination_reg, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.destination_reg = destination_reg
+        self.destination = MAIN_REGISTERS[destination_reg]
+        self.source = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        registers = processor.registers
+        registers[self.destination] = self.source.get(registers)
+        return 8, False, pc
+
+    def __str__(self):
+        return 'ld {}, {}'.format(self.destination_reg, self.source.name)
+
+
+class OpLdIndexHalfIndexHalf(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, register, destination_half, source_half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.destination = IndexHalf(register, destination_half)
+        self.source = IndexHalf(register, source_half)
+
+    def execute(self, processor, memory, pc):
+        registers = processor.registers
+        self.destination.set(registers, self.source.get(registers))
+        return 8, False, pc
+
+    def __str__(self):
+        return 'ld {}, {}'.format(self.destination.name, self.source.name)
+
+
+class OpLdIndexHalfImmediate(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.destination = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        value, pc = fetch_byte(memory, pc)
+        self.destination.set(processor.registers, value)
+        return 11, False, pc
+
+    def __str__(self):
+        return 'ld {}, n'.format(self.destination.name)
+
+
+class OpIncIndexHalf(BaseOp):
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        registers = processor.registers
+        self.half.set(registers, _inc_value(processor, self.half.get(registers)))
+        return 8, False, pc
+
+    def __str__(self):
+        return 'inc {}'.format(self.half.name)
+
+
+class OpDecIndexHalf(BaseOp):
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        registers = processor.registers
+        self.half.set(registers, _dec_value(processor, self.half.get(registers)))
+        return 8, False, pc
+
+    def __str__(self):
+        return 'dec {}'.format(self.half.name)
+
+
+class OpAddAIndexHalf(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        _add_a(processor, self.half.get(processor.registers), False)
+        return 8, False, pc
+
+    def __str__(self):
+        return 'add a, {}'.format(self.half.name)
+
+
+class OpAdcAIndexHalf(BaseOp):
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        registers = processor.registers
+        _add_a(processor, self.half.get(registers), registers[F] & C_FLAG)
+        return 8, False, pc
+
+    def __str__(self):
+        return 'adc a, {}'.format(self.half.name)
+
+
+class OpSubAIndexHalf(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        _sub_a(processor, self.half.get(processor.registers), False)
+        return 8, False, pc
+
+    def __str__(self):
+        return 'sub {}'.format(self.half.name)
+
+
+class OpSbcAIndexHalf(BaseOp):
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        registers = processor.registers
+        _sub_a(processor, self.half.get(registers), registers[F] & C_FLAG)
+        return 8, False, pc
+
+    def __str__(self):
+        return 'sbc a, {}'.format(self.half.name)
+
+
+class OpAndIndexHalf(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        _and_a_value(processor, self.half.get(processor.registers))
+        return 8, False, pc
+
+    def __str__(self):
+        return 'and {}'.format(self.half.name)
+
+
+class OpXorIndexHalf(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        _xor_a_value(processor, self.half.get(processor.registers))
+        return 8, False, pc
+
+    def __str__(self):
+        return 'xor {}'.format(self.half.name)
+
+
+class OpOrIndexHalf(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        _or_a_value(processor, self.half.get(processor.registers))
+        return 8, False, pc
+
+    def __str__(self):
+        return 'or {}'.format(self.half.name)
+
+
+class OpCpIndexHalf(BaseOp):
+    reads_flags = False
+
+    def __init__(self, processor, register, half):
+        BaseOp.__init__(self)
+        self.processor = processor
+        self.half = IndexHalf(register, half)
+
+    def execute(self, processor, memory, pc):
+        _cp_value(processor, self.half.get(processor.registers), False)
+        return 8, False, pc
+
+    def __str__(self):
+        return 'cp {}'.format(self.half.name)
@@ -1,7 +1,9 @@
 from memory.memory import fetch_byte
+from z80.baseop import IndexedCbOp, operation_table
 from z80.bit import *
 from z80.rotate import *
 from z80.shift import *
+from z80.registers import MAIN_REGISTERS
 
 
 class OpIndexedCbGroup(BaseOp):
@@ -10,13 +12,14 @@ class OpIndexedCbGroup(BaseOp):
         self.last_t_states = None
         self.processor = processor
 
-        self.ops = {
+        self.ops = operation_table({
             0x06: OpRlcIndexedIndirect(processor, memory, register),
             0x0e: OpRrcIndexedIndirect(processor, memory, register),
             0x16: OpRlIndexedIndirect(processor, memory, register),
             0x1e: OpRrIndexedIndirect(processor, memory, register),
             0x26: OpSlaIndexedIndirect(processor, memory, register),
             0x2e: OpSraIndexedIndirect(processor, memory, register),
+            0x36: OpSllIndexedIndirect(processor, memory, register),
             0x3e: OpSrlIndexedIndirect(processor, memory, register),
 
             0x46: OpBitIndexedIndirect(processor, memory, register, 0),
@@ -45,7 +48,8 @@ class OpIndexedCbGroup(BaseOp):
             0xee: OpSetIndexedIndirect(processor, memory, register, 5),
             0xf6: OpSetIndexedIndirect(processor, memory, register, 6),
             0xfe: OpSetIndexedIndirect(processor, memory, register, 7),
-        }
+        })
+        self._fill_undocumented_ops(processor)
 
     def execute(self, processor, memory, pc):
         offset, pc = fetch_signed_byte(memory, pc)
@@ -56,3 +60,31 @@ class OpIndexedCbGroup(BaseOp):
     def __str__(self):
         return 'INDEXED CB GROUP'
 
+    def _fill_undocumented_ops(self, processor):
+        for code in range(0x00, 0x100):
+            if self.ops[code] is None:
+                operation = self.ops[(code & 0xf8) | 0x06]
+                if 0x40 <= code <= 0x7f:
+                    self.ops[code] = operation
+                else:
+                    self.ops[code] = OpIndexedCbToReg(processor, operation, 'bcdehl a'[code & 0x07])
+
+
+class OpIndexedCbToReg(IndexedCbOp):
+    writes_memory = True
+
+    def __init__(self, processor, operation, reg):
+        IndexedCbOp.__init__(self)
+        self.processor = processor
+        self.operation = operation
+        self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
+
+    def execute_with_offset(self, processor, memory, pc, offset):
+        result = self.operation.execute_with_offset(processor, memory, pc, offset)
+        processor.registers[self.index] = memory[0xffff & (processor.registers[self.operation.indexed] + offset)]
+        return result
+
+    def __str__(self):
+        return '{}, {}'.format(self.operation, self.reg)
+
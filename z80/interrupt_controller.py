@@ -0,0 +1,36 @@
+from collections import deque
+
+IM0_DEFAULT_DATA = 0xff
+
+
+class InterruptController:
+    def __init__(self, max_pending_requests=16):
+        self.requests = deque(maxlen=max_pending_requests)
+        self.int_line = False
+        self.pending = False
+        self.dropped_requests = 0
+
+    def request(self, interrupt_request):
+        if len(self.requests) == self.requests.maxlen:
+            self.dropped_requests += 1
+        self.requests.append(interrupt_request)
+        self.pending = True
+
+    def set_int_line(self, asserted):
+        self.int_line = asserted
+        self.pending = asserted or len(self.requests) > 0
+
+    def acknowledge(self):
+        if self.int_line:
+            return None
+
+        request = self.requests.popleft()
+        self.pending = len(self.requests) > 0
+        request.acknowledge()
+        return request
+
+
+def im0_data(request):
+    if request is None or request.get_im0_data is None:
+        return IM0_DEFAULT_DATA
+    return request.get_im0_data()
@@ -1,19 +1,23 @@
 from baseop import BaseOp
+from z80.registers import A, I, R
 
 
 class OpLdAR(BaseOp):
+    uses_r = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        r_value = self.processor.special_registers['r']
-        self.processor.main_registers['a'] = r_value
-        self.processor.set_condition('s', r_value & 0b10000000 != 0)
-        self.processor.set_condition('z', r_value == 0)
-        self.processor.set_condition('h', False)
-        self.processor.set_condition('p', self.processor.iff[1])
-        self.processor.set_condition('n', False)
+        registers = processor.registers
+        r_value = registers[R]
+        registers[A] = r_value
+        processor.set_condition('s', r_value & 0b10000000 != 0)
+        processor.set_condition('z', r_value == 0)
+        processor.set_condition('h', False)
+        processor.set_condition('p', processor.iff[1])
+        processor.set_condition('n', False)
         return 9, False, pc
 
     def __str__(self):
@@ -21,12 +25,15 @@ class OpLdAR(BaseOp):
 
 
 class OpLdAI(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.main_registers['a'] = self.processor.special_registers['i']
+        registers = processor.registers
+        registers[A] = registers[I]
         return 9, False, pc
 
     def __str__(self):
@@ -34,12 +41,15 @@ class OpLdAI(BaseOp):
 
 
 class OpLdIA(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.special_registers['i'] = self.processor.main_registers['a']
+        registers = processor.registers
+        registers[I] = registers[A]
         return 9, False, pc
 
     def __str__(self):
@@ -47,12 +57,16 @@ class OpLdIA(BaseOp):
 
 
 class OpLdRA(BaseOp):
+    reads_flags = False
+    uses_r = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.special_registers['r'] = self.processor.main_registers['a']
+        registers = processor.registers
+        registers[R] = registers[A]
         return 9, False, pc
 
     def __str__(self):
@@ -60,13 +74,15 @@ class OpLdRA(BaseOp):
 
 
 class OpDi(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.iff[0] = False
-        self.processor.iff[1] = False
+        processor.iff[0] = False
+        processor.iff[1] = False
         return 4, False, pc
 
     def __str__(self):
@@ -74,12 +90,15 @@ class OpDi(BaseOp):
 
 
 class OpEi(BaseOp):
+    reads_flags = False
+    ends_block = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.enable_iff = True
+        processor.enable_iff = True
         return 4, False, pc
 
     def __str__(self):
@@ -87,13 +106,15 @@ class OpEi(BaseOp):
 
 
 class OpRetn(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.iff[0] = self.processor.iff[1]
-        self.processor.restore_pc_from_stack()
+        processor.iff[0] = processor.iff[1]
+        processor.restore_pc_from_stack()
         return 14, True, pc
 
     def __str__(self):
@@ -101,12 +122,14 @@ class OpRetn(BaseOp):
 
 
 class OpReti(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.restore_pc_from_stack()
+        processor.restore_pc_from_stack()
         return 14, True, pc
 
     def __str__(self):
@@ -114,26 +137,53 @@ class OpReti(BaseOp):
 
 
 class OpHalt(BaseOp):
+    reads_flags = False
+    ends_block = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.halting = True
+        processor.halting = True
         return 4, False, pc
 
     def __str__(self):
         return 'halt'
 
 
+class OpHalted(BaseOp):
+    reads_flags = False
+    uses_block_time = True
+
+    def __init__(self):
+        BaseOp.__init__(self)
+
+    def execute(self, processor, memory, pc):
+        budget = processor.repeat_t_state_budget
+        if budget <= 4:
+            return 4, True, pc
+
+        nops = (budget + 3) // 4
+        registers = processor.registers
+        current_r = registers[R]
+        registers[R] = (current_r & 0b10000000) | ((current_r + nops - 1) & 0b01111111)
+        return nops * 4, True, pc
+
+    def __str__(self):
+        return 'nop'
+
+
 class OpIm(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, interrupt_mode):
         BaseOp.__init__(self)
         self.processor = processor
         self.interrupt_mode = interrupt_mode
 
     def execute(self, processor, memory, pc):
-        self.processor.set_interrupt_mode(self.interrupt_mode)
+        processor.set_interrupt_mode(self.interrupt_mode)
         return 8, False, pc
 
     def __str__(self):
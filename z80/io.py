@@ -1,6 +1,8 @@
 from memory.memory import fetch_byte
 from z80.baseop import BaseOp
+from z80.block_operations import repeat_iterations, finish_repeats
 from z80.funcs import has_parity
+from z80.registers import A, B, C, H, L, MAIN_REGISTERS
 
 
 class IO:
@@ -10,17 +12,29 @@ class IO:
     def write(self, port, high_byte, value):
         raise NotImplementedError("Not implemented")
 
+    def read_block(self, port, high_byte, count):
+        return [self.read(port, (high_byte - offset) & 0xff) for offset in xrange(0, count)]
+
+    def write_block(self, port, high_byte, values):
+        for offset, value in enumerate(values):
+            self.write(port, (high_byte - offset) & 0xff, value)
+
 
 class OpInA(BaseOp):
+    reads_flags = False
+    starts_block = True
+    uses_block_time = True
+
     def __init__(self, processor, io):
         BaseOp.__init__(self)
         self.processor = processor
         self.io = io
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         port, pc = fetch_byte(memory, pc)
-        value = self.io.read(port, self.processor.main_registers['a'])
-        self.processor.main_registers['a'] = value
+        value = self.io.read(port, registers[A])
+        registers[A] = value
         return 11, False, pc
 
     def __str__(self):
@@ -28,21 +42,26 @@ class OpInA(BaseOp):
 
 
 class OpIn8RegC(BaseOp):
+    starts_block = True
+    uses_block_time = True
+
     def __init__(self, processor, io, dest_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.io = io
         self.dest_reg = dest_reg
+        self.index = MAIN_REGISTERS[dest_reg]
 
     def execute(self, processor, memory, pc):
-        value = self.io.read(self.processor.main_registers['c'], self.processor.main_registers['b'])
-        self.processor.main_registers[self.dest_reg] = value
-
-        self.processor.set_condition('s', (value & 0b10000000) > 0)
-        self.processor.set_condition('z', value == 0)
-        self.processor.set_condition('h', False)
-        self.processor.set_condition('p', has_parity(value))
-        self.processor.set_condition('n', False)
+        registers = processor.registers
+        value = self.io.read(registers[C], registers[B])
+        registers[self.index] = value
+
+        processor.set_condition('s', (value & 0b10000000) > 0)
+        processor.set_condition('z', value == 0)
+        processor.set_condition('h', False)
+        processor.set_condition('p', has_parity(value))
+        processor.set_condition('n', False)
         return 12, False, pc
 
     def __str__(self):
@@ -50,6 +69,10 @@ class OpIn8RegC(BaseOp):
 
 
 class OpIni(BaseOp):
+    starts_block = True
+    uses_block_time = True
+    writes_memory = True
+
     def __init__(self, processor, memory, io):
         BaseOp.__init__(self)
         self.processor = processor
@@ -57,9 +80,10 @@ class OpIni(BaseOp):
         self.io = io
 
     def execute(self, processor, memory, pc):
-        _read_and_decrement_b(self.processor, self.memory, self.io, 1)
-        self.processor.set_condition('z', self.processor.main_registers['b'] == 0)
-        self.processor.set_condition('n', True)
+        registers = processor.registers
+        _read_and_decrement_b(processor, self.memory, self.io, 1)
+        processor.set_condition('z', registers[B] == 0)
+        processor.set_condition('n', True)
         return 16, False, pc
 
     def __str__(self):
@@ -67,6 +91,11 @@ class OpIni(BaseOp):
 
 
 class OpInir(BaseOp):
+    starts_block = True
+    uses_block_time = True
+    ends_block = True
+    writes_memory = True
+
     def __init__(self, processor, memory, io):
         BaseOp.__init__(self)
         self.processor = processor
@@ -75,20 +104,27 @@ class OpInir(BaseOp):
         self.last_t_states = None
 
     def execute(self, processor, memory, pc):
-        _read_and_decrement_b(self.processor, self.memory, self.io, 1)
-        self.processor.set_condition('z', True)
-        self.processor.set_condition('n', True)
-        if self.processor.main_registers['b'] == 0:
-            return 16, False, pc
-        else:
-            self.processor.special_registers['pc'] = (self.processor.special_registers['pc']) & 0xffff
-            return 21, True, pc
+        registers = processor.registers
+        iterations = repeat_iterations(processor, registers[B] or 0x100)
+        if iterations:
+            _bulk_read(processor, self.memory, self.io, 1, iterations)
+        _read_and_decrement_b(processor, self.memory, self.io, 1)
+        processor.set_condition('z', True)
+        processor.set_condition('n', True)
+        result = (16, False, pc) if registers[B] == 0 else (21, True, pc)
+        if iterations:
+            return finish_repeats(processor, iterations, result)
+        return result
 
     def __str__(self):
         return 'inir'
 
 
 class OpInd(BaseOp):
+    starts_block = True
+    uses_block_time = True
+    writes_memory = True
+
     def __init__(self, processor, memory, io):
         BaseOp.__init__(self)
         self.processor = processor
@@ -96,9 +132,10 @@ class OpInd(BaseOp):
         self.io = io
 
     def execute(self, processor, memory, pc):
-        _read_and_decrement_b(self.processor, self.memory, self.io, -1)
-        self.processor.set_condition('z', self.processor.main_registers['b'] == 0)
-        self.processor.set_condition('n', True)
+        registers = processor.registers
+        _read_and_decrement_b(processor, self.memory, self.io, -1)
+        processor.set_condition('z', registers[B] == 0)
+        processor.set_condition('n', True)
         return 16, False, pc
 
     def __str__(self):
@@ -106,6 +143,11 @@ class OpInd(BaseOp):
 
 
 class OpIndr(BaseOp):
+    starts_block = True
+    uses_block_time = True
+    ends_block = True
+    writes_memory = True
+
     def __init__(self, processor, memory, io):
         BaseOp.__init__(self)
         self.processor = processor
@@ -114,37 +156,60 @@ class OpIndr(BaseOp):
         self.last_t_states = None
 
     def execute(self, processor, memory, pc):
-        _read_and_decrement_b(self.processor, self.memory, self.io, -1)
-        self.processor.set_condition('z', True)
-        self.processor.set_condition('n', True)
-        if self.processor.main_registers['b'] == 0:
-            return 16, False, pc
-        else:
-            self.processor.special_registers['pc'] = (self.processor.special_registers['pc']) & 0xffff
-            return 21, True, pc
+        registers = processor.registers
+        iterations = repeat_iterations(processor, registers[B] or 0x100)
+        if iterations:
+            _bulk_read(processor, self.memory, self.io, -1, iterations)
+        _read_and_decrement_b(processor, self.memory, self.io, -1)
+        processor.set_condition('z', True)
+        processor.set_condition('n', True)
+        result = (16, False, pc) if registers[B] == 0 else (21, True, pc)
+        if iterations:
+            return finish_repeats(processor, iterations, result)
+        return result
 
     def __str__(self):
         return 'indr'
 
 
 def _read_and_decrement_b(processor, memory, io, hl_increment):
-    byte_counter = processor.main_registers['b']
-    value = io.read(processor.main_registers['c'], byte_counter)
-    destination = processor.get_16bit_reg('hl')
-    memory[0xffff & destination] = value
-    processor.main_registers['b'] = (byte_counter - 1) & 0xff
-    processor.set_16bit_reg('hl', (destination + hl_increment) & 0xffff)
+    registers = processor.registers
+    byte_counter = registers[B]
+    value = io.read(registers[C], byte_counter)
+    destination = (registers[H] << 8) | registers[L]
+    memory[destination] = value
+    registers[B] = (byte_counter - 1) & 0xff
+    destination = (destination + hl_increment) & 0xffff
+    registers[H] = destination >> 8
+    registers[L] = destination & 0xff
+
+
+def _bulk_read(processor, memory, io, hl_increment, count):
+    registers = processor.registers
+    byte_counter = registers[B]
+    destination = (registers[H] << 8) | registers[L]
+    for value in io.read_block(registers[C], byte_counter, count):
+        memory[destination] = value
+        destination = (destination + hl_increment) & 0xffff
+    registers[B] = (byte_counter - count) & 0xff
+    registers[H] = destination >> 8
+    registers[L] = destination & 0xff
 
 
 class OpOutA(BaseOp):
+    reads_flags = False
+    starts_block = True
+    uses_block_time = True
+
     def __init__(self, processor, io):
         BaseOp.__init__(self)
         self.processor = processor
         self.io = io
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         port, pc = fetch_byte(memory, pc)
-        self.io.write(port, self.processor.main_registers['a'], self.processor.main_registers['a'])
+        self.io.write(port, registers[A], registers[A])
         return 11, False, pc
 
     def __str__(self):
@@ -152,15 +217,21 @@ class OpOutA(BaseOp):
 
 
 class OpOutC8Reg(BaseOp):
+    reads_flags = False
+    starts_block = True
+    uses_block_time = True
+
     def __init__(self, processor, io, dest_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.io = io
         self.dest_reg = dest_reg
+        self.index = MAIN_REGISTERS[dest_reg]
 
     def execute(self, processor, memory, pc):
-        self.io.write(self.processor.main_registers['c'], self.processor.main_registers['b'],
-                      self.processor.main_registers[self.dest_reg])
+        registers = processor.registers
+        self.io.write(registers[C], registers[B],
+                      registers[self.index])
         return 12, False, pc
 
     def __str__(self):
@@ -168,13 +239,17 @@ class OpOutC8Reg(BaseOp):
 
 
 class OpOutCZero(BaseOp):
+    starts_block = True
+    uses_block_time = True
+
     def __init__(self, processor, io):
         BaseOp.__init__(self)
         self.processor = processor
         self.io = io
 
     def execute(self, processor, memory, pc):
-        self.io.write(self.processor.main_registers['c'], self.processor.main_registers['b'], 0)
+        registers = processor.registers
+        self.io.write(registers[C], registers[B], 0)
         return 12, False, pc
 
     def __str__(self):
@@ -182,6 +257,9 @@ class OpOutCZero(BaseOp):
 
 
 class OpOuti(BaseOp):
+    starts_block = True
+    uses_block_time = True
+
     def __init__(self, processor, memory, io):
         BaseOp.__init__(self)
         self.processor = processor
@@ -189,9 +267,10 @@ class OpOuti(BaseOp):
         self.io = io
 
     def execute(self, processor, memory, pc):
-        _write_and_decrement_b(self.processor, self.memory, self.io, 1)
-        self.processor.set_condition('z', self.processor.main_registers['b'] == 0)
-        self.processor.set_condition('n', True)
+        registers = processor.registers
+        _write_and_decrement_b(processor, self.memory, self.io, 1)
+        processor.set_condition('z', registers[B] == 0)
+        processor.set_condition('n', True)
         return 16, False, pc
 
     def __str__(self):
@@ -199,6 +278,10 @@ class OpOuti(BaseOp):
 
 
 class OpOtir(BaseOp):
+    starts_block = True
+    uses_block_time = True
+    ends_block = True
+
     def __init__(self, processor, memory, io):
         BaseOp.__init__(self)
         self.processor = processor
@@ -207,20 +290,26 @@ class OpOtir(BaseOp):
         self.last_t_states = None
 
     def execute(self, processor, memory, pc):
-        _write_and_decrement_b(self.processor, self.memory, self.io, 1)
-        self.processor.set_condition('z', True)
-        self.processor.set_condition('n', True)
-        if self.processor.main_registers['b'] == 0:
-            return 16, False, pc
-        else:
-            self.processor.special_registers['pc'] = (self.processor.special_registers['pc']) & 0xffff
-            return 21, True, pc
+        registers = processor.registers
+        iterations = repeat_iterations(processor, registers[B] or 0x100)
+        if iterations:
+            _bulk_write(processor, self.memory, self.io, 1, iterations)
+        _write_and_decrement_b(processor, self.memory, self.io, 1)
+        processor.set_condition('z', True)
+        processor.set_condition('n', True)
+        result = (16, False, pc) if registers[B] == 0 else (21, True, pc)
+        if iterations:
+            return finish_repeats(processor, iterations, result)
+        return result
 
     def __str__(self):
         return 'otir'
 
 
 class OpOutd(BaseOp):
+    starts_block = True
+    uses_block_time = True
+
     def __init__(self, processor, memory, io):
         BaseOp.__init__(self)
         self.processor = processor
@@ -228,9 +317,10 @@ class OpOutd(BaseOp):
         self.io = io
 
     def execute(self, processor, memory, pc):
-        _write_and_decrement_b(self.processor, self.memory, self.io, -1)
-        self.processor.set_condition('z', self.processor.main_registers['b'] == 0)
-        self.processor.set_condition('n', True)
+        registers = processor.registers
+        _write_and_decrement_b(processor, self.memory, self.io, -1)
+        processor.set_condition('z', registers[B] == 0)
+        processor.set_condition('n', True)
         return 16, False, pc
 
     def __str__(self):
@@ -238,6 +328,10 @@ class OpOutd(BaseOp):
 
 
 class OpOtdr(BaseOp):
+    starts_block = True
+    uses_block_time = True
+    ends_block = True
+
     def __init__(self, processor, memory, io):
         BaseOp.__init__(self)
         self.processor = processor
@@ -246,21 +340,41 @@ class OpOtdr(BaseOp):
         self.last_t_states = None
 
     def execute(self, processor, memory, pc):
-        _write_and_decrement_b(self.processor, self.memory, self.io, -1)
-        self.processor.set_condition('z', True)
-        self.processor.set_condition('n', True)
-        if self.processor.main_registers['b'] == 0:
-            return 16, False, pc
-        else:
-            self.processor.special_registers['pc'] = (self.processor.special_registers['pc']) & 0xffff
-            return 21, True, pc
+        registers = processor.registers
+        iterations = repeat_iterations(processor, registers[B] or 0x100)
+        if iterations:
+            _bulk_write(processor, self.memory, self.io, -1, iterations)
+        _write_and_decrement_b(processor, self.memory, self.io, -1)
+        processor.set_condition('z', True)
+        processor.set_condition('n', True)
+        result = (16, False, pc) if registers[B] == 0 else (21, True, pc)
+        if iterations:
+            return finish_repeats(processor, iterations, result)
+        return result
 
     def __str__(self):
         return 'otdr'
 
 
 def _write_and_decrement_b(processor, memory, io, hl_increment):
-    processor.main_registers['b'] = (processor.main_registers['b'] - 1) & 0xff
-    source = processor.get_16bit_reg('hl')
-    io.write(processor.main_registers['c'], processor.main_registers['b'], memory[0xffff & source])
-    processor.set_16bit_reg('hl', (source + hl_increment) & 0xffff)
+    registers = processor.registers
+    registers[B] = (registers[B] - 1) & 0xff
+    source = (registers[H] << 8) | registers[L]
+    io.write(registers[C], registers[B], memory[source])
+    source = (source + hl_increment) & 0xffff
+    registers[H] = source >> 8
+    registers[L] = source & 0xff
+
+
+def _bulk_write(processor, memory, io, hl_increment, count):
+    registers = processor.registers
+    byte_counter = registers[B]
+    source = (registers[H] << 8) | registers[L]
+    values = []
+    for _ in xrange(0, count):
+        values.append(memory[source])
+        source = (source + hl_increment) & 0xffff
+    io.write_block(registers[C], (byte_counter - 1) & 0xff, values)
+    registers[B] = (byte_counter - count) & 0xff
+    registers[H] = source >> 8
+    registers[L] = source & 0xff
@@ -1,28 +1,37 @@
 from memory.memory import fetch_word, fetch_signed_byte
 from z80.baseop import BaseOp
+from z80.registers import B, H, L, PC, INDEX_REGISTERS
 
 
 class OpJp(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        jp_to(self.processor, address)
-        return 10, True, pc
+        t_states = _loop_back(processor, address, 10)
+        jp_to(processor, address)
+        return t_states, True, pc
 
     def __str__(self):
         return 'jp nn'
 
 
 class OpJpHlIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.special_registers['pc'] = self.processor.get_16bit_reg('hl')
+        registers = processor.registers
+        registers[PC] = (registers[H] << 8) | registers[L]
         return 4, True, pc
 
     def __str__(self):
@@ -30,13 +39,17 @@ class OpJpHlIndirect(BaseOp):
 
 
 class OpJpIndexedIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.indexed = INDEX_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        self.processor.special_registers['pc'] = self.processor.index_registers[self.reg]
+        registers = processor.registers
+        registers[PC] = registers[self.indexed]
         return 8, True, pc
 
     def __str__(self):
@@ -44,6 +57,10 @@ class OpJpIndexedIndirect(BaseOp):
 
 
 class OpJpNz(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -56,6 +73,10 @@ class OpJpNz(BaseOp):
 
 
 class OpJpZ(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -68,6 +89,10 @@ class OpJpZ(BaseOp):
 
 
 class OpJpNc(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -80,6 +105,10 @@ class OpJpNc(BaseOp):
 
 
 class OpJpC(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -92,6 +121,10 @@ class OpJpC(BaseOp):
 
 
 class OpJpPo(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -104,6 +137,10 @@ class OpJpPo(BaseOp):
 
 
 class OpJpPe(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -116,6 +153,10 @@ class OpJpPe(BaseOp):
 
 
 class OpJpP(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -128,6 +169,10 @@ class OpJpP(BaseOp):
 
 
 class OpJpM(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -140,29 +185,40 @@ class OpJpM(BaseOp):
 
 
 def _cond_jp(processor, memory, pc, flag, jump_value):
+    registers = processor.registers
     address, pc = fetch_word(memory, pc)
     if processor.condition(flag) == jump_value:
-        processor.special_registers['pc'] = address
-        return 10, True, pc
+        t_states = _loop_back(processor, address, 10)
+        registers[PC] = address
+        return t_states, True, pc
     else:
         return 10, False, pc
 
 
 class OpJr(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         offset, pc = fetch_signed_byte(memory, pc)
-        _jr_offset(processor.special_registers, offset)
-        return 12, True, pc
+        t_states = 12 if offset >= 0 else _loop_back(processor, (pc + offset) & 0xffff, 12)
+        _jr_offset(processor.registers, offset)
+        return t_states, True, pc
 
     def __str__(self):
         return 'jr n'
 
 
 class OpJrC(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -175,6 +231,10 @@ class OpJrC(BaseOp):
 
 
 class OpJrNc(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -187,6 +247,10 @@ class OpJrNc(BaseOp):
 
 
 class OpJrZ(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -199,6 +263,10 @@ class OpJrZ(BaseOp):
 
 
 class OpJrNz(BaseOp):
+    reads_flags = False
+    uses_r = True
+    uses_block_time = True
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
@@ -211,15 +279,18 @@ class OpJrNz(BaseOp):
 
 
 class OpDjnz(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         offset, pc = fetch_signed_byte(memory, pc)
-        self.processor.main_registers['b'] = (self.processor.main_registers['b'] - 1) & 0xff
-        if self.processor.main_registers['b'] != 0:
-            _jr_offset(self.processor.special_registers, offset)
+        registers[B] = (registers[B] - 1) & 0xff
+        if registers[B] != 0:
+            _jr_offset(processor.registers, offset)
             return 13, True, pc
         else:
             return 8, False, pc
@@ -229,17 +300,25 @@ class OpDjnz(BaseOp):
 
 
 def jp_to(processor, address):
-    processor.special_registers['pc'] = address
+    processor.registers[PC] = address
 
 
 def _cond_jr(processor, memory, pc, flag, jump_value):
     offset, pc = fetch_signed_byte(memory, pc)
     if processor.condition(flag) == jump_value:
-        _jr_offset(processor.special_registers, offset)
-        return 12, True, pc
+        t_states = 12 if offset >= 0 else _loop_back(processor, (pc + offset) & 0xffff, 12)
+        _jr_offset(processor.registers, offset)
+        return t_states, True, pc
     else:
         return 7, False, pc
 
 
-def _jr_offset(special_registers, offset):
-    special_registers['pc'] = (special_registers['pc'] + (offset + 2)) & 0xffff
+def _loop_back(processor, address, t_states):
+    detector = processor.idle_loop_detector
+    if detector is None:
+        return t_states
+    return t_states + detector.loop_back(address, t_states)
+
+
+def _jr_offset(registers, offset):
+    registers[PC] = (registers[PC] + (offset + 2)) & 0xffff
@@ -1,20 +1,25 @@
 from baseop import BaseOp
 from memory.memory import fetch_byte, fetch_word
 from z80.funcs import big_endian_value, high_low_pair, to_signed
+from z80.registers import A, H, L, SP, MAIN_REGISTERS, INDEX_REGISTERS, REGISTER_PAIRS
 
 
 class OpLd16RegImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.reg = reg
+        self.high, self.low = REGISTER_PAIRS[reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         lsb, pc = fetch_byte(memory, pc)
         msb, pc = fetch_byte(memory, pc)
-        self.processor.main_registers[self.reg[0]] = msb
-        self.processor.main_registers[self.reg[1]] = lsb
+        registers[self.high] = msb
+        registers[self.low] = lsb
         return 10, False, pc
 
     def __str__(self):
@@ -22,16 +27,21 @@ class OpLd16RegImmediate(BaseOp):
 
 
 class OpLd16RegIndirectFrom8Reg(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory, destination_reg, source_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.destination_reg = destination_reg
         self.source_reg = source_reg
+        self.high, self.low = REGISTER_PAIRS[destination_reg]
+        self.source = MAIN_REGISTERS[source_reg]
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg(self.destination_reg)
-        self.memory[0xffff & address] = self.processor.main_registers[self.source_reg]
+        registers = processor.registers
+        memory[(registers[self.high] << 8) | registers[self.low]] = registers[self.source]
         return 7, False, pc
 
     def __str__(self):
@@ -39,14 +49,17 @@ class OpLd16RegIndirectFrom8Reg(BaseOp):
 
 
 class OpLd8RegImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
         operand, pc = fetch_byte(memory, pc)
-        self.processor.main_registers[self.reg] = operand
+        processor.registers[self.index] = operand
         return 7, False, pc
 
     def __str__(self):
@@ -54,16 +67,20 @@ class OpLd8RegImmediate(BaseOp):
 
 
 class OpLd8RegFrom16RegIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, destination_reg, source_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.destination_reg = destination_reg
         self.source_reg = source_reg
+        self.destination = MAIN_REGISTERS[destination_reg]
+        self.high, self.low = REGISTER_PAIRS[source_reg]
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg(self.source_reg)
-        self.processor.main_registers[self.destination_reg] = self.memory[0xffff & address]
+        registers = processor.registers
+        registers[self.destination] = memory[(registers[self.high] << 8) | registers[self.low]]
         return 7, False, pc
 
     def __str__(self):
@@ -71,14 +88,19 @@ class OpLd8RegFrom16RegIndirect(BaseOp):
 
 
 class OpLd8RegFrom8Reg(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, destination_reg, source_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.destination_reg = destination_reg
         self.source_reg = source_reg
+        self.destination = MAIN_REGISTERS[destination_reg]
+        self.source = MAIN_REGISTERS[source_reg]
 
     def execute(self, processor, memory, pc):
-        self.processor.main_registers[self.destination_reg] = self.processor.main_registers[self.source_reg]
+        registers = processor.registers
+        registers[self.destination] = registers[self.source]
         return 4, False, pc
 
     def __str__(self):
@@ -86,6 +108,9 @@ class OpLd8RegFrom8Reg(BaseOp):
 
 
 class OpLdAddressA(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
@@ -93,7 +118,7 @@ class OpLdAddressA(BaseOp):
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        self.memory[0xffff & address] = self.processor.main_registers['a']
+        memory[0xffff & address] = processor.registers[A]
         return 13, False, pc
 
     def __str__(self):
@@ -101,6 +126,8 @@ class OpLdAddressA(BaseOp):
 
 
 class OpLdAAddress(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
@@ -108,7 +135,7 @@ class OpLdAAddress(BaseOp):
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        self.processor.main_registers['a'] = self.memory[0xffff & address]
+        processor.registers[A] = memory[0xffff & address]
         return 13, False, pc
 
     def __str__(self):
@@ -116,16 +143,21 @@ class OpLdAAddress(BaseOp):
 
 
 class OpLdAddress16Reg(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory, source_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.source_reg = source_reg
+        self.high, self.low = REGISTER_PAIRS[source_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         dest_address, pc = fetch_word(memory, pc)
-        self.memory[0xffff & dest_address] = self.processor.main_registers[self.source_reg[1]]
-        self.memory[0xffff & dest_address + 1] = self.processor.main_registers[self.source_reg[0]]
+        memory[0xffff & dest_address] = registers[self.low]
+        memory[0xffff & dest_address + 1] = registers[self.high]
         return 20, False, pc
 
     def __str__(self):
@@ -133,15 +165,19 @@ class OpLdAddress16Reg(BaseOp):
 
 
 class OpLdAddressHl(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         dest_address, pc = fetch_word(memory, pc)
-        self.memory[0xffff & dest_address] = self.processor.main_registers['l']
-        self.memory[0xffff & dest_address + 1] = self.processor.main_registers['h']
+        memory[0xffff & dest_address] = registers[L]
+        memory[0xffff & dest_address + 1] = registers[H]
         return 16, False, pc
 
     def __str__(self):
@@ -149,18 +185,20 @@ class OpLdAddressHl(BaseOp):
 
 
 class OpLd16RegAddress(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, destination_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.destination_reg = destination_reg
+        self.high, self.low = REGISTER_PAIRS[destination_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         src_address, pc = fetch_word(memory, pc)
-        low_byte = self.memory[0xffff & src_address]
-        high_byte = self.memory[0xffff & (src_address + 1)]
-        self.processor.main_registers[self.destination_reg[0]] = high_byte
-        self.processor.main_registers[self.destination_reg[1]] = low_byte
+        registers[self.low] = memory[0xffff & src_address]
+        registers[self.high] = memory[0xffff & (src_address + 1)]
         return 20, False, pc
 
     def __str__(self):
@@ -168,17 +206,18 @@ class OpLd16RegAddress(BaseOp):
 
 
 class OpLdHlAddress(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         src_address, pc = fetch_word(memory, pc)
-        low_byte = self.memory[0xffff & src_address]
-        high_byte = self.memory[0xffff & (src_address + 1)]
-        self.processor.main_registers['h'] = high_byte
-        self.processor.main_registers['l'] = low_byte
+        registers[L] = memory[0xffff & src_address]
+        registers[H] = memory[0xffff & (src_address + 1)]
         return 16, False, pc
 
     def __str__(self):
@@ -186,13 +225,15 @@ class OpLdHlAddress(BaseOp):
 
 
 class OpLdSpImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        self.processor.special_registers['sp'] = address
+        processor.registers[SP] = address
         return 10, False, pc
 
     def __str__(self):
@@ -200,13 +241,15 @@ class OpLdSpImmediate(BaseOp):
 
 
 class OpLdSpHl(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor):
         BaseOp.__init__(self)
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        self.processor.special_registers['sp'] = big_endian_value([self.processor.main_registers['l'],
-                                                                   self.processor.main_registers['h']])
+        registers = processor.registers
+        registers[SP] = (registers[H] << 8) | registers[L]
         return 6, False, pc
 
     def __str__(self):
@@ -214,14 +257,18 @@ class OpLdSpHl(BaseOp):
 
 
 class OpLdHlIndirectImmediate(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         operand, pc = fetch_byte(memory, pc)
-        self.memory[0xffff & self.processor.get_16bit_reg('hl')] = operand
+        memory[(registers[H] << 8) | registers[L]] = operand
         return 10, False, pc
 
     def __str__(self):
@@ -229,6 +276,9 @@ class OpLdHlIndirectImmediate(BaseOp):
 
 
 class OpLdExtSp(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
@@ -236,9 +286,9 @@ class OpLdExtSp(BaseOp):
 
     def execute(self, processor, memory, pc):
         dest_address, pc = fetch_word(memory, pc)
-        high_byte, low_byte = high_low_pair(self.processor.special_registers['sp'])
-        self.memory[0xffff & dest_address] = low_byte
-        self.memory[0xffff & (dest_address + 1)] = high_byte
+        high_byte, low_byte = high_low_pair(processor.registers[SP])
+        memory[0xffff & dest_address] = low_byte
+        memory[0xffff & (dest_address + 1)] = high_byte
         return 20, False, pc
 
     def __str__(self):
@@ -246,6 +296,8 @@ class OpLdExtSp(BaseOp):
 
 
 class OpLdSpExt(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
@@ -253,9 +305,9 @@ class OpLdSpExt(BaseOp):
 
     def execute(self, processor, memory, pc):
         src_address, pc = fetch_word(memory, pc)
-        low_byte = self.memory[0xffff & src_address]
-        high_byte = self.memory[0xffff & (src_address + 1)]
-        self.processor.special_registers['sp'] = big_endian_value([low_byte, high_byte])
+        low_byte = memory[0xffff & src_address]
+        high_byte = memory[0xffff & (src_address + 1)]
+        processor.registers[SP] = big_endian_value([low_byte, high_byte])
         return 20, False, pc
 
     def __str__(self):
@@ -263,14 +315,17 @@ class OpLdSpExt(BaseOp):
 
 
 class OpLdIndexedImmediate(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
         address, pc = fetch_word(memory, pc)
-        self.processor.index_registers[self.indexed_reg] = address
+        processor.registers[self.indexed] = address
         return 14, False, pc
 
     def __str__(self):
@@ -278,17 +333,21 @@ class OpLdIndexedImmediate(BaseOp):
 
 
 class OpLdExtIndexed(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
         dest_address, pc = fetch_word(memory, pc)
-        high_byte, low_byte = high_low_pair(self.processor.index_registers[self.indexed_reg])
-        self.memory[0xffff & dest_address] = low_byte
-        self.memory[0xffff & (dest_address + 1)] = high_byte
+        high_byte, low_byte = high_low_pair(processor.registers[self.indexed])
+        memory[0xffff & dest_address] = low_byte
+        memory[0xffff & (dest_address + 1)] = high_byte
         return 20, False, pc
 
     def __str__(self):
@@ -296,17 +355,20 @@ class OpLdExtIndexed(BaseOp):
 
 
 class OpLdIndexedExt(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
         src_address, pc = fetch_word(memory, pc)
-        low_byte = self.memory[0xffff & src_address]
-        high_byte = self.memory[0xffff & (src_address + 1)]
-        self.processor.index_registers[self.indexed_reg] = big_endian_value([low_byte, high_byte])
+        low_byte = memory[0xffff & src_address]
+        high_byte = memory[0xffff & (src_address + 1)]
+        processor.registers[self.indexed] = big_endian_value([low_byte, high_byte])
         return 20, False, pc
 
     def __str__(self):
@@ -314,18 +376,22 @@ class OpLdIndexedExt(BaseOp):
 
 
 class OpLdIndexedIndirectImmediate(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
         operand, pc = fetch_byte(memory, pc)
         immediate_value, pc = fetch_byte(memory, pc)
 
         offset = to_signed(operand)
-        self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)] = immediate_value
+        memory[0xffff & (processor.registers[self.indexed] + offset)] = immediate_value
         return 19, False, pc
 
     def __str__(self):
@@ -333,18 +399,22 @@ class OpLdIndexedIndirectImmediate(BaseOp):
 
 
 class OpLd8RegIndexedIndirect(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, memory, destination_reg, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.destination_reg = destination_reg
         self.indexed_reg = indexed_reg
+        self.destination = MAIN_REGISTERS[destination_reg]
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         operand, pc = fetch_byte(memory, pc)
         offset = to_signed(operand)
-        self.processor.main_registers[self.destination_reg] = self.memory[
-            0xffff & (self.processor.index_registers[self.indexed_reg] + offset)]
+        registers[self.destination] = memory[0xffff & (registers[self.indexed] + offset)]
         return 19, False, pc
 
     def __str__(self):
@@ -352,18 +422,23 @@ class OpLd8RegIndexedIndirect(BaseOp):
 
 
 class OpLdIndexedIndirect8Reg(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg, source_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
         self.source_reg = source_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
+        self.source = MAIN_REGISTERS[source_reg]
 
     def execute(self, processor, memory, pc):
+        registers = processor.registers
         operand, pc = fetch_byte(memory, pc)
         offset = to_signed(operand)
-        self.memory[0xffff & (self.processor.index_registers[self.indexed_reg] + offset)] = \
-            self.processor.main_registers[self.source_reg]
+        memory[0xffff & (registers[self.indexed] + offset)] = registers[self.source]
         return 19, False, pc
 
     def __str__(self):
@@ -371,13 +446,17 @@ class OpLdIndexedIndirect8Reg(BaseOp):
 
 
 class OpLdSpIndexed(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
-        self.processor.special_registers['sp'] = self.processor.index_registers[self.indexed_reg]
+        registers = processor.registers
+        registers[SP] = registers[self.indexed]
         return 10, False, pc
 
     def __str__(self):
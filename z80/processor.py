@@ -1,3 +1,5 @@
+import sys
+
 from arithmetic_16 import *
 from baseop import *
 from call import *
@@ -10,54 +12,57 @@ from rotate import *
 from stack import *
 from z80.arithmetic_8 import *
 from z80.block_operations import *
+from z80.block_cache import BlockCache
 from z80.dd_fd_group import OpDdFdGroup
 from z80.ed_group import OpEdGroup
+from z80.interrupt_controller import InterruptController, im0_data
 from z80.io import *
+from z80.trace import InstructionTrace
 from cb_group import OpCbGroup
+from z80.registers import F, I, R, SP, PC, MAIN_REGISTERS, ALTERNATE_REGISTERS, SPECIAL_REGISTERS, \
+    INDEX_REGISTERS, REGISTER_PAIRS, FLAG_MASKS, RegisterView, build_register_file, word_register, get_word, \
+    set_word
+
+STOP_T_STATES = 't_states'
+STOP_PC = 'pc'
+STOP_PREDICATE = 'predicate'
 
 
 class Processor:
-    def __init__(self, memory, io):
+    def __init__(self, memory, io, lazy_flags=False):
         self.memory = memory
         self.io = io
-        self.main_registers = self.build_swappable_register_set()
-        self.alternate_registers = self.build_swappable_register_set()
-        self.special_registers = self.build_special_register_set()
-        self.index_registers = self.build_index_register_set()
+        # test-only: deferring flags is slower than the eager table lookup, so machines never enable it
+        self.lazy_flags = lazy_flags
+        self.pending_flags = None
+        self.registers = build_register_file()
+        self.main_registers = MainRegisterView(self)
+        self.alternate_registers = RegisterView(self.registers, ALTERNATE_REGISTERS)
+        self.special_registers = RegisterView(self.registers, SPECIAL_REGISTERS)
+        self.index_registers = RegisterView(self.registers, INDEX_REGISTERS)
         self.operations_by_opcode = self.init_opcode_map()
+        self.prefixed_operations = self.init_prefixed_operations()
+        self.indexed_cb_operations = self.init_indexed_cb_operations()
         self.enable_iff = False
         self.iff = [False, False]
-        self.interrupt_data_queue = []
-        self.interrupt_data_exists = False
         self.interrupt_mode = 0
-        self.interrupt_requests = []
-        self.interrupt_requests_exist = False
+        self.interrupt_controller = InterruptController()
         self.halting = False
+        self.im0_response_ops = [OpRst(self, op_code & 0x38, True) if op_code & 0xc7 == 0xc7
+                                 else self.operations_by_opcode[op_code] for op_code in range(0, 0x100)]
         self.im1_response_op = OpRst(self, 0x0038, True)
+        self.im2_response_op = OpCallDirect(self, 0x0000, True)
+        self.halted_op = OpHalted()
         self.last_operation = None
-        self.condition_masks = {
-            'c': 0b00000001,
-            'n': 0b00000010,
-            'p': 0b00000100,
-            'h': 0b00010000,
-            'z': 0b01000000,
-            's': 0b10000000
-        }
-
-    @staticmethod
-    def build_swappable_register_set():
-        return {'a': 0x0, 'f': 0x0, 'b': 0x0, 'c': 0x0, 'd': 0x0, 'e': 0x0, 'h': 0x0, 'l': 0x0}
-
-    @staticmethod
-    def build_index_register_set():
-        return {'ix': 0x0000, 'iy': 0x0000}
-
-    @staticmethod
-    def build_special_register_set():
-        return {'i': 0x0, 'r': 0x0, 'sp': 0xffff, 'pc': 0x0000}
+        self.repeat_t_state_budget = 0
+        self.block_t_states = 0
+        self.run_instructions = 0
+        self.idle_loop_detector = None
+        self.trace = None
+        self.block_cache = BlockCache(self) if hasattr(memory, 'write_handlers') else None
 
     def init_opcode_map(self):
-        return {
+        return operation_table({
             0x00: Nop(),
 
             0x01: OpLd16RegImmediate(self, self.memory, 'bc'),
@@ -331,7 +336,22 @@ class Processor:
             0xed: OpEdGroup(self, self.memory, self.io),
             0xdd: OpDdFdGroup('ix', self, self.memory),
             0xfd: OpDdFdGroup('iy', self, self.memory)
-        }
+        })
+
+    def init_prefixed_operations(self):
+        for prefix in [0xdd, 0xfd]:
+            self.operations_by_opcode[prefix].fill_undefined_ops(self.operations_by_opcode)
+
+        prefixed_operations = [None] * 0x100
+        for prefix in [0xcb, 0xed, 0xdd, 0xfd]:
+            prefixed_operations[prefix] = self.operations_by_opcode[prefix].ops
+        return prefixed_operations
+
+    def init_indexed_cb_operations(self):
+        indexed_cb_operations = [None] * 0x100
+        for prefix in [0xdd, 0xfd]:
+            indexed_cb_operations[prefix] = self.operations_by_opcode[prefix].ops[0xcb].ops
+        return indexed_cb_operations
 
     def set_iff(self):
         self.iff[0] = True
@@ -341,26 +361,30 @@ class Processor:
         self.halting = False
         self.iff[0] = False
         self.push_pc()
-        self.special_registers['pc'] = 0x0066
+        self.registers[PC] = 0x0066
 
     def set_interrupt_mode(self, interrupt_mode):
         self.interrupt_mode = interrupt_mode
 
     def interrupt(self, interrupt_request):
-        self.interrupt_requests.append(interrupt_request)
-        self.interrupt_requests_exist = True
+        self.interrupt_controller.request(interrupt_request)
+
+    def set_int_line(self, asserted):
+        self.interrupt_controller.set_int_line(asserted)
 
     def push_pc(self):
-        high_byte, low_byte = high_low_pair(self.special_registers['pc'])
+        high_byte, low_byte = high_low_pair(self.registers[PC])
         self.push_byte(high_byte)
         self.push_byte(low_byte)
 
     def execute(self):
         enable_iff_after_op = self.enable_iff
-        special_registers = self.special_registers
+        registers = self.registers
 
-        before_pc = special_registers['pc']
+        before_pc = registers[PC]
         operation, interrupt_triggered, after_pc = self.get_operation(before_pc)
+        if self.pending_flags is not None and operation.reads_flags:
+            self.resolve_flags()
 
         t_states, jumped, after_pc = operation.execute(self, self.memory, after_pc)
         if enable_iff_after_op:
@@ -369,123 +393,336 @@ class Processor:
         self.last_operation = operation
 
         if not jumped:
-            special_registers['pc'] = after_pc
+            registers[PC] = after_pc
 
         # increment refresh register
         if not interrupt_triggered:
-            current_r = special_registers['r']
-            high_bit = current_r & 0b10000000
-            low_bits = current_r & 0b01111111
-            low_bits += ((after_pc - before_pc) & 0xffff)
-            special_registers['r'] = high_bit | (low_bits & 0b01111111)
+            current_r = registers[R]
+            registers[R] = (current_r & 0b10000000) | ((current_r + ((after_pc - before_pc) & 0xffff)) & 0b01111111)
 
         return t_states
 
+    def run(self, t_state_budget, clock=None):
+        if self.trace is not None:
+            return self.run_traced(t_state_budget, -1, None, clock)
+        registers = self.registers
+        memory = self.memory
+        get_operation = self.get_operation
+        operations_by_opcode = self.operations_by_opcode
+        prefixed_operations = self.prefixed_operations
+        interrupt_controller = self.interrupt_controller
+        iff = self.iff
+        lazy_flags = self.lazy_flags
+        start = clock.t_states if clock is not None else 0
+        enable_iff_after_op = self.enable_iff
+        operation = self.last_operation
+        instructions = 0
+        total = 0
+        while total < t_state_budget:
+            before_pc = registers[PC]
+            op_code = memory[before_pc]
+            if self.halting or (iff[0] and interrupt_controller.pending) or prefixed_operations[op_code] is not None:
+                operation, interrupt_triggered, after_pc = get_operation(before_pc)
+            else:
+                operation = operations_by_opcode[op_code]
+                interrupt_triggered = False
+                after_pc = (before_pc + 1) & 0xffff
+            if lazy_flags and operation.reads_flags and self.pending_flags is not None:
+                self.resolve_flags()
+            if operation.uses_block_time:
+                self.repeat_t_state_budget = t_state_budget - total
+                if clock is not None:
+                    clock.t_states = start + total
+
+            op_t_states, jumped, after_pc = operation.execute(self, memory, after_pc)
+            if enable_iff_after_op:
+                self.set_iff()
+                self.enable_iff = False
+            enable_iff_after_op = self.enable_iff
+
+            if not jumped:
+                registers[PC] = after_pc
+
+            if not interrupt_triggered:
+                current_r = registers[R]
+                registers[R] = (current_r & 0b10000000) | ((current_r + ((after_pc - before_pc) & 0xffff)) & 0b01111111)
+
+            total += op_t_states
+            instructions += 1
+
+        self.last_operation = operation
+        self.repeat_t_state_budget = 0
+        self.run_instructions = instructions
+        if clock is not None:
+            clock.t_states = start + total
+        return total, STOP_T_STATES
+
+    def run_until(self, pc=None, t_states=None, predicate=None):
+        t_state_budget = t_states if t_states is not None else sys.maxint
+        stop_pc = pc if pc is not None else -1
+        if self.trace is not None:
+            return self.run_traced(t_state_budget, stop_pc, predicate)
+        if predicate is not None:
+            return self._run_until_predicate(t_state_budget, stop_pc, predicate)
+        if pc is not None:
+            return self._run_to_pc(t_state_budget, stop_pc)
+        return self.run(t_state_budget)
+
+    def _run_to_pc(self, t_state_budget, stop_pc):
+        registers = self.registers
+        memory = self.memory
+        get_operation = self.get_operation
+        operations_by_opcode = self.operations_by_opcode
+        prefixed_operations = self.prefixed_operations
+        interrupt_controller = self.interrupt_controller
+        iff = self.iff
+        lazy_flags = self.lazy_flags
+        enable_iff_after_op = self.enable_iff
+        operation = self.last_operation
+        instructions = 0
+        total = 0
+        reason = STOP_T_STATES
+        while total < t_state_budget:
+            before_pc = registers[PC]
+            op_code = memory[before_pc]
+            if self.halting or (iff[0] and interrupt_controller.pending) or prefixed_operations[op_code] is not None:
+                operation, interrupt_triggered, after_pc = get_operation(before_pc)
+            else:
+                operation = operations_by_opcode[op_code]
+                interrupt_triggered = False
+                after_pc = (before_pc + 1) & 0xffff
+            if lazy_flags and operation.reads_flags and self.pending_flags is not None:
+                self.resolve_flags()
+
+            op_t_states, jumped, after_pc = operation.execute(self, memory, after_pc)
+            if enable_iff_after_op:
+                self.set_iff()
+                self.enable_iff = False
+            enable_iff_after_op = self.enable_iff
+
+            if not jumped:
+                registers[PC] = after_pc
+
+            if not interrupt_triggered:
+                current_r = registers[R]
+                registers[R] = (current_r & 0b10000000) | ((current_r + ((after_pc - before_pc) & 0xffff)) & 0b01111111)
+
+            total += op_t_states
+            instructions += 1
+            if registers[PC] == stop_pc:
+                reason = STOP_PC
+                break
+
+        self.last_operation = operation
+        self.run_instructions = instructions
+        return total, reason
+
+    def _run_until_predicate(self, t_state_budget, stop_pc, predicate):
+        registers = self.registers
+        memory = self.memory
+        get_operation = self.get_operation
+        operations_by_opcode = self.operations_by_opcode
+        prefixed_operations = self.prefixed_operations
+        interrupt_controller = self.interrupt_controller
+        iff = self.iff
+        lazy_flags = self.lazy_flags
+        instructions = 0
+        total = 0
+        reason = STOP_T_STATES
+        while total < t_state_budget:
+            enable_iff_after_op = self.enable_iff
+            before_pc = registers[PC]
+            op_code = memory[before_pc]
+            if self.halting or (iff[0] and interrupt_controller.pending) or prefixed_operations[op_code] is not None:
+                operation, interrupt_triggered, after_pc = get_operation(before_pc)
+            else:
+                operation = operations_by_opcode[op_code]
+                interrupt_triggered = False
+                after_pc = (before_pc + 1) & 0xffff
+            if lazy_flags and operation.reads_flags and self.pending_flags is not None:
+                self.resolve_flags()
+
+            op_t_states, jumped, after_pc = operation.execute(self, memory, after_pc)
+            if enable_iff_after_op:
+                self.set_iff()
+                self.enable_iff = False
+            self.last_operation = operation
+
+            if not jumped:
+                registers[PC] = after_pc
+
+            if not interrupt_triggered:
+                current_r = registers[R]
+                registers[R] = (current_r & 0b10000000) | ((current_r + ((after_pc - before_pc) & 0xffff)) & 0b01111111)
+
+            total += op_t_states
+            instructions += 1
+            if registers[PC] == stop_pc:
+                reason = STOP_PC
+                break
+            if predicate(self):
+                reason = STOP_PREDICATE
+                break
+
+        self.run_instructions = instructions
+        return total, reason
+
+    def run_traced(self, t_state_budget, stop_pc, predicate, clock=None):
+        registers = self.registers
+        execute = self.execute
+        instructions = 0
+        total = 0
+        reason = STOP_T_STATES
+        while total < t_state_budget:
+            op_t_states = execute()
+            total += op_t_states
+            instructions += 1
+            if clock is not None:
+                clock.t_states += op_t_states
+            if registers[PC] == stop_pc:
+                reason = STOP_PC
+                break
+            if predicate is not None and predicate(self):
+                reason = STOP_PREDICATE
+                break
+
+        self.run_instructions = instructions
+        return total, reason
+
+    def enable_tracing(self, size):
+        self.trace = InstructionTrace(size)
+        self.execute = self.traced_execute
+        self.run_block = self.traced_run_block
+
+    def disable_tracing(self):
+        self.trace = None
+        self.__dict__.pop('execute', None)
+        self.__dict__.pop('run_block', None)
+
+    def traced_execute(self):
+        if self.pending_flags is not None:
+            self.resolve_flags()
+        trace = self.trace
+        index = trace.start(self.registers, self.memory)
+        t_states = Processor.execute(self)
+        trace.finish(index, t_states)
+        return t_states
+
+    def traced_run_block(self):
+        return self.traced_execute(), 1
+
+    def run_block(self):
+        if self.block_cache is None or self.halting or self.enable_iff or \
+                (self.iff[0] and self.interrupt_controller.pending):
+            return self.execute(), 1
+        result = self.block_cache.run()
+        self.block_t_states = 0
+        return result
+
     def get_operation(self, pc):
-        if self.iff[0] and self.interrupt_requests_exist:
-            interrupt_mode = self.interrupt_mode
+        if self.iff[0] and self.interrupt_controller.pending:
             self.halting = False
-            next_request = self.interrupt_requests.pop(0)
-            if len(self.interrupt_requests) == 0:
-                self.interrupt_requests_exist = False
-            next_request.acknowledge()
+            self.iff[0] = False
+            self.iff[1] = False
+            request = self.interrupt_controller.acknowledge()
+            interrupt_mode = self.interrupt_mode
             if interrupt_mode == 1:
                 return self.im1_response_op, True, pc
             elif interrupt_mode == 2:
-                table_index = big_endian_value([self.special_registers['r'] & 0xfe, self.special_registers['i']])
+                table_index = (self.registers[I] << 8) | (self.registers[R] & 0xfe)
                 jump_low_byte = self.memory[0xffff & table_index]
                 jump_high_byte = self.memory[0xffff & (table_index + 1)]
-                return OpCallDirect(self, big_endian_value([jump_low_byte, jump_high_byte]), True), True, pc
+                self.im2_response_op.address = big_endian_value([jump_low_byte, jump_high_byte])
+                return self.im2_response_op, True, pc
+            else:
+                return self.im0_response_ops[im0_data(request)], True, pc
 
         if self.halting:
-            op_code = 0x00
-        else:
-            op_code = self.memory[pc]
-
-        return self.operations_by_opcode[op_code], False, (pc + 1) & 0xffff
-
-    # def get_address_at_pc(self):
-    #     return [self.get_next_byte(), self.get_next_byte()]
-
-    # def fetch_bytes(self):
-    #    pc = self.special_registers['pc']
-    #    bytes = self.memory[pc:pc+6 if pc < 0xfffb else 0x10000]
-    #    bytes.extend(self.memory[0:6 - len(bytes)])
-    #    return bytes
-
-    # def get_next_byte(self):
-    #     if self.interrupt_data_exists:
-    #         item = self.interrupt_data_queue.pop()
-    #         if len(self.interrupt_data_queue) == 0:
-    #             self.interrupt_data_exists = False
-    #         return item
-    #     else:
-    #         # increment refresh register
-    #         # current_r = self.special_registers['r']
-    #         # high_bit = current_r & 0b10000000
-    #         # low_bits = current_r & 0b01111111
-    #         # low_bits += 1
-    #         self.special_registers['r'] = high_bit | (low_bits & 0b01111111)
-    #
-    #         pc_value = self.special_registers['pc']
-    #         op_code = self.memory[0xffff & pc_value]
-    #         self.special_registers['pc'] = (pc_value + 1) & 0xffff
-    #         return op_code
+            return self.halted_op, False, (pc + 1) & 0xffff
+
+        memory = self.memory
+        op_code = memory[pc]
+        prefixed_operations = self.prefixed_operations[op_code]
+        if prefixed_operations is None:
+            return self.operations_by_opcode[op_code], False, (pc + 1) & 0xffff
+
+        prefixed_op_code = memory[(pc + 1) & 0xffff]
+        if prefixed_op_code == 0xcb:
+            indexed_cb_operations = self.indexed_cb_operations[op_code]
+            if indexed_cb_operations is not None:
+                return indexed_cb_operations[memory[(pc + 3) & 0xffff]], False, (pc + 2) & 0xffff
+        return prefixed_operations[prefixed_op_code], False, (pc + 2) & 0xffff
 
     def get_signed_offset_byte(self):
-        return to_signed(self.memory[0xffff & (self.special_registers['pc'] - 2)])
+        return to_signed(self.memory[0xffff & (self.registers[PC] - 2)])
 
     def restore_pc_from_stack(self):
-        self.special_registers['pc'] = self._get_destination_from_stack()
+        self.registers[PC] = self._get_destination_from_stack()
 
     def _get_destination_from_stack(self):
         return big_endian_value([self.pop_byte(), self.pop_byte()])
 
     def push_byte(self, byte):
-        self.special_registers['sp'] = (self.special_registers['sp'] - 1) & 0xffff
-        self.memory[0xffff & self.special_registers['sp']] = byte
+        registers = self.registers
+        sp = (registers[SP] - 1) & 0xffff
+        registers[SP] = sp
+        self.memory[sp] = byte
 
     def pop_byte(self):
-        byte = self.memory[0xffff & self.special_registers['sp']]
-        if self.special_registers['sp'] == 0xffff:
-            self.special_registers['sp'] = 0
-        else:
-            self.special_registers['sp'] += 1
-        return byte
+        registers = self.registers
+        sp = registers[SP]
+        registers[SP] = (sp + 1) & 0xffff
+        return self.memory[sp]
+
+    def resolve_flags(self):
+        table, index, shift, keep = self.pending_flags
+        self.pending_flags = None
+        self.registers[F] = (self.registers[F] & keep) | (table[index] >> shift)
 
     def set_condition(self, flag, value):
-        mask = self.condition_masks[flag]
+        if self.pending_flags is not None:
+            self.resolve_flags()
         if value:
-            self.main_registers['f'] |= mask
+            self.registers[F] |= FLAG_MASKS[flag]
         else:
-            self.main_registers['f'] &= (0xff ^ mask)
+            self.registers[F] &= (0xff ^ FLAG_MASKS[flag])
 
     def condition(self, flag):
-        mask = self.condition_masks[flag]
-        return self.main_registers['f'] & mask > 0
+        if self.pending_flags is not None:
+            self.resolve_flags()
+        return self.registers[F] & FLAG_MASKS[flag] > 0
 
     def get_16bit_reg(self, register_pair):
-        if register_pair == 'sp':
-            return self.special_registers['sp']
-        else:
-            main_registers = self.main_registers
-            msb = main_registers[register_pair[0]]
-            lsb = main_registers[register_pair[1]]
-            return big_endian_value([lsb, msb])
+        if register_pair == 'af' and self.pending_flags is not None:
+            self.resolve_flags()
+        high, low = word_register(register_pair)
+        return get_word(self.registers, high, low)
 
     def set_16bit_reg(self, register_pair, val_16bit):
-        if register_pair == 'sp':
-            self.special_registers['sp'] = val_16bit
-        else:
-            high_byte, low_byte = high_low_pair(val_16bit)
-            main_registers = self.main_registers
-            main_registers[register_pair[0]] = high_byte
-            main_registers[register_pair[1]] = low_byte
+        if register_pair == 'af':
+            self.pending_flags = None
+        high, low = word_register(register_pair)
+        set_word(self.registers, high, low, val_16bit)
 
     def get_16bit_alt_reg(self, register_pair):
-        msb = self.alternate_registers[register_pair[0]]
-        lsb = self.alternate_registers[register_pair[1]]
-        return big_endian_value([lsb, msb])
+        high, low = REGISTER_PAIRS[register_pair]
+        return get_word(self.registers, high + 8, low + 8)
+
+
+class MainRegisterView(RegisterView):
+    def __init__(self, processor):
+        RegisterView.__init__(self, processor.registers, MAIN_REGISTERS)
+        self.processor = processor
+
+    def __getitem__(self, name):
+        if name == 'f' and self.processor.pending_flags is not None:
+            self.processor.resolve_flags()
+        return RegisterView.__getitem__(self, name)
+
+    def __setitem__(self, name, value):
+        if name == 'f':
+            self.processor.pending_flags = None
+        RegisterView.__setitem__(self, name, value)
 
 
 class InterruptRequest:
@@ -0,0 +1,76 @@
+A, F, B, C, D, E, H, L = range(0, 8)
+A_ALT, F_ALT, B_ALT, C_ALT, D_ALT, E_ALT, H_ALT, L_ALT = range(8, 16)
+I, R, SP, PC, IX, IY = range(16, 22)
+
+REGISTER_COUNT = 22
+
+MAIN_REGISTERS = {'a': A, 'f': F, 'b': B, 'c': C, 'd': D, 'e': E, 'h': H, 'l': L}
+ALTERNATE_REGISTERS = {'a': A_ALT, 'f': F_ALT, 'b': B_ALT, 'c': C_ALT,
+                       'd': D_ALT, 'e': E_ALT, 'h': H_ALT, 'l': L_ALT}
+SPECIAL_REGISTERS = {'i': I, 'r': R, 'sp': SP, 'pc': PC}
+INDEX_REGISTERS = {'ix': IX, 'iy': IY}
+
+REGISTER_PAIRS = {'af': (A, F), 'bc': (B, C), 'de': (D, E), 'hl': (H, L)}
+WORD_REGISTERS = {'sp': SP, 'pc': PC, 'ix': IX, 'iy': IY}
+
+C_FLAG = 0b00000001
+N_FLAG = 0b00000010
+P_FLAG = 0b00000100
+H_FLAG = 0b00010000
+Z_FLAG = 0b01000000
+S_FLAG = 0b10000000
+
+FLAG_MASKS = {'c': C_FLAG, 'n': N_FLAG, 'p': P_FLAG, 'h': H_FLAG, 'z': Z_FLAG, 's': S_FLAG}
+
+
+def build_register_file():
+    registers = [0x00] * REGISTER_COUNT
+    registers[SP] = 0xffff
+    return registers
+
+
+def word_register(name):
+    if name in WORD_REGISTERS:
+        return WORD_REGISTERS[name], None
+    return REGISTER_PAIRS[name]
+
+
+def get_word(registers, high, low):
+    if low is None:
+        return registers[high]
+    return (registers[high] << 8) | registers[low]
+
+
+def set_word(registers, high, low, value):
+    if low is None:
+        registers[high] = value
+    else:
+        registers[high] = value >> 8
+        registers[low] = value & 0xff
+
+
+class RegisterView:
+    def __init__(self, registers, indices):
+        self.registers = registers
+        self.indices = indices
+
+    def __getitem__(self, name):
+        return self.registers[self.indices[name]]
+
+    def __setitem__(self, name, value):
+        self.registers[self.indices[name]] = value
+
+    def __contains__(self, name):
+        return name in self.indices
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.indices)
+
+    def keys(self):
+        return sorted(self.indices, key=self.indices.get)
+
+    def items(self):
+        return [(name, self[name]) for name in self.keys()]
@@ -1,6 +1,7 @@
-from baseop import BaseOp
+from baseop import BaseOp, IndexedCbOp
 from funcs import has_parity, to_hex_digits, to_signed
 from memory.memory import fetch_signed_byte
+from z80.registers import A, H, L, MAIN_REGISTERS, INDEX_REGISTERS
 
 
 class OpRlca(BaseOp):
@@ -9,8 +10,9 @@ class OpRlca(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        result = _rlc_value(self.processor, self.processor.main_registers['a'])
-        self.processor.main_registers['a'] = result
+        registers = processor.registers
+        result = _rlc_value(processor, registers[A])
+        registers[A] = result
         return 4, False, pc
 
     def __str__(self):
@@ -23,9 +25,10 @@ class OpRla(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        value = self.processor.main_registers['a']
-        rotated = _rl_value(self.processor, value)
-        self.processor.main_registers['a'] = rotated
+        registers = processor.registers
+        value = registers[A]
+        rotated = _rl_value(processor, value)
+        registers[A] = rotated
         return 4, False, pc
 
     def __str__(self):
@@ -38,9 +41,10 @@ class OpRrca(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        value = self.processor.main_registers['a']
-        rotated = _rrc_value(self.processor, value)
-        self.processor.main_registers['a'] = rotated
+        registers = processor.registers
+        value = registers[A]
+        rotated = _rrc_value(processor, value)
+        registers[A] = rotated
         return 4, False, pc
 
     def __str__(self):
@@ -53,15 +57,16 @@ class OpRra(BaseOp):
         self.processor = processor
 
     def execute(self, processor, memory, pc):
-        low_bit = self.processor.main_registers['a'] & 0b1
-        rotated = self.processor.main_registers['a'] >> 1
-        if self.processor.condition('c'):
+        registers = processor.registers
+        low_bit = registers[A] & 0b1
+        rotated = registers[A] >> 1
+        if processor.condition('c'):
             rotated |= 0b10000000
 
-        self.processor.main_registers['a'] = rotated
-        self.processor.set_condition('c', low_bit == 1)
-        self.processor.set_condition('h', False)
-        self.processor.set_condition('n', False)
+        registers[A] = rotated
+        processor.set_condition('c', low_bit == 1)
+        processor.set_condition('h', False)
+        processor.set_condition('n', False)
         return 4, False, pc
 
     def __str__(self):
@@ -73,11 +78,13 @@ class OpRlcReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        result = _rlc_value(self.processor, self.processor.main_registers[self.reg])
-        self.processor.main_registers[self.reg] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        registers = processor.registers
+        result = _rlc_value(processor, registers[self.index])
+        registers[self.index] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 8, False, pc
 
     def __str__(self):
@@ -89,11 +96,13 @@ class OpRrcReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        result = _rrc_value(self.processor, self.processor.main_registers[self.reg])
-        self.processor.main_registers[self.reg] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        registers = processor.registers
+        result = _rrc_value(processor, registers[self.index])
+        registers[self.index] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 8, False, pc
 
     def __str__(self):
@@ -101,16 +110,19 @@ class OpRrcReg(BaseOp):
 
 
 class OpRrcHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _rrc_value(self.processor, self.memory[0xffff & address])
-        self.memory[0xffff & address] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        result = _rrc_value(processor, memory[address])
+        memory[address] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 15, False, pc
 
     def __str__(self):
@@ -122,11 +134,13 @@ class OpRlReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        result = _rl_value(self.processor, self.processor.main_registers[self.reg])
-        self.processor.main_registers[self.reg] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        registers = processor.registers
+        result = _rl_value(processor, registers[self.index])
+        registers[self.index] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 8, False, pc
 
     def __str__(self):
@@ -138,11 +152,13 @@ class OpRrReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        result = _rr_value(self.processor, self.processor.main_registers[self.reg])
-        self.processor.main_registers[self.reg] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        registers = processor.registers
+        result = _rr_value(processor, registers[self.index])
+        registers[self.index] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 8, False, pc
 
     def __str__(self):
@@ -150,16 +166,19 @@ class OpRrReg(BaseOp):
 
 
 class OpRlcHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _rlc_value(self.processor, self.memory[0xffff & address])
-        self.memory[0xffff & address] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        result = _rlc_value(processor, memory[address])
+        memory[address] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 15, False, pc
 
     def __str__(self):
@@ -167,16 +186,19 @@ class OpRlcHlIndirect(BaseOp):
 
 
 class OpRlHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _rl_value(self.processor, self.memory[0xffff & address])
-        self.memory[0xffff & address] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        result = _rl_value(processor, memory[address])
+        memory[address] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 15, False, pc
 
     def __str__(self):
@@ -184,16 +206,19 @@ class OpRlHlIndirect(BaseOp):
 
 
 class OpRrHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _rr_value(self.processor, self.memory[0xffff & address])
-        self.memory[0xffff & address] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        result = _rr_value(processor, memory[address])
+        memory[address] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 15, False, pc
 
     def __str__(self):
@@ -201,25 +226,28 @@ class OpRrHlIndirect(BaseOp):
 
 
 class OpRld(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        mem_value = self.memory[0xffff & address]
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        mem_value = memory[address]
         mem_digits = to_hex_digits(mem_value)
 
-        reg_value = self.processor.main_registers['a']
+        reg_value = registers[A]
         reg_digits = to_hex_digits(reg_value)
 
-        self.memory[0xffff & address] = (mem_digits[1] << 4) + reg_digits[1]
-        self.processor.main_registers['a'] = reg_digits[0] + (mem_digits[0] >> 4)
+        memory[address] = (mem_digits[1] << 4) + reg_digits[1]
+        registers[A] = reg_digits[0] + (mem_digits[0] >> 4)
 
-        _set_sign_zero_parity_flags(self.processor, self.processor.main_registers['a'])
-        self.processor.set_condition('h', False)
-        self.processor.set_condition('n', False)
+        _set_sign_zero_parity_flags(processor, registers[A])
+        processor.set_condition('h', False)
+        processor.set_condition('n', False)
         return 18, False, pc
 
     def __str__(self):
@@ -227,101 +255,116 @@ class OpRld(BaseOp):
 
 
 class OpRrd(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        mem_value = self.memory[0xffff & address]
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        mem_value = memory[address]
         mem_digits = to_hex_digits(mem_value)
 
-        reg_value = self.processor.main_registers['a']
+        reg_value = registers[A]
         reg_digits = to_hex_digits(reg_value)
 
-        self.memory[0xffff & address] = (reg_digits[1] << 4) + (mem_digits[0] >> 4)
-        self.processor.main_registers['a'] = reg_digits[0] + mem_digits[1]
+        memory[address] = (reg_digits[1] << 4) + (mem_digits[0] >> 4)
+        registers[A] = reg_digits[0] + mem_digits[1]
 
-        _set_sign_zero_parity_flags(self.processor, self.processor.main_registers['a'])
-        self.processor.set_condition('h', False)
-        self.processor.set_condition('n', False)
+        _set_sign_zero_parity_flags(processor, registers[A])
+        processor.set_condition('h', False)
+        processor.set_condition('n', False)
         return 18, False, pc
 
     def __str__(self):
         return 'rrd'
 
 
-class OpRlcIndexedIndirect(BaseOp):
+class OpRlcIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        value = self.memory[0xffff & address]
-        result = _rlc_value(self.processor, value)
-        self.memory[0xffff & address] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        value = memory[address]
+        result = _rlc_value(processor, value)
+        memory[address] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 23, False, pc
 
     def __str__(self):
         return 'rlc ({} + d)'.format(self.indexed_reg)
 
 
-class OpRrcIndexedIndirect(BaseOp):
+class OpRrcIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        value = self.memory[0xffff & address]
-        result = _rrc_value(self.processor, value)
-        self.memory[0xffff & address] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        value = memory[address]
+        result = _rrc_value(processor, value)
+        memory[address] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 23, False, pc
 
     def __str__(self):
         return 'rrc ({} + d)'.format(self.indexed_reg)
 
 
-class OpRlIndexedIndirect(BaseOp):
+class OpRlIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        value = self.memory[0xffff & address]
-        result = _rl_value(self.processor, value)
-        self.memory[0xffff & address] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        value = memory[address]
+        result = _rl_value(processor, value)
+        memory[address] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 23, False, pc
 
     def __str__(self):
         return 'rl ({} + d)'.format(self.indexed_reg)
 
 
-class OpRrIndexedIndirect(BaseOp):
+class OpRrIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        value = self.memory[0xffff & address]
-        result = _rr_value(self.processor, value)
-        self.memory[0xffff & address] = result
-        _set_sign_zero_parity_flags(self.processor, result)
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        value = memory[address]
+        result = _rr_value(processor, value)
+        memory[address] = result
+        _set_sign_zero_parity_flags(processor, result)
         return 23, False, pc
 
     def __str__(self):
@@ -1,6 +1,7 @@
-from baseop import BaseOp
+from baseop import BaseOp, IndexedCbOp
 from funcs import has_parity, to_signed
 from memory.memory import fetch_signed_byte
+from z80.registers import H, L, MAIN_REGISTERS, INDEX_REGISTERS
 
 
 class OpSlaReg(BaseOp):
@@ -8,10 +9,12 @@ class OpSlaReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        result = _sla_value(self.processor, self.processor.main_registers[self.reg])
-        self.processor.main_registers[self.reg] = result
+        registers = processor.registers
+        result = _sla_value(processor, registers[self.index])
+        registers[self.index] = result
         return 8, False, pc
 
     def __str__(self):
@@ -19,15 +22,18 @@ class OpSlaReg(BaseOp):
 
 
 class OpSlaHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _sla_value(self.processor, self.memory[0xffff & address])
-        self.memory[address] = result
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        result = _sla_value(processor, memory[address])
+        memory[address] = result
         return 15, False, pc
 
     def __str__(self):
@@ -39,10 +45,12 @@ class OpSllReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        result = _sll_value(self.processor, self.processor.main_registers[self.reg])
-        self.processor.main_registers[self.reg] = result
+        registers = processor.registers
+        result = _sll_value(processor, registers[self.index])
+        registers[self.index] = result
         return 8, False, pc
 
     def __str__(self):
@@ -50,15 +58,18 @@ class OpSllReg(BaseOp):
 
 
 class OpSllHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _sll_value(self.processor, self.memory[0xffff & address])
-        self.memory[address] = result
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        result = _sll_value(processor, memory[address])
+        memory[address] = result
         return 15, False, pc
 
     def __str__(self):
@@ -70,10 +81,12 @@ class OpSraReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        result = _sra_value(self.processor, self.processor.main_registers[self.reg])
-        self.processor.main_registers[self.reg] = result
+        registers = processor.registers
+        result = _sra_value(processor, registers[self.index])
+        registers[self.index] = result
         return 8, False, pc
 
     def __str__(self):
@@ -81,15 +94,18 @@ class OpSraReg(BaseOp):
 
 
 class OpSraHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _sra_value(self.processor, self.memory[0xffff & address])
-        self.memory[address] = result
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        result = _sra_value(processor, memory[address])
+        memory[address] = result
         return 15, False, pc
 
     def __str__(self):
@@ -101,10 +117,12 @@ class OpSrlReg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.index = MAIN_REGISTERS[reg]
 
     def execute(self, processor, memory, pc):
-        result = _srl_value(self.processor, self.processor.main_registers[self.reg])
-        self.processor.main_registers[self.reg] = result
+        registers = processor.registers
+        result = _srl_value(processor, registers[self.index])
+        registers[self.index] = result
         return 8, False, pc
 
     def __str__(self):
@@ -112,69 +130,102 @@ class OpSrlReg(BaseOp):
 
 
 class OpSrlHlIndirect(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, memory):
         BaseOp.__init__(self)
         self.processor = processor
         self.memory = memory
 
     def execute(self, processor, memory, pc):
-        address = self.processor.get_16bit_reg('hl')
-        result = _srl_value(self.processor, self.memory[0xffff & address])
-        self.memory[address] = result
+        registers = processor.registers
+        address = (registers[H] << 8) | registers[L]
+        result = _srl_value(processor, memory[address])
+        memory[address] = result
         return 15, False, pc
 
     def __str__(self):
         return 'srl (hl)'
 
 
-class OpSlaIndexedIndirect(BaseOp):
+class OpSlaIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        value = self.memory[0xffff & address]
-        result = _sla_value(self.processor, value)
-        self.memory[address] = result
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        value = memory[address]
+        result = _sla_value(processor, value)
+        memory[address] = result
         return 23, False, pc
 
     def __str__(self):
         return 'sla ({} + d)'.format(self.indexed_reg)
 
 
-class OpSraIndexedIndirect(BaseOp):
+class OpSllIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
+        self.processor = processor
+        self.memory = memory
+        self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
+
+    def execute_with_offset(self, processor, memory, pc, offset):
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        value = memory[address]
+        result = _sll_value(processor, value)
+        memory[address] = result
+        return 23, False, pc
+
+    def __str__(self):
+        return 'sll ({} + d)'.format(self.indexed_reg)
+
+
+class OpSraIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
+    def __init__(self, processor, memory, indexed_reg):
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        value = self.memory[0xffff & address]
-        result = _sra_value(self.processor, value)
-        self.memory[address] = result
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        value = memory[address]
+        result = _sra_value(processor, value)
+        memory[address] = result
         return 23, False, pc
 
     def __str__(self):
         return 'sra ({} + d)'.format(self.indexed_reg)
 
 
-class OpSrlIndexedIndirect(BaseOp):
+class OpSrlIndexedIndirect(IndexedCbOp):
+    writes_memory = True
+
     def __init__(self, processor, memory, indexed_reg):
-        BaseOp.__init__(self)
+        IndexedCbOp.__init__(self)
         self.processor = processor
         self.memory = memory
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute_with_offset(self, processor, memory, pc, offset):
-        address = self.processor.index_registers[self.indexed_reg] + offset
-        value = self.memory[0xffff & address]
-        result = _srl_value(self.processor, value)
-        self.memory[address] = result
+        address = 0xffff & (processor.registers[self.indexed] + offset)
+        value = memory[address]
+        result = _srl_value(processor, value)
+        memory[address] = result
         return 23, False, pc
 
     def __str__(self):
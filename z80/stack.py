@@ -1,5 +1,6 @@
 from baseop import BaseOp
 from z80.funcs import big_endian_value, high_low_pair
+from z80.registers import INDEX_REGISTERS, REGISTER_PAIRS
 
 
 class OpPop16Reg(BaseOp):
@@ -7,12 +8,15 @@ class OpPop16Reg(BaseOp):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.high, self.low = REGISTER_PAIRS[reg]
+        self.reads_flags = reg == 'af'
 
     def execute(self, processor, memory, pc):
-        lsb = self.processor.pop_byte()
-        msb = self.processor.pop_byte()
-        self.processor.main_registers[self.reg[0]] = msb
-        self.processor.main_registers[self.reg[1]] = lsb
+        lsb = processor.pop_byte()
+        msb = processor.pop_byte()
+        registers = processor.registers
+        registers[self.high] = msb
+        registers[self.low] = lsb
         return 10, False, pc
 
     def __str__(self):
@@ -20,15 +24,19 @@ class OpPop16Reg(BaseOp):
 
 
 class OpPopIndexed(BaseOp):
+    reads_flags = False
+
     def __init__(self, processor, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
-        lsb = self.processor.pop_byte()
-        msb = self.processor.pop_byte()
-        self.processor.index_registers[self.indexed_reg] = big_endian_value([lsb, msb])
+        registers = processor.registers
+        lsb = processor.pop_byte()
+        msb = processor.pop_byte()
+        registers[self.indexed] = big_endian_value([lsb, msb])
         return 14, False, pc
 
     def __str__(self):
@@ -36,14 +44,19 @@ class OpPopIndexed(BaseOp):
 
 
 class OpPush16Reg(BaseOp):
+    writes_memory = True
+
     def __init__(self, processor, reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.reg = reg
+        self.high, self.low = REGISTER_PAIRS[reg]
+        self.reads_flags = reg == 'af'
 
     def execute(self, processor, memory, pc):
-        self.processor.push_byte(self.processor.main_registers[self.reg[0]])
-        self.processor.push_byte(self.processor.main_registers[self.reg[1]])
+        registers = processor.registers
+        processor.push_byte(registers[self.high])
+        processor.push_byte(registers[self.low])
         return 11, False, pc
 
     def __str__(self):
@@ -51,15 +64,20 @@ class OpPush16Reg(BaseOp):
 
 
 class OpPushIndexed(BaseOp):
+    reads_flags = False
+    writes_memory = True
+
     def __init__(self, processor, indexed_reg):
         BaseOp.__init__(self)
         self.processor = processor
         self.indexed_reg = indexed_reg
+        self.indexed = INDEX_REGISTERS[indexed_reg]
 
     def execute(self, processor, memory, pc):
-        high_byte, low_byte = high_low_pair(self.processor.index_registers[self.indexed_reg])
-        self.processor.push_byte(high_byte)
-        self.processor.push_byte(low_byte)
+        registers = processor.registers
+        high_byte, low_byte = high_low_pair(registers[self.indexed])
+        processor.push_byte(high_byte)
+        processor.push_byte(low_byte)
         return 15, False, pc
 
     def __str__(self):
@@ -0,0 +1,68 @@
+import sys
+from array import array
+
+from z80.registers import A, F, B, C, D, E, H, L, I, R, SP, PC, IX, IY, REGISTER_COUNT
+
+OPCODE_BYTES = 4
+
+
+class InstructionTrace:
+    def __init__(self, size):
+        self.size = size
+        self.pcs = array('H', [0] * size)
+        self.opcodes = array('B', [0] * (size * OPCODE_BYTES))
+        self.registers = array('H', [0] * (size * REGISTER_COUNT))
+        self.op_t_states = array('H', [0] * size)
+        self.t_states = array('L', [0] * size)
+        self.next_index = 0
+        self.count = 0
+        self.total_t_states = 0
+
+    def start(self, registers, memory):
+        index = self.next_index
+        pc = registers[PC]
+        self.pcs[index] = pc
+        opcode_base = index * OPCODE_BYTES
+        opcodes = self.opcodes
+        for offset in xrange(0, OPCODE_BYTES):
+            opcodes[opcode_base + offset] = memory[(pc + offset) & 0xffff]
+        register_base = index * REGISTER_COUNT
+        self.registers[register_base:register_base + REGISTER_COUNT] = array('H', registers)
+        self.op_t_states[index] = 0
+        self.t_states[index] = self.total_t_states
+        self.next_index = (index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        return index
+
+    def finish(self, index, t_states):
+        self.op_t_states[index] = t_states
+        self.total_t_states += t_states
+
+    def clear(self):
+        self.next_index = 0
+        self.count = 0
+        self.total_t_states = 0
+
+    def entries(self):
+        first = (self.next_index - self.count) % self.size
+        for position in xrange(0, self.count):
+            index = (first + position) % self.size
+            opcode_base = index * OPCODE_BYTES
+            register_base = index * REGISTER_COUNT
+            yield (self.pcs[index],
+                   self.opcodes[opcode_base:opcode_base + OPCODE_BYTES].tolist(),
+                   self.registers[register_base:register_base + REGISTER_COUNT].tolist(),
+                   self.t_states[index],
+                   self.op_t_states[index])
+
+    def dump(self, out=None):
+        out = out if out is not None else sys.stdout
+        for pc, opcodes, registers, t_states, op_t_states in self.entries():
+            out.write('{0:>10} {1:04x}  {2:<12} af={3:02x}{4:02x} bc={5:02x}{6:02x} de={7:02x}{8:02x} '
+                      'hl={9:02x}{10:02x} ix={11:04x} iy={12:04x} sp={13:04x} ir={14:02x}{15:02x} '
+                      '{16:>3}t\n'.format(t_states, pc, ' '.join('{0:02x}'.format(op) for op in opcodes),
+                                          registers[A], registers[F], registers[B], registers[C],
+                                          registers[D], registers[E], registers[H], registers[L],
+                                          registers[IX], registers[IY], registers[SP], registers[I],
+                                          registers[R], op_t_states))